@@ -0,0 +1,15 @@
+import pytest
+from unittest.mock import MagicMock
+from WDC.core.dbc import Dbc
+from WDC.core.schema import schema_cache
+from .stubs import DESCRIBE_COVERAGE, answer
+
+
+@pytest.fixture
+def dbc():
+    """A Dbc that describes and answers queries over the stub AvgLandTemp coverage."""
+    dbc = Dbc()
+    dbc.post_request = MagicMock(return_value=DESCRIBE_COVERAGE)
+    dbc.post_query = MagicMock(side_effect=answer)
+    yield dbc
+    schema_cache.clear()
@@ -0,0 +1,53 @@
+# a stub of the AvgLandTemp coverage shared by the tests that don't talk to a server
+
+import math
+import re
+
+DESCRIBE_COVERAGE = b'''<?xml version="1.0" encoding="UTF-8"?>
+<wcs:CoverageDescriptions xmlns:wcs="http://www.opengis.net/wcs/2.0" xmlns:gml="http://www.opengis.net/gml/3.2"
+    xmlns:gmlcov="http://www.opengis.net/gmlcov/1.0" xmlns:swe="http://www.opengis.net/swe/2.0">
+  <wcs:CoverageDescription gml:id="AvgLandTemp">
+    <gml:boundedBy>
+      <gml:Envelope srsName="http://localhost:8080/def/crs-compound?1=http://localhost:8080/def/crs/OGC/0/AnsiDate&amp;2=http://localhost:8080/def/crs/EPSG/0/4326"
+          axisLabels="ansi Lat Long" uomLabels="d deg deg" srsDimension="3">
+        <gml:lowerCorner>"2000-02-01T00:00:00.000Z" -90 -180</gml:lowerCorner>
+        <gml:upperCorner>"2015-06-01T00:00:00.000Z" 90 180</gml:upperCorner>
+      </gml:Envelope>
+    </gml:boundedBy>
+    <wcs:CoverageId>AvgLandTemp</wcs:CoverageId>
+    <gml:domainSet>
+      <gml:RectifiedGrid dimension="3">
+        <gml:limits>
+          <gml:GridEnvelope><gml:low>0 0 0</gml:low><gml:high>184 1799 3599</gml:high></gml:GridEnvelope>
+        </gml:limits>
+        <gml:axisLabels>ansi Lat Long</gml:axisLabels>
+        <gml:offsetVector>1 0 0</gml:offsetVector>
+        <gml:offsetVector>0 -0.1 0</gml:offsetVector>
+        <gml:offsetVector>0 0 0.1</gml:offsetVector>
+      </gml:RectifiedGrid>
+    </gml:domainSet>
+    <gmlcov:rangeType>
+      <swe:DataRecord>
+        <swe:field name="Gray"><swe:Quantity definition="http://www.opengis.net/def/dataType/OGC/0/float32"/></swe:field>
+      </swe:DataRecord>
+    </gmlcov:rangeType>
+  </wcs:CoverageDescription>
+</wcs:CoverageDescriptions>
+'''
+
+
+def cells(low, high, origin, resolution):
+    """Returns the grid indices of the cells a trim intersects, like the server."""
+    near, far = (low, high) if resolution > 0 else (high, low)
+    first = math.floor((near - origin) / resolution + 1e-9)
+    end = math.ceil((far - origin) / resolution - 1e-9)
+    return range(first, end)
+
+
+def answer(query):
+    """Answers a query over AvgLandTemp with values encoding the grid indices of the cells."""
+    lat = [float(value) for value in re.search(r'Lat\(([^:]+):([^)]+)\)', query).groups()]
+    long = [float(value) for value in re.search(r'Long\(([^:]+):([^)]+)\)', query).groups()]
+    rows = [','.join(str(row * 10000 + column) for column in cells(*long, -180, 0.1))
+            for row in cells(*lat, 90, -0.1)]
+    return ('{' + ','.join('{' + row + '}' for row in rows) + '}').encode()
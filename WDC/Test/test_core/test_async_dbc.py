@@ -0,0 +1,116 @@
+import asyncio
+import threading
+import time
+import unittest
+import unittest.mock
+from unittest.mock import MagicMock
+
+from WDC.core.async_dbc import AsyncDbc
+from WDC.core.coverage import Coverage
+from WDC.core.dbc import Dbc
+from WDC.core.dco import Dco
+
+
+class TestAsyncDbc(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.dbc = Dbc()
+        self.async_dbc = AsyncDbc(self.dbc, max_concurrency=2)
+
+    def tearDown(self):
+        self.async_dbc.close()
+        self.dbc.close()
+
+    def test_init_not_dbc(self):
+        with self.assertRaisesRegex(TypeError, 'A Dbc object must be passed.'):
+            AsyncDbc('incorrect_dbc')
+
+    def test_init_incorrect_concurrency(self):
+        with self.assertRaises(ValueError):
+            AsyncDbc(self.dbc, max_concurrency=0)
+
+    async def test_post_query_result(self):
+        self.dbc.post_query = MagicMock(return_value=b"25.984251")
+        result = await self.async_dbc.post_query("for $i0 in (AvgLandTemp) return 1")
+        self.assertEqual(result, b"25.984251")
+        self.dbc.post_query.assert_called_with("for $i0 in (AvgLandTemp) return 1")
+
+    async def test_concurrency_is_bounded(self):
+        lock = threading.Lock()
+        state = {"running": 0, "peak": 0}
+
+        def slow_post_query(query):
+            with lock:
+                state["running"] += 1
+                state["peak"] = max(state["peak"], state["running"])
+            time.sleep(0.05)
+            with lock:
+                state["running"] -= 1
+            return query.encode()
+
+        self.dbc.post_query = slow_post_query
+        queries = [f"query {i}" for i in range(6)]
+        results = await asyncio.gather(*(self.async_dbc.post_query(query) for query in queries))
+        self.assertEqual(results, [query.encode() for query in queries])
+        self.assertEqual(state["peak"], 2)
+
+    async def test_timeout_returns_error_object(self):
+        self.dbc.post_query = lambda query, timeout=None: time.sleep(0.2)
+        result = await self.async_dbc.post_query("query", timeout=0.01)
+        self.assertDictEqual(result, {
+            "success": False,
+            "error": {
+                "code": 408,
+                "message": "Request Failed",
+                "exceptionDetail": "Request Timeout Error"
+            }
+        })
+
+    async def test_cancellation_releases_slot_once_request_is_done(self):
+        self.dbc.post_query = lambda query: time.sleep(0.1) or b"done"
+        task = asyncio.ensure_future(self.async_dbc.post_query("slow query"))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        self.assertEqual(await self.async_dbc.post_query("next query"), b"done")
+
+    async def test_abandoned_request_holds_its_slot(self):
+        async_dbc = AsyncDbc(self.dbc, max_concurrency=1)
+        sent = []
+
+        def post_query(query, timeout=None):
+            sent.append((query, timeout))
+            time.sleep(0.2 if query == "slow" else 0)
+            return query.encode()
+
+        self.dbc.post_query = post_query
+        try:
+            self.assertEqual((await async_dbc.post_query("slow", timeout=0.05))["error"]["code"], 408)
+            # the slot is only free once the slow request is done, then the fast one is sent
+            self.assertEqual(await async_dbc.post_query("fast", timeout=0.5), b"fast")
+            self.assertEqual(sent, [("slow", 0.05), ("fast", 0.5)])
+        finally:
+            async_dbc.close()
+
+    def test_timeout_reaches_the_http_call(self):
+        with unittest.mock.patch.object(self.dbc._session, "post") as post:
+            post.return_value.content = b"1"
+            asyncio.run(self.async_dbc.post_query("query", timeout=0.3))
+        self.assertEqual(post.call_args.kwargs["timeout"], 0.3)
+
+    async def test_dco_execute_async(self):
+        self.dbc.post_query = MagicMock(return_value=b"1")
+        dco = Dco(Coverage("AvgLandTemp"), dbc=self.dbc).return_expression(1)
+        result = await dco.execute_async(self.async_dbc, return_format="csv")
+        self.assertEqual(result, b"1")
+        self.dbc.post_query.assert_called_with(
+            'for $i0 in (AvgLandTemp) return encode(1, "csv")')
+
+    async def test_dco_execute_async_not_async_dbc(self):
+        dco = Dco(Coverage("AvgLandTemp"), dbc=self.dbc).return_expression(1)
+        with self.assertRaisesRegex(TypeError, 'An AsyncDbc object must be passed.'):
+            await dco.execute_async(self.dbc)
+
+
+if __name__ == '__main__':
+    unittest.main()
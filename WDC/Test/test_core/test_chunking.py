@@ -0,0 +1,105 @@
+# here you can find tests for computing aggregations from time chunks
+
+import datetime
+import re
+import pytest
+from unittest.mock import MagicMock
+from WDC.core.chunking import split_time_range
+from WDC.core.coverage import Coverage, AxisSubset
+from WDC.core.dbc import Dbc
+from WDC.core.dco import Dco
+from WDC.helper.operations.nodes import freeze
+from WDC.helper.operations.numoperations import AggregationMethod
+from WDC.helper.util.retry import RetryPolicy
+from WDC.helper.util.useful_classes import Date
+
+# one value per month, starting at 1 in January 1990
+MONTHS = {datetime.date(1990 + index // 12, index % 12 + 1, 1): index + 1 for index in range(12 * 40)}
+
+
+def day(text):
+    parts = [int(part) for part in text.split('-')] + [1, 1]
+    return datetime.date(*parts[:3])
+
+
+def answer(query):
+    """Answers an aggregation over the monthly series, like the server."""
+    low, high = re.search(r'ansi\("([^"]+)":"([^"]+)"\)', query).groups()
+    values = [value for month, value in MONTHS.items() if day(low) <= month <= day(high)]
+    operation = re.search(r'return (\w+)\(', query).group(1)
+    result = {'sum': sum, 'count': len, 'min': min, 'max': max,
+              'avg': lambda cells: sum(cells) / len(cells)}[operation](values)
+    return str(result).encode()
+
+
+@pytest.fixture
+def dbc():
+    dbc = Dbc()
+    dbc.post_query = MagicMock(side_effect=answer)
+    return dbc
+
+
+@pytest.fixture
+def coverage():
+    coverage = Coverage("AvgLandTemp")
+    coverage.set_subset(AxisSubset('ansi', (Date(1990, 3), Date(2019, 11))), AxisSubset('Lat', 53.08),
+                        AxisSubset('Long', 8.80))
+    return coverage
+
+
+class TestSplitTimeRange:
+    def test_years(self):
+        chunks = split_time_range(Date(1990, 3), Date(1992, 2), 'year')
+        assert [(str(start), str(end)) for start, end in chunks] == [
+            ('"1990-03-01"', '"1990-12-31"'), ('"1991-01-01"', '"1991-12-31"'), ('"1992-01-01"', '"1992-02-01"')]
+
+    def test_months(self):
+        chunks = split_time_range(Date(2000, 1, 15), Date(2000, 3), 'month')
+        assert [(str(start), str(end)) for start, end in chunks] == [
+            ('"2000-01-15"', '"2000-01-31"'), ('"2000-02-01"', '"2000-02-29"'), ('"2000-03-01"', '"2000-03-01"')]
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError, match="'year' or 'month'"):
+            split_time_range(Date(2000), Date(2001), 'week')
+        with pytest.raises(ValueError, match="greater than"):
+            split_time_range(Date(2001), Date(2000))
+
+
+class TestExecuteChunked:
+    @pytest.mark.parametrize("method", ['sum', 'count', 'min', 'max', 'avg'])
+    def test_same_result_as_single_query(self, dbc, coverage, method):
+        dco = Dco(coverage, dbc=dbc).return_expression(getattr(AggregationMethod, method)(coverage))
+        expected = float(dco.execute())
+        assert dco.execute_chunked(unit='year') == pytest.approx(expected)
+
+    def test_avg_uses_sums_and_counts(self, dbc, coverage):
+        dco = Dco(coverage, dbc=dbc).return_expression(freeze(AggregationMethod.avg(coverage)))
+        dco.execute_chunked(unit='year')
+        queries = [call.args[0] for call in dbc.post_query.call_args_list]
+        assert len(queries) == 2 * 30
+        assert sum(query.count('return sum(') for query in queries) == 30
+        assert sum(query.count('return count(') for query in queries) == 30
+
+    def test_failed_chunks_are_retried_alone(self, dbc, coverage):
+        failures = []
+
+        def flaky(query):
+            if '"1995-01-01":"1995-12-31"' in query and not failures:
+                failures.append(query)
+                return {"success": False, "error": {"code": 504}}
+            return answer(query)
+
+        dbc.post_query = MagicMock(side_effect=flaky)
+        dco = Dco(coverage, dbc=dbc).return_expression(AggregationMethod.max(coverage))
+        assert dco.execute_chunked(retry_policy=RetryPolicy(backoff_factor=0)) == 359
+        assert dbc.post_query.call_count == 31
+
+    def test_only_aggregations(self, dbc, coverage):
+        with pytest.raises(ValueError, match="Only aggregations"):
+            Dco(coverage, dbc=dbc).return_expression(coverage + 1).execute_chunked()
+
+    def test_coverage_without_time_trim(self, dbc):
+        coverage = Coverage("AvgLandTemp")
+        coverage.set_subset(AxisSubset('ansi', Date(2014, 7)))
+        with pytest.raises(ValueError, match="trimmed along 'ansi'"):
+            Dco(coverage, dbc=dbc).return_expression(AggregationMethod.max(coverage)).execute_chunked()
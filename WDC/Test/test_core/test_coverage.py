@@ -17,6 +17,12 @@ class TestCoverage:
             ["CoverageName1", "CoverageName2", "CoverageName3"])
         assert coverage.get_used_coverage() == "CoverageName1, CoverageName2, CoverageName3"
 
+    def test_set_variable_name_is_deprecated(self):
+        """Tests that setting the variable name warns, since queries assign their own variables."""
+        coverage = Coverage('CoverageName')
+        with pytest.warns(DeprecationWarning):
+            coverage.set_variable_name('$x')
+
 
 class TestAxis:
     def test_axis_initialization_valid(self):
@@ -1,6 +1,14 @@
+import threading
+import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import MagicMock, patch
 from WDC.helper.util.wrappers import network_wrapper
+from WDC.core.dbc import Dbc
+from WDC.core.dco import Dco
+from WDC.core.coverage import Coverage
+from WDC.helper.util.retry import RetryPolicy, HedgePolicy
+from WDC.helper.util.coalescing import QueryCoalescer
 import requests
 
 
@@ -73,3 +81,186 @@ class TestDbc(unittest.TestCase):
                 'extra': mockedHTTPError
             }
         })
+
+
+class TestDbcConnectionPool(unittest.TestCase):
+    def test_pool_configuration(self):
+        dbc = Dbc(pool_connections=3, pool_maxsize=7, pool_block=True)
+        adapter = dbc._session.get_adapter("https://ows.rasdaman.org/rasdaman/ows")
+        self.assertEqual(adapter._pool_connections, 3)
+        self.assertEqual(adapter._pool_maxsize, 7)
+        self.assertTrue(adapter._pool_block)
+        dbc.close()
+
+    def test_keep_alive_disabled(self):
+        dbc = Dbc(keep_alive=False)
+        self.assertEqual(dbc._session.headers["Connection"], "close")
+        dbc.close()
+
+    def test_dco_instances_share_session(self):
+        mock_response = MagicMock()
+        mock_response.content = b"1"
+        with Dbc() as dbc:
+            with patch.object(dbc._session, "post", return_value=mock_response) as mock_post:
+                Dco(Coverage("AvgLandTemp"), dbc=dbc).return_expression(1).execute()
+                Dco(Coverage("AvgLandTemp"), dbc=dbc).return_expression(2).execute()
+                self.assertEqual(mock_post.call_count, 2)
+
+    def test_context_manager_closes_session(self):
+        with patch.object(requests.Session, "close") as mock_close:
+            with Dbc():
+                mock_close.assert_not_called()
+        mock_close.assert_called_once()
+
+
+class TestDbcBatch(unittest.TestCase):
+    def setUp(self):
+        self.dbc = Dbc()
+
+    def tearDown(self):
+        self.dbc.close()
+
+    def test_post_queries_keeps_input_order(self):
+        def post_query(query):
+            time.sleep(0.01 * (5 - int(query)))
+            return query.encode()
+        self.dbc.post_query = post_query
+        self.assertEqual(self.dbc.post_queries(
+            ["1", "2", "3", "4"], max_workers=4), [b"1", b"2", b"3", b"4"])
+
+    def test_post_queries_reports_errors_per_item(self):
+        connection_error = requests.exceptions.ConnectionError("connection refused")
+
+        def post_query(query):
+            if query == "bad":
+                raise connection_error
+            return b"ok"
+        self.dbc.post_query = post_query
+        results = self.dbc.post_queries(["good", "bad", "good"])
+        self.assertEqual(results[0], b"ok")
+        self.assertEqual(results[2], b"ok")
+        self.assertDictEqual(results[1], {
+            "success": False,
+            "error": {
+                "code": None,
+                "message": "Request Failed",
+                "exceptionDetail": "connection refused",
+                "extra": connection_error
+            }
+        })
+
+    def test_post_queries_runs_concurrently(self):
+        self.dbc.post_query = lambda query: time.sleep(0.1) or b"ok"
+        start = time.perf_counter()
+        self.dbc.post_queries(["query"] * 8, max_workers=8)
+        self.assertLess(time.perf_counter() - start, 0.5)
+
+    def test_post_queries_incorrect_workers(self):
+        with self.assertRaises(ValueError):
+            self.dbc.post_queries(["query"], max_workers=0)
+
+
+def make_response(status_code, content=b"", headers=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.content = content
+    response.headers = headers or {}
+    response.text = '<ows:ExceptionReport xmlns:ows="http://www.opengis.net/ows/2.0"><ows:Exception exceptionCode="ServiceUnavailable"><ows:ExceptionText>Busy</ows:ExceptionText></ows:Exception></ows:ExceptionReport>'
+    if status_code >= 400:
+        response.raise_for_status.side_effect = requests.HTTPError()
+    return response
+
+
+class TestDbcRetries(unittest.TestCase):
+    def test_timeout_before_response_is_reported(self):
+        dbc = Dbc()
+        with patch.object(dbc._session, "post", side_effect=requests.exceptions.Timeout):
+            result = dbc.post_query("query")
+        self.assertEqual(result["error"]["code"], 408)
+        self.assertEqual(result["error"]["exceptionDetail"], "Request Timeout Error")
+
+    def test_transient_status_is_retried(self):
+        dbc = Dbc(retry_policy=RetryPolicy(max_retries=2, backoff_factor=0))
+        responses = [make_response(503), make_response(200, b"25.98")]
+        with patch.object(dbc._session, "post", side_effect=responses) as mock_post:
+            self.assertEqual(dbc.post_query("query"), b"25.98")
+        self.assertEqual(mock_post.call_count, 2)
+
+    def test_retry_after_is_respected(self):
+        dbc = Dbc(retry_policy=RetryPolicy(max_retries=1))
+        responses = [make_response(429, headers={"Retry-After": "0.2"}), make_response(200, b"1")]
+        with patch.object(dbc._session, "post", side_effect=responses):
+            start = time.perf_counter()
+            dbc.post_query("query")
+        self.assertGreaterEqual(time.perf_counter() - start, 0.2)
+
+    def test_retries_are_exhausted(self):
+        dbc = Dbc(retry_policy=RetryPolicy(max_retries=2, backoff_factor=0))
+        with patch.object(dbc._session, "post", side_effect=[make_response(503) for _ in range(3)]) as mock_post:
+            result = dbc.post_query("query")
+        self.assertEqual(mock_post.call_count, 3)
+        self.assertEqual(result["error"]["code"], 503)
+        self.assertEqual(result["error"]["exceptionDetail"], {
+            "exceptionText": "Busy", "exceptionCode": "ServiceUnavailable"})
+
+    def test_client_errors_are_not_retried(self):
+        dbc = Dbc(retry_policy=RetryPolicy(max_retries=2, backoff_factor=0))
+        with patch.object(dbc._session, "post", side_effect=[make_response(400)]) as mock_post:
+            result = dbc.post_query("query")
+        self.assertEqual(mock_post.call_count, 1)
+        self.assertFalse(result["success"])
+
+    def test_connection_error_is_retried(self):
+        dbc = Dbc(retry_policy=RetryPolicy(max_retries=1, backoff_factor=0))
+        side_effect = [requests.exceptions.ConnectionError(), make_response(200, b"1")]
+        with patch.object(dbc._session, "post", side_effect=side_effect):
+            self.assertEqual(dbc.post_query("query"), b"1")
+
+    def test_identical_queries_are_coalesced(self):
+        dbc = Dbc(coalescer=QueryCoalescer())
+        release = threading.Event()
+
+        def post(*args, **kwargs):
+            release.wait(5)
+            return make_response(200, b"25.98")
+
+        with patch.object(dbc._session, "post", side_effect=post) as mock_post:
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                futures = [executor.submit(dbc.post_query, "query") for _ in range(4)]
+                other = executor.submit(dbc.post_query, "other query")
+                deadline = time.monotonic() + 5
+                while dbc.coalescer.coalesced < 3 and time.monotonic() < deadline:
+                    time.sleep(0.001)
+                release.set()
+                self.assertEqual([future.result() for future in futures], [b"25.98"] * 4)
+                other.result()
+        self.assertEqual(mock_post.call_count, 2)
+        self.assertEqual(dbc.coalescer.stats(), {"requests": 2, "coalesced": 3, "in_flight": 0})
+
+    def test_coalesced_failure_returns_error_object(self):
+        dbc = Dbc(coalescer=QueryCoalescer())
+        with patch.object(dbc._session, "post", side_effect=[make_response(503)]):
+            result = dbc.post_query("query")
+        self.assertEqual(result["error"]["code"], 503)
+
+    def test_close_stops_hedge_threads(self):
+        policy = HedgePolicy(delay=0.5, percentile=None)
+        with Dbc(hedge_policy=policy) as dbc:
+            with patch.object(dbc._session, "post", return_value=make_response(200, b"1")):
+                dbc.post_query("query")
+            self.assertIsNotNone(policy._executor)
+        self.assertIsNone(policy._executor)
+
+    def test_hedged_query(self):
+        dbc = Dbc(hedge_policy=HedgePolicy(delay=0.02, percentile=None))
+        calls = []
+
+        def post(*args, **kwargs):
+            calls.append(None)
+            if len(calls) == 1:
+                time.sleep(0.3)
+                return make_response(200, b"slow")
+            return make_response(200, b"fast")
+
+        with patch.object(dbc._session, "post", side_effect=post):
+            self.assertEqual(dbc.post_query("query"), b"fast")
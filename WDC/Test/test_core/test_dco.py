@@ -1,6 +1,10 @@
+import io
+import os
+import tempfile
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import MagicMock, Mock
-
+import numpy as np
 from WDC.core.coverage import Coverage, AxisSubset
 from WDC.core.dbc import Dbc
 from WDC.core.dco import Dco
@@ -8,6 +12,7 @@ from WDC.helper.error_handling.err import VariableArgumentException
 from WDC.helper.operations.numoperations import AggregationMethod
 from WDC.core.switch import Case
 from WDC.helper.util.useful_classes import RGB, Date
+from WDC.helper.util.cache import ResultCache
 
 
 class TestDco(unittest.TestCase):
@@ -45,8 +50,8 @@ class TestDco(unittest.TestCase):
             Dco(test_coverage, dbc='incorrect_dbc')
 
     def test_return_expression_scalar(self):
-        self.dco.return_expression(120)
-        self.assertEqual(self.dco._returnQuery, '120')
+        dco = self.dco.return_expression(120)
+        self.assertEqual(dco._returnQuery, '120')
 
     def test_return_expression_coverage(self):
         correct_request = 'for $i0 in (AvgLandTemp) return $i0[ansi("2014-07"), Lat(53.08), Long(8.8)]'
@@ -59,9 +64,10 @@ class TestDco(unittest.TestCase):
         lon = AxisSubset('Long', 8.80)
         ansi = AxisSubset('ansi', Date(2014, 7))
         test_coverage.set_subset(ansi, lat, lon)
-        self.dco.return_expression(test_coverage).execute()
+        dco = self.dco.return_expression(test_coverage)
+        dco.execute()
         # assertion
-        self.assertEqual(self.dco._returnQuery, correct_return_query)
+        self.assertEqual(dco._returnQuery, correct_return_query)
         self.dbc.post_query.assert_called_with(correct_request)
 
     def test_return_expression_operation(self):
@@ -73,9 +79,10 @@ class TestDco(unittest.TestCase):
         lon = AxisSubset('Long', 8.80)
         ansi = AxisSubset('ansi', Date(2014, 7))
         test_coverage.set_subset(ansi, lat, lon)
-        self.dco.return_expression(test_coverage > 10).execute()
+        dco = self.dco.return_expression(test_coverage > 10)
+        dco.execute()
         # assertion
-        self.assertEqual(self.dco._returnQuery, correct_return_query)
+        self.assertEqual(dco._returnQuery, correct_return_query)
 
     def test_return_expression_aggregate(self):
         correct_return_query = 'max($i0[ansi("2014-07"), Lat(53.08), Long(8.8)])'
@@ -86,10 +93,11 @@ class TestDco(unittest.TestCase):
         lon = AxisSubset('Long', 8.80)
         ansi = AxisSubset('ansi', Date(2014, 7))
         test_coverage.set_subset(ansi, lat, lon)
-        self.dco.return_expression(
-            AggregationMethod.max(test_coverage)).execute()
+        dco = self.dco.return_expression(
+            AggregationMethod.max(test_coverage))
+        dco.execute()
         # assertion
-        self.assertEqual(self.dco._returnQuery, correct_return_query)
+        self.assertEqual(dco._returnQuery, correct_return_query)
 
     def test_return_expression_fail(self):
         with self.assertRaisesRegex(TypeError, "The type of the instance you passed is not allowed."):
@@ -112,15 +120,22 @@ class TestDco(unittest.TestCase):
     def test_construct(self):
         values = [(1, 2), (3, 4)]
         operator = '>'
-        self.dco.construct(values, operator)
+        dco = self.dco.construct(values, operator)
         expected_query = "coverage myCoverage\nover $p x((1:2)), $q y((3:4)) values $p > $q"
-        self.assertEqual(self.dco._returnQuery, expected_query)
+        self.assertEqual(dco._returnQuery, expected_query)
 
     def test_clip(self):
         values = [(1, 2), (3, 4)]
-        self.dco.clip(values)
+        dco = self.dco.clip(values)
         expected_query = f"clip({self.dco._coverages[0].variable}, POLYGON((1 2,3 4)))"
-        self.assertEqual(self.dco._returnQuery, expected_query)
+        self.assertEqual(dco._returnQuery, expected_query)
+
+    def test_clip_uses_query_variable(self):
+        self.dbc.post_query = MagicMock(side_effect=lambda query: query.encode())
+        first, second = Coverage("AvgLandTemp"), Coverage("AvgTemp")
+        first.variable = second.variable = "$stale"
+        dco = Dco(first, second, dbc=self.dbc).clip([(1, 2), (3, 4)])
+        self.assertEqual(dco.execute(), b'for $i0 in (AvgLandTemp)\n$i1 in (AvgTemp) return clip($i0, POLYGON((1 2,3 4)))')
 
     def test_invalid_construct_type(self):
         values = [(1, "a"), (1, 2)]
@@ -161,8 +176,8 @@ default return {red: 255; green: 0; blue: 0}
         case2 = Case(test_coverage2 > 30, return2)
 
         # run switch method with default case
-        self.dco.switch(case1, case2, default=RGB(255, 0, 0))
-        self.assertEqual(self.dco._returnQuery, correct_query)
+        dco = self.dco.switch(case1, case2, default=RGB(255, 0, 0))
+        self.assertEqual(dco._returnQuery, correct_query)
 
     def test_switch_incorrect_case(self):
         with self.assertRaisesRegex(TypeError, 'All arguments must be instances of the Case class'):
@@ -175,6 +190,209 @@ default return {red: 255; green: 0; blue: 0}
             self.dco.switch(Case(Coverage('coverage1') == 1, RGB(
                 255, 255, 255)), default='incorrect_default')
 
+    def test_execute_many(self):
+        self.dbc.post_query = MagicMock(side_effect=lambda query: query.encode())
+        coverage = Coverage("AvgLandTemp")
+        coverage.set_subset(AxisSubset('ansi', Date(2014, 7)))
+        dcos = [Dco(coverage, dbc=self.dbc).return_expression(method(coverage))
+                for method in (AggregationMethod.max, AggregationMethod.min)]
+        results = Dco.execute_many(dcos, max_workers=2)
+        self.assertEqual(results, [
+            b'for $i0 in (AvgLandTemp) return max($i0[ansi("2014-07")])',
+            b'for $i0 in (AvgLandTemp) return min($i0[ansi("2014-07")])'])
+
+    def test_execute_many_incorrect_type(self):
+        with self.assertRaisesRegex(TypeError, 'All arguments must be instances of the Dco class.'):
+            Dco.execute_many([self.dco, 'incorrect_dco'])
+
+    def test_execute_stream(self):
+        response = MagicMock()
+        response.iter_content.return_value = iter([b"II*\x00", b"raster"])
+        self.dbc.post_query_stream = MagicMock(return_value=response)
+        result = self.dco.return_expression(1).execute(return_format="tiff", stream=True)
+        self.addCleanup(result.close)
+        self.dbc.post_query_stream.assert_called_with(
+            'for $i0 in (AvgLandTemp) return encode(1, "tiff")')
+        self.assertEqual(result.read(), b"II*\x00raster")
+
+    def test_execute_to(self):
+        response = MagicMock()
+        response.iter_content.return_value = iter([b"CDF", b"\x01"])
+        self.dbc.post_query_stream = MagicMock(return_value=response)
+        buffer = io.BytesIO()
+        written = self.dco.return_expression(1).execute_to(buffer, return_format="netcdf")
+        self.assertEqual(written, 4)
+        self.assertEqual(buffer.getvalue(), b"CDF\x01")
+
+    def test_execute_to_failed_request(self):
+        error = {"success": False, "error": {"code": 400}}
+        self.dbc.post_query_stream = MagicMock(return_value=error)
+        self.assertEqual(self.dco.return_expression(1).execute_to(io.BytesIO()), error)
+
+    def test_execute_with_result_cache(self):
+        self.dbc.result_cache = ResultCache()
+        self.dbc.post_query = MagicMock(return_value=b"25.984251")
+        dco = self.dco.return_expression(1)
+        self.assertEqual(dco.execute(), b"25.984251")
+        self.assertEqual(dco.execute(), b"25.984251")
+        self.assertEqual(self.dbc.post_query.call_count, 1)
+        dco.execute(return_format="csv")
+        self.assertEqual(self.dbc.post_query.call_count, 2)
+        dco.execute(use_cache=False)
+        self.assertEqual(self.dbc.post_query.call_count, 3)
+        self.assertEqual(self.dbc.result_cache.hits, 1)
+
+    def test_execute_shares_repeated_subexpressions(self):
+        self.dbc.post_query = MagicMock(side_effect=lambda query: query.encode())
+        coverage = Coverage("AvgLandTemp")
+        coverage.set_subset(AxisSubset('ansi', Date(2014, 7)))
+        difference = coverage - 10
+        dco = self.dco.return_expression(AggregationMethod.avg(difference * difference))
+        self.assertEqual(dco.execute(), b'for $i0 in (AvgLandTemp) let $t0 := ($i0[ansi("2014-07")] - 10) '
+                                        b'return avg(($t0 * $t0))')
+        self.assertEqual(dco.execute(optimize=False), b'for $i0 in (AvgLandTemp) return '
+                                                      b'avg((($i0[ansi("2014-07")] - 10) * ($i0[ansi("2014-07")] - 10)))')
+
+    def test_execute_merges_coverage_bindings(self):
+        self.dbc.post_query = MagicMock(side_effect=lambda query: query.encode())
+        first, second, other = Coverage("AvgLandTemp"), Coverage("AvgLandTemp"), Coverage("S2_NDVI")
+        second.set_subset(AxisSubset('ansi', Date(2014, 7)))
+        dco = Dco(first, second, other, dbc=self.dbc).return_expression(second - other + first)
+        self.assertEqual(dco.execute(), b'for $i0 in (AvgLandTemp)\n$i1 in (S2_NDVI) '
+                                        b'return (($i0[ansi("2014-07")] - $i1) + $i0)')
+
+    def test_execute_binds_coverages_of_the_expression(self):
+        self.dbc.post_query = MagicMock(side_effect=lambda query: query.encode())
+        other = Coverage("S2_NDVI")
+        self.assertEqual(self.dco.return_expression(other * 2).execute(),
+                         b'for $i0 in (AvgLandTemp)\n$i1 in (S2_NDVI) return ($i1 * 2)')
+
+    def test_execute_simplifies_expression(self):
+        self.dbc.post_query = MagicMock(side_effect=lambda query: query.encode())
+        coverage = Coverage("AvgLandTemp")
+        dco = self.dco.return_expression((coverage + 0) * 1)
+        self.assertEqual(dco.execute(), b'for $i0 in (AvgLandTemp) return $i0')
+        self.assertEqual(dco.execute(optimize=False), b'for $i0 in (AvgLandTemp) return (($i0 + 0) * 1)')
+
+    def test_builders_return_new_dco(self):
+        coverage = Coverage("AvgLandTemp")
+        dco = self.dco.return_expression(coverage > 10)
+        self.assertIsNot(dco, self.dco)
+        self.assertEqual(self.dco._returnQuery, '1')
+        self.assertEqual(dco.clip([(1, 2), (3, 4)])._returnQuery, 'clip($i0, POLYGON((1 2,3 4)))')
+        self.assertEqual(dco._returnQuery, '($i0 > 10)')
+
+    def test_execute_with_encoding_twice(self):
+        self.dbc.post_query = MagicMock(side_effect=lambda query: query.encode())
+        dco = self.dco.return_expression(1)
+        expected = b'for $i0 in (AvgLandTemp) return encode(1, "csv")'
+        self.assertEqual(dco.execute(return_format="csv"), expected)
+        self.assertEqual(dco.execute(return_format="csv"), expected)
+        self.assertEqual(dco.execute(), b'for $i0 in (AvgLandTemp) return 1')
+
+    def test_compiled_query_is_cached(self):
+        dco = self.dco.return_expression(AggregationMethod.max(Coverage("AvgLandTemp")))
+        query = dco._build_query("csv")
+        self.assertIs(dco._build_query("csv"), query)
+        self.assertIsNot(dco._build_query(), query)
+        self.assertEqual(dco.return_expression(2)._build_query("csv"),
+                         'for $i0 in (AvgLandTemp) return encode(2, "csv")')
+
+    def test_changed_subset_is_compiled_again(self):
+        self.dbc.post_query = MagicMock(side_effect=lambda query: query.encode())
+        coverage = Coverage("AvgLandTemp")
+        dco = Dco(coverage, dbc=self.dbc).return_expression(coverage)
+        coverage.set_subset(AxisSubset('Lat', 53))
+        self.assertIn(b'$i0[Lat(53)]', dco.execute(return_format="csv"))
+        coverage.set_subset(AxisSubset('Lat', 10))
+        self.assertIn(b'$i0[Lat(10)]', dco.execute(return_format="csv"))
+        coverage.set_subset(AxisSubset('Lat', 53))
+        self.assertIn(b'$i0[Lat(53)]', dco.execute(return_format="csv"))
+
+    def test_template_shared_between_threads(self):
+        self.dbc.post_query = MagicMock(side_effect=lambda query: query.encode())
+        template = self.dco.return_expression(AggregationMethod.max(Coverage("AvgLandTemp")))
+        formats = ["csv", "json", None] * 10
+        dcos = [template] * len(formats)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda pair: pair[0].execute(return_format=pair[1]), zip(dcos, formats)))
+        for return_format, result in zip(formats, results):
+            self.assertEqual(result, template._build_query(return_format).encode())
+
+    def test_execute_as_array(self):
+        self.dbc.post_query = MagicMock(return_value=b"{{1 2 3},{4 5 6}}")
+        coverage = Coverage("AvgLandTemp")
+        coverage.set_subset(AxisSubset('Lat', (35, 75)), AxisSubset('ansi', Date(2014, 7)))
+        result = self.dco.return_expression(coverage).execute(return_format="csv", as_array=True)
+        self.assertEqual(result.shape, (2, 3))
+        self.assertEqual(result.tolist(), [[1, 2, 3], [4, 5, 6]])
+
+    def test_execute_as_array_failed_request(self):
+        error = {"success": False, "error": {"code": 400}}
+        self.dbc.post_query = MagicMock(return_value=error)
+        self.assertEqual(self.dco.return_expression(1).execute(return_format="json", as_array=True), error)
+
+    def test_execute_as_array_requires_text_format(self):
+        with self.assertRaisesRegex(ValueError, "as_array requires"):
+            self.dco.return_expression(1).execute(return_format="png", as_array=True)
+        with self.assertRaisesRegex(ValueError, "as_array requires"):
+            self.dco.return_expression(1).execute(return_format="csv", stream=True, as_array=True)
+
+    def test_execute_mapped(self):
+        from Test.test_helper.test_util.test_raster import tiff_bytes
+        pixels = np.arange(12, dtype=np.float32).reshape(3, 4)
+        payload = tiff_bytes(pixels)
+        response = MagicMock()
+        response.iter_content.side_effect = lambda chunk_size: (
+            payload[i:i + chunk_size] for i in range(0, len(payload), chunk_size))
+        self.dbc.post_query_stream = MagicMock(return_value=response)
+        dco = self.dco.return_expression(1)
+        result = dco.execute_mapped(return_format="tiff", chunk_size=16)
+        self.dbc.post_query_stream.assert_called_with('for $i0 in (AvgLandTemp) return encode(1, "tiff")')
+        np.testing.assert_array_equal(result, pixels)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "result.tiff")
+            np.testing.assert_array_equal(dco.execute_mapped(path=path), pixels)
+            self.assertTrue(os.path.exists(path))
+
+    def test_execute_mapped_errors(self):
+        error = {"success": False, "error": {"code": 400}}
+        self.dbc.post_query_stream = MagicMock(return_value=error)
+        self.assertEqual(self.dco.return_expression(1).execute_mapped(return_format="netcdf"), error)
+        with self.assertRaisesRegex(ValueError, "can't be memory-mapped"):
+            self.dco.return_expression(1).execute_mapped(return_format="png")
+
+    def test_aggregate(self):
+        self.dbc.post_query = MagicMock(return_value=b"{30.5 -2.5 10.25 12}")
+        coverage = Coverage("AvgLandTemp")
+        coverage.set_subset(AxisSubset('Lat', 53.08), AxisSubset('Long', 8.80))
+        result = self.dco.aggregate(coverage, ["max", "min", "avg", "count"])
+        self.assertEqual(result, {"max": 30.5, "min": -2.5, "avg": 10.25, "count": 12})
+        self.assertIsInstance(result["count"], int)
+        self.dbc.post_query.assert_called_once_with(
+            'for $i0 in (AvgLandTemp) let $t0 := $i0[Lat(53.08), Long(8.8)] '
+            'return {b0: max($t0); b1: min($t0); b2: avg($t0); b3: count($t0)}')
+
+    def test_aggregate_with_keys(self):
+        self.dbc.post_query = MagicMock(return_value=b"{25,3}")
+        coverage = Coverage("AvgLandTemp")
+        result = self.dco.aggregate(coverage, {"highest": "max", "warm": AggregationMethod.count(coverage > 15)})
+        self.assertEqual(result, {"highest": 25, "warm": 3})
+        self.dbc.post_query.assert_called_once_with(
+            'for $i0 in (AvgLandTemp) return {b0: max($i0); b1: count(($i0 > 15))}')
+
+    def test_aggregate_errors(self):
+        error = {"success": False, "error": {"code": 400}}
+        self.dbc.post_query = MagicMock(return_value=error)
+        self.assertEqual(self.dco.aggregate(Coverage("AvgLandTemp"), ["max", "min"]), error)
+        with self.assertRaisesRegex(ValueError, "Unknown aggregation"):
+            self.dco.aggregate(Coverage("AvgLandTemp"), ["median"])
+        with self.assertRaisesRegex(ValueError, "At least one"):
+            self.dco.aggregate(Coverage("AvgLandTemp"), [])
+        self.dbc.post_query = MagicMock(return_value=b"{1 2 3}")
+        with self.assertRaisesRegex(ValueError, "3 values"):
+            self.dco.aggregate(Coverage("AvgLandTemp"), ["max", "min"])
+
 
 if __name__ == '__main__':
     unittest.main()
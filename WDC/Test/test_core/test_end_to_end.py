@@ -0,0 +1,75 @@
+# here you can find end-to-end tests, where Dbc and Dco talk HTTP to a local stand-in server
+
+import io
+import pytest
+from WDC.core.coverage import Coverage, AxisSubset
+from WDC.core.dbc import Dbc
+from WDC.core.dco import Dco
+from WDC.core.schema import schema_cache
+from WDC.helper.util.retry import RetryPolicy
+from WDC.testing.server import StandInServer
+
+
+@pytest.fixture
+def server():
+    with StandInServer() as server:
+        yield server
+
+
+class TestEndToEnd:
+    def test_queries_reuse_one_connection(self, server):
+        with Dbc(server_url=server.url) as dbc:
+            dco = Dco(Coverage("AvgLandTemp"), dbc=dbc).return_expression(1)
+            assert [dco.execute() for _ in range(5)] == [b"25.984251"] * 5
+        assert server.stats["requests"] == 5
+        assert server.stats["connections"] == 1
+
+    def test_query_reaches_the_server(self, server):
+        server.responder = lambda query: query.encode()
+        with Dbc(server_url=server.url) as dbc:
+            result = Dco(Coverage("AvgLandTemp"), dbc=dbc).return_expression(1).execute(return_format="csv")
+        assert result == b'for $i0 in (AvgLandTemp) return encode(1, "csv")'
+
+    def test_exception_report(self, server):
+        server.error_rate = 1
+        server.error_status = 400
+        server.exception_code = "InvalidRequest"
+        server.exception_text = "Coverage result must use encode() as it is non-scalar value."
+        with Dbc(server_url=server.url) as dbc:
+            result = dbc.post_query("for $i0 in (AvgLandTemp) return $i0")
+        assert result["error"]["code"] == 400
+        assert result["error"]["exceptionDetail"] == {
+            "exceptionText": "Coverage result must use encode() as it is non-scalar value.",
+            "exceptionCode": "InvalidRequest"}
+
+    def test_retries_against_failing_server(self, server):
+        server.error_rate = 1
+        server.error_status = 503
+        with Dbc(server_url=server.url, retry_policy=RetryPolicy(max_retries=2, backoff_factor=0)) as dbc:
+            result = dbc.post_query("query")
+        assert result["error"]["code"] == 503
+        assert server.stats["requests"] == 3
+
+    def test_batched_queries(self, server):
+        server.latency = 0.05
+        with Dbc(server_url=server.url) as dbc:
+            assert dbc.post_queries(["query"] * 8, max_workers=8) == [b"25.984251"] * 8
+
+    def test_streamed_result(self, server):
+        server.payload = bytes(range(256)) * 4096
+        buffer = io.BytesIO()
+        with Dbc(server_url=server.url) as dbc:
+            written = Dco(Coverage("AvgLandTemp"), dbc=dbc).return_expression(1).execute_to(buffer, "tiff")
+        assert written == len(server.payload)
+        assert buffer.getvalue() == server.payload
+
+    def test_subset_validation_with_describe_coverage(self, server):
+        coverage = Coverage("AvgLandTemp")
+        coverage.set_subset(AxisSubset('Lat', (80, 100)), clamp=True)
+        try:
+            with Dbc(server_url=server.url, validate_subsets=True) as dbc:
+                server.responder = lambda query: query.encode()
+                result = Dco(coverage, dbc=dbc).return_expression(coverage).execute(return_format="csv")
+        finally:
+            schema_cache.clear()
+        assert result == b'for $i0 in (AvgLandTemp) return encode($i0[Lat(80:90)], "csv")'
@@ -0,0 +1,88 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+from WDC.core.coverage import Coverage, AxisSubset
+from WDC.core.dbc import Dbc
+from WDC.core.dco import Dco
+from WDC.helper.operations.numoperations import AggregationMethod
+from WDC.helper.util.cache import ResultCache
+from WDC.helper.util.useful_classes import Date, Param
+
+
+class TestPreparedQuery(unittest.TestCase):
+    def setUp(self):
+        self.dbc = Dbc()
+        self.dbc.post_query = MagicMock(side_effect=lambda query: query.encode())
+        self.coverage = Coverage("AvgLandTemp")
+        self.coverage.set_subset(AxisSubset('Lat', Param('lat')), AxisSubset('Long', Param('lon')),
+                                 AxisSubset('ansi', (Param('start'), Param('end'))))
+        self.dco = Dco(self.coverage, dbc=self.dbc).return_expression(
+            AggregationMethod.max(self.coverage) - Param('offset'))
+
+    def test_bind(self):
+        prepared = self.dco.prepare(return_format="csv")
+        self.assertEqual(prepared.parameters, {'lat', 'lon', 'start', 'end', 'offset'})
+        self.assertEqual(
+            prepared.bind(lat=53.08, lon=8.8, start=Date(2014, 1), end=Date(2014, 12), offset=273.15),
+            'for $i0 in (AvgLandTemp) return encode((max($i0[Lat(53.08), Long(8.8), '
+            'ansi("2014-01":"2014-12")]) - 273.15), "csv")')
+
+    def test_repr_shows_placeholders(self):
+        self.assertEqual(repr(self.dco.prepare()),
+                         'for $i0 in (AvgLandTemp) return (max($i0[Lat({lat}), Long({lon}), '
+                         'ansi({start}:{end})]) - {offset})')
+
+    def test_bind_missing_and_unknown_parameters(self):
+        prepared = self.dco.prepare()
+        with self.assertRaisesRegex(ValueError, 'Missing values for parameters: end, offset.'):
+            prepared.bind(lat=1, lon=2, start=Date(2014))
+        with self.assertRaisesRegex(ValueError, 'Unknown parameters: month.'):
+            prepared.bind(lat=1, lon=2, start=Date(2014), end=Date(2015), offset=0, month=1)
+
+    def test_bind_incorrect_value(self):
+        with self.assertRaisesRegex(TypeError, "The value of parameter 'lat' must be an int, float or Date."):
+            self.dco.prepare().bind(lat='53', lon=2, start=Date(2014), end=Date(2015), offset=0)
+
+    def test_execute_requires_prepare(self):
+        with self.assertRaisesRegex(ValueError, 'The query contains Param placeholders'):
+            self.dco.execute()
+
+    def test_prepared_query_is_independent_of_dco(self):
+        prepared = self.dco.prepare()
+        self.dco = self.dco.return_expression(1)
+        self.assertIn('max(', prepared.bind(lat=1, lon=2, start=Date(2014), end=Date(2015), offset=0))
+
+    def test_execute(self):
+        self.dbc.result_cache = ResultCache()
+        prepared = self.dco.prepare()
+        params = dict(lat=1, lon=2, start=Date(2014), end=Date(2015), offset=0)
+        self.assertEqual(prepared.execute(**params), prepared.bind(**params).encode())
+        prepared.execute(**params)
+        self.assertEqual(self.dbc.post_query.call_count, 1)
+
+    def test_execute_many(self):
+        prepared = self.dco.prepare()
+        param_sets = [dict(lat=lat, lon=2, start=Date(2014), end=Date(2015), offset=0) for lat in range(5)]
+        results = prepared.execute_many(param_sets, max_workers=3)
+        self.assertEqual(results, [prepared.bind(**params).encode() for params in param_sets])
+
+    def test_bind_from_many_threads(self):
+        prepared = self.dco.prepare()
+
+        def bind(lat):
+            return prepared.bind(lat=lat, lon=-lat, start=Date(2000 + lat % 10), end=Date(2015), offset=lat)
+
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            results = list(executor.map(bind, range(2000)))
+        self.assertEqual(results, [bind(lat) for lat in range(2000)])
+
+    def test_param_name(self):
+        with self.assertRaisesRegex(ValueError, 'Parameter names must be valid identifiers.'):
+            Param('not a name')
+        with self.assertRaisesRegex(TypeError, 'The value passed must be a string'):
+            Param(1)
+
+
+if __name__ == '__main__':
+    unittest.main()
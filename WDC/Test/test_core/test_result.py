@@ -0,0 +1,72 @@
+# here you can find tests for labeled query results
+
+import numpy as np
+import pytest
+from unittest.mock import MagicMock
+from WDC.core.coverage import Coverage, AxisSubset
+from WDC.core.dco import Dco
+from WDC.core.result import LabeledResult
+from WDC.helper.operations.numoperations import AggregationMethod
+from WDC.helper.util.useful_classes import Date
+
+
+def execute(dbc, expression, result):
+    dbc.post_query = MagicMock(return_value=result)
+    coverage = Coverage("AvgLandTemp")
+    return Dco(coverage, dbc=dbc).return_expression(expression).execute(
+        return_format="csv", as_array=True, labeled=True)
+
+
+class TestLabeledResult:
+    def test_cell_centers(self, dbc):
+        coverage = Coverage("AvgLandTemp")
+        coverage.set_subset(AxisSubset('ansi', Date(2014, 7)), AxisSubset('Lat', (50.05, 50.25)),
+                            AxisSubset('Long', (8.05, 8.15)))
+        result = execute(dbc, coverage, b"{{1,2},{3,4},{5,6}}")
+        assert result.dims == ('Lat', 'Long')
+        np.testing.assert_allclose(result.coords['Lat'], [50.25, 50.15, 50.05])
+        np.testing.assert_allclose(result.coords['Long'], [8.05, 8.15])
+
+    def test_month_range(self, dbc):
+        coverage = Coverage("AvgLandTemp")
+        coverage.set_subset(AxisSubset('ansi', (Date(2014, 1), Date(2014, 3))), AxisSubset('Lat', 53.08),
+                            AxisSubset('Long', 8.80))
+        result = execute(dbc, coverage, b"{1.5,2.5,3.5}")
+        assert result.dims == ('ansi',)
+        np.testing.assert_array_equal(result.coords['ansi'], np.array(['2014-01', '2014-02', '2014-03'],
+                                                                      dtype='datetime64[M]'))
+
+    def test_labels_are_lazy(self, dbc):
+        coverage = Coverage("AvgLandTemp")
+        coverage.set_subset(AxisSubset('ansi', Date(2014, 7)), AxisSubset('Lat', (50.05, 50.15)),
+                            AxisSubset('Long', 8.80))
+        result = execute(dbc, coverage, b"{1,2}")
+        np.testing.assert_array_equal(np.asarray(result), [1, 2])
+        dbc.post_request.assert_not_called()
+        assert result.coords['Lat'] is result.coords['Lat']
+        dbc.post_request.assert_called_once()
+
+    def test_scalar(self, dbc):
+        result = execute(dbc, AggregationMethod.max(Coverage("AvgLandTemp")), b"25.98")
+        assert result.dims == ()
+        assert result.coords == {}
+        dbc.post_request.assert_not_called()
+
+    def test_bands(self, dbc):
+        coverage = Coverage("AvgLandTemp")
+        coverage.set_subset(AxisSubset('ansi', Date(2014, 7)), AxisSubset('Lat', 53.08),
+                            AxisSubset('Long', (8.05, 8.15)))
+        result = execute(dbc, coverage, b'{"1 2 3","4 5 6"}')
+        assert result.dims == ('Long', 'band')
+        np.testing.assert_array_equal(result.coords['band'], [0, 1, 2])
+
+    def test_dimensions_do_not_match(self, dbc):
+        coverage = Coverage("AvgLandTemp")
+        coverage.set_subset(AxisSubset('ansi', Date(2014, 7)), AxisSubset('Lat', (50.05, 50.15)))
+        result = LabeledResult(np.zeros(3), coverage, dbc)
+        with pytest.raises(ValueError, match="keeps the axes Lat, Long"):
+            result.dims
+
+    def test_labeled_requires_as_array(self, dbc):
+        with pytest.raises(ValueError, match="labeled requires as_array"):
+            Dco(Coverage("AvgLandTemp"), dbc=dbc).return_expression(1).execute(return_format="csv", labeled=True)
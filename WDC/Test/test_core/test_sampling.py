@@ -0,0 +1,87 @@
+# here you can find tests for sampling coverages at points
+
+import numpy as np
+import pytest
+from unittest.mock import MagicMock
+from WDC.core.coverage import Coverage, AxisSubset
+from WDC.core.dco import Dco
+from WDC.core.sampling import box_array, group_points
+from WDC.helper.util.retry import RetryPolicy
+from WDC.helper.util.useful_classes import Date
+from .stubs import answer
+
+
+@pytest.fixture
+def coverage():
+    coverage = Coverage("AvgLandTemp")
+    coverage.set_subset(AxisSubset('ansi', Date(2014, 7)))
+    return coverage
+
+
+def expected(points):
+    """Returns the values `answer` gives the cells of the points: row * 10000 + column."""
+    return [int((90 - lat) // 0.1) * 10000 + int((long + 180) // 0.1) for lat, long in points]
+
+
+class TestGroupPoints:
+    def test_nearby_points_share_a_box(self):
+        cells = np.array([[10, 10], [12, 15], [70, 10], [11, 11]])
+        boxes = group_points(cells, 64)
+        assert len(boxes) == 2
+        points, first, last = boxes[0]
+        assert points.tolist() == [0, 1, 3]
+        assert first.tolist() == [10, 10] and last.tolist() == [12, 15]
+        assert boxes[1][0].tolist() == [2]
+
+    def test_box_array_restores_single_cell_axes(self):
+        array = np.array([1, 2, 3])
+        assert box_array(array, ['Lat', 'Long'], {'Lat': 1, 'Long': 3}).shape == (1, 3)
+        assert box_array(np.array(7), ['Lat', 'Long'], {'Lat': 1, 'Long': 1}).shape == (1, 1)
+        with pytest.raises(ValueError):
+            box_array(array, ['Lat', 'Long'], {'Lat': 2, 'Long': 2})
+
+
+class TestSample:
+    def test_values_in_point_order(self, dbc, coverage):
+        points = [(53.08, 8.80), (-33.91, 18.42), (53.12, 8.91), (53.08, 8.81)]
+        result = Dco(coverage, dbc=dbc).sample(coverage, points)
+        assert result.tolist() == expected(points)
+        # the two Bremen points share one box, Cape Town gets its own
+        assert dbc.post_query.call_count == 2
+
+    def test_box_query(self, dbc, coverage):
+        Dco(coverage, dbc=dbc).sample(coverage, [(53.08, 8.80), (53.12, 8.91)])
+        dbc.post_query.assert_called_once_with(
+            'for $i0 in (AvgLandTemp) return encode($i0[ansi("2014-07"), Lat(53.05:53.15), Long(8.85:8.95)], "csv")')
+
+    def test_small_boxes(self, dbc, coverage):
+        points = [(50.01 + index * 0.1, 8.01) for index in range(10)]
+        result = Dco(coverage, dbc=dbc).sample(coverage, points, box_size=4)
+        assert result.tolist() == expected(points)
+        assert dbc.post_query.call_count == 3
+
+    def test_single_cell_box(self, dbc, coverage):
+        dbc.post_query = MagicMock(return_value=b"{12.5}")
+        result = Dco(coverage, dbc=dbc).sample(coverage, [(53.08, 8.80)])
+        assert result.tolist() == [12.5]
+
+    def test_time(self, dbc, coverage):
+        Dco(coverage, dbc=dbc).sample(Coverage("AvgLandTemp"), [(53.08, 8.80)], time=Date(2015, 1))
+        assert 'ansi("2015-01")' in dbc.post_query.call_args[0][0]
+
+    def test_failed_box_is_retried(self, dbc, coverage):
+        error = {"success": False, "error": {"code": 503}}
+        dbc.post_query = MagicMock(side_effect=[error, answer(
+            'Lat(53.05:53.05) Long(8.85:8.85)')])
+        policy = RetryPolicy(max_retries=1, backoff_factor=0)
+        result = Dco(coverage, dbc=dbc).sample(coverage, [(53.08, 8.80)], retry_policy=policy)
+        assert result.tolist() == expected([(53.08, 8.80)])
+
+    def test_invalid_points(self, dbc, coverage):
+        dco = Dco(coverage, dbc=dbc)
+        with pytest.raises(ValueError, match="Points must be"):
+            dco.sample(coverage, [])
+        with pytest.raises(ValueError, match="Points must be"):
+            dco.sample(coverage, [(53.08, 8.80, 1)])
+        with pytest.raises(ValueError, match="outside of the coverage"):
+            dco.sample(coverage, [(53.08, 8.80), (95, 8.80)])
@@ -0,0 +1,119 @@
+# here you can find tests for the DescribeCoverage schema cache and the client-side subset validation
+
+import threading
+
+import pytest
+from unittest.mock import MagicMock
+from WDC.core.coverage import Coverage, AxisSubset
+from WDC.core.dco import Dco
+from WDC.core.schema import CoverageSchema, schema_cache
+from WDC.helper.error_handling.err import NetworkRequestError
+from WDC.helper.util.useful_classes import Date
+from .stubs import DESCRIBE_COVERAGE
+
+
+@pytest.fixture
+def schema():
+    return CoverageSchema.from_describe_coverage(DESCRIBE_COVERAGE)
+
+
+@pytest.fixture
+def dbc(dbc):
+    dbc.validate_subsets = True
+    dbc.post_query = MagicMock(return_value=b"25.984251")
+    return dbc
+
+
+class TestCoverageSchema:
+    def test_parse_describe_coverage(self, schema):
+        assert schema.coverage_id == "AvgLandTemp"
+        assert schema.axis_labels == ["ansi", "Lat", "Long"]
+        assert schema.lower_bounds == ["2000-02-01T00:00:00.000Z", -90, -180]
+        assert schema.upper_bounds == ["2015-06-01T00:00:00.000Z", 90, 180]
+        assert schema.resolution == [1, -0.1, 0.1]
+        assert schema.grid_size == [185, 1800, 3600]
+        assert schema.cell_types == ["float32"]
+        assert schema.crs.startswith("http://localhost:8080/def/crs-compound")
+
+    def test_unknown_axis(self, schema):
+        with pytest.raises(ValueError, match="Axis 'Latitude' does not exist"):
+            schema.validate_subset(AxisSubset('Latitude', 10))
+
+    def test_valid_subsets_are_kept(self, schema):
+        axes = [AxisSubset('Lat', (35, 75)), AxisSubset('ansi', Date(2014, 7))]
+        assert schema.validate_axes(axes) == axes
+
+    def test_out_of_range_date(self, schema):
+        with pytest.raises(ValueError, match="outside the extent"):
+            schema.validate_subset(AxisSubset('ansi', Date(2016, 1)))
+
+    def test_exceeding_trim_is_clamped(self, schema):
+        clamped = schema.validate_subset(AxisSubset('ansi', (Date(1990, 1), Date(2014, 12))), clamp=True)
+        assert clamped.get_axis_with_interval() == 'ansi("2000-02":"2014-12")'
+        clamped = schema.validate_subset(AxisSubset('Lat', (10, 120)), clamp=True)
+        assert clamped.get_axis_with_interval() == 'Lat(10:90)'
+
+    def test_exceeding_trim_without_clamp(self, schema):
+        with pytest.raises(ValueError, match="exceeds the extent"):
+            schema.validate_subset(AxisSubset('Lat', (10, 120)))
+
+    def test_wrong_value_type(self, schema):
+        with pytest.raises(TypeError):
+            schema.validate_subset(AxisSubset('ansi', 2014))
+
+
+class TestSchemaCache:
+    def test_schema_is_fetched_once(self, dbc):
+        schema_cache.get(dbc, "AvgLandTemp")
+        schema_cache.get(dbc, "AvgLandTemp")
+        dbc.post_request.assert_called_once_with(request='DescribeCoverage', coverageId="AvgLandTemp")
+
+    def test_failed_request(self, dbc):
+        dbc.post_request.return_value = {"success": False, "error": {"exceptionDetail": "NoSuchCoverage"}}
+        with pytest.raises(NetworkRequestError):
+            schema_cache.get(dbc, "Missing")
+
+    def test_schemas_are_fetched_per_coverage(self, dbc):
+        started, release = threading.Event(), threading.Event()
+
+        def post_request(request, coverageId):
+            if coverageId == "Slow":
+                started.set()
+                release.wait(5)
+            return DESCRIBE_COVERAGE
+
+        dbc.post_request = MagicMock(side_effect=post_request)
+        slow = threading.Thread(target=schema_cache.get, args=(dbc, "Slow"))
+        slow.start()
+        try:
+            started.wait(5)
+            # another coverage doesn't wait for the DescribeCoverage of the slow one
+            assert schema_cache.get(dbc, "AvgLandTemp").coverage_id == "AvgLandTemp"
+        finally:
+            release.set()
+            slow.join()
+
+    def test_set_subset_does_not_validate(self, dbc):
+        # the cached schema may come from another server than the one the coverage is queried on
+        schema_cache.get(dbc, "AvgLandTemp")
+        coverage = Coverage("AvgLandTemp")
+        coverage.set_subset(AxisSubset('Lat', (80, 95)), clamp=True)
+        assert coverage.subset == '[Lat(80:95)]'
+
+
+class TestDcoValidation:
+    def test_invalid_query_never_reaches_the_server(self, dbc):
+        coverage = Coverage("AvgLandTemp")
+        coverage.set_subset(AxisSubset('Lat', 53.08), AxisSubset('Lon', 8.80))
+        with pytest.raises(ValueError, match="Axis 'Lon' does not exist"):
+            Dco(coverage, dbc=dbc).return_expression(coverage).execute()
+        dbc.post_query.assert_not_called()
+
+    def test_subset_is_clamped_before_execution(self, dbc):
+        coverage = Coverage("AvgLandTemp")
+        coverage.set_subset(AxisSubset('ansi', (Date(2014, 1), Date(2020, 12))), clamp=True)
+        Dco(coverage, dbc=dbc).return_expression(coverage).execute(return_format="csv")
+        dbc.post_query.assert_called_with(
+            'for $i0 in (AvgLandTemp) return encode($i0[ansi("2014-01":"2015-06")], "csv")')
+        # the coverage of the caller keeps its subset
+        assert coverage.subset == '[ansi("2014-01":"2020-12")]'
@@ -0,0 +1,90 @@
+# here you can find tests for the tiled execution of queries
+
+import numpy as np
+import pytest
+from unittest.mock import MagicMock
+from WDC.core.coverage import Coverage, AxisSubset
+from WDC.core.dco import Dco
+from WDC.core.schema import CoverageSchema
+from WDC.core.tiling import plan_tiles
+from WDC.helper.operations.nodes import freeze
+from WDC.helper.operations.numoperations import AggregationMethod
+from WDC.helper.util.retry import RetryPolicy
+from WDC.helper.util.useful_classes import Date
+from .stubs import DESCRIBE_COVERAGE, answer
+
+
+@pytest.fixture
+def coverage():
+    coverage = Coverage("AvgLandTemp")
+    coverage.set_subset(AxisSubset('ansi', Date(2014, 7)), AxisSubset('Lat', (50, 51.03)),
+                        AxisSubset('Long', (8, 8.75)))
+    return coverage
+
+
+class TestPlanTiles:
+    def test_tile_size(self, coverage):
+        schema = CoverageSchema.from_describe_coverage(DESCRIBE_COVERAGE)
+        lat, long = plan_tiles(coverage, schema, tile_size={'Lat': 4})
+        assert (lat.count, long.count) == (11, 8)
+        assert [(offset, length) for offset, length, _ in lat.pieces] == [(0, 4), (4, 4), (8, 3)]
+        assert [bounds for _, _, bounds in lat.pieces] == [(50.75, 51.03), (50.35, 50.65), (50, 50.25)]
+        assert len(long.pieces) == 1
+
+    def test_byte_budget(self, coverage):
+        schema = CoverageSchema.from_describe_coverage(DESCRIBE_COVERAGE)
+        lat, long = plan_tiles(coverage, schema, max_bytes=4 * 30)
+        assert max(length for _, length, _ in lat.pieces) * max(length for _, length, _ in long.pieces) <= 30
+
+    def test_no_limit(self, coverage):
+        schema = CoverageSchema.from_describe_coverage(DESCRIBE_COVERAGE)
+        with pytest.raises(ValueError, match="Either tile_size or max_bytes"):
+            plan_tiles(coverage, schema)
+
+
+class TestExecuteTiled:
+    def test_tiles_match_single_query(self, dbc, coverage):
+        dco = Dco(coverage, dbc=dbc).return_expression(coverage * 2)
+        whole = dco.execute(return_format="csv", as_array=True)
+        dbc.post_query.reset_mock()
+        tiled = dco.execute_tiled(tile_size=3, max_workers=4)
+        assert dbc.post_query.call_count == 12
+        np.testing.assert_array_equal(tiled, whole)
+
+    def test_frozen_expression(self, dbc, coverage):
+        dco = Dco(coverage, dbc=dbc).return_expression(freeze(coverage + 1))
+        np.testing.assert_array_equal(dco.execute_tiled(tile_size=5),
+                                      dco.execute(return_format="csv", as_array=True))
+
+    def test_failed_tiles_are_retried_alone(self, dbc, coverage):
+        failures = {"count": 0}
+
+        def flaky(query):
+            if 'Lat(50:50.25)' in query and failures["count"] < 2:
+                failures["count"] += 1
+                return {"success": False, "error": {"code": 503}}
+            return answer(query)
+
+        dbc.post_query = MagicMock(side_effect=flaky)
+        dco = Dco(coverage, dbc=dbc).return_expression(coverage)
+        result = dco.execute_tiled(tile_size={'Lat': 4}, retry_policy=RetryPolicy(backoff_factor=0))
+        assert result.shape == (11, 8)
+        assert dbc.post_query.call_count == 3 + 2
+
+    def test_tile_failing_every_attempt(self, dbc, coverage):
+        error = {"success": False, "error": {"code": 503}}
+        dbc.post_query = MagicMock(return_value=error)
+        dco = Dco(coverage, dbc=dbc).return_expression(coverage)
+        assert dco.execute_tiled(tile_size=4, retry_policy=RetryPolicy(max_retries=1, backoff_factor=0)) == error
+
+    def test_aggregations_are_rejected(self, dbc, coverage):
+        dco = Dco(coverage, dbc=dbc).return_expression(AggregationMethod.avg(coverage))
+        with pytest.raises(ValueError, match="Aggregations"):
+            dco.execute_tiled(tile_size=4)
+
+    def test_coverages_trimmed_differently(self, dbc, coverage):
+        other = Coverage("AvgLandTemp")
+        other.set_subset(AxisSubset('ansi', Date(2014, 8)), AxisSubset('Lat', (50, 51)), AxisSubset('Long', (8, 8.75)))
+        dco = Dco(coverage, dbc=dbc).return_expression(coverage - other)
+        with pytest.raises(ValueError, match="not trimmed like"):
+            dco.execute_tiled(tile_size=4)
@@ -47,3 +47,66 @@ class TestReturnFormat:
         input_value = "not_available"
         with pytest.raises(KeyError):
             data_format_exists(input_value)
+
+
+class TestOperandTypeCheck:
+    """Unit tests for the operand check and deferred validation"""
+
+    def test_subclasses_are_allowed(self):
+        """Subclasses of registered classes are operands, bool and unknown classes are not"""
+        from WDC.core.coverage import Coverage
+        from WDC.helper.error_handling.type_checks import type_check_for_binary_and_numeric_operations
+
+        class NamedCoverage(Coverage):
+            pass
+
+        type_check_for_binary_and_numeric_operations(NamedCoverage("AvgLandTemp"))
+        for value in (True, 'string', None):
+            with pytest.raises(TypeError, match='The type of the instance you passed is not allowed.'):
+                type_check_for_binary_and_numeric_operations(value)
+
+    def test_register_operand_type(self):
+        """Registered classes become operands"""
+        from WDC.helper.error_handling.type_checks import register_operand_type, is_operand_type
+
+        class Literal:
+            pass
+
+        assert not is_operand_type(Literal)
+        register_operand_type(Literal)
+        assert is_operand_type(Literal)
+
+    def test_deferred_validation(self):
+        """Operators skip the check inside deferred_validation and the tree is checked as a whole"""
+        from WDC.core.coverage import Coverage
+        from WDC.helper.error_handling.type_checks import deferred_validation, validate_expression
+
+        coverage = Coverage("AvgLandTemp")
+        with deferred_validation():
+            expression = (coverage + 1) * 'string'
+        with pytest.raises(TypeError):
+            coverage * 'string'
+        with pytest.raises(TypeError, match='The type of the instance you passed is not allowed.'):
+            validate_expression(expression)
+        validate_expression((coverage + 1) * 2)
+
+    def test_dco_validates_deferred_expressions(self):
+        """Dco checks the expression when it builds the query"""
+        from WDC.core.coverage import Coverage
+        from WDC.core.dbc import Dbc
+        from WDC.core.dco import Dco
+        from WDC.core.switch import Case
+        from WDC.helper.error_handling.type_checks import deferred_validation
+        from WDC.helper.operations.numoperations import AggregationMethod
+        from WDC.helper.util.useful_classes import RGB
+
+        coverage = Coverage("AvgLandTemp")
+        dco = Dco(coverage, dbc=Dbc())
+        with deferred_validation():
+            dco = dco.return_expression(AggregationMethod.max(coverage - None))
+        with pytest.raises(TypeError):
+            dco.execute()
+        with deferred_validation():
+            dco = dco.switch(Case(coverage > 1, 'red'), default=RGB(0, 0, 0))
+        with pytest.raises(TypeError):
+            dco.execute()
@@ -0,0 +1,100 @@
+# unit testing for immutable expression nodes
+
+import pickle
+import pytest
+from unittest.mock import MagicMock
+from WDC.core.coverage import Coverage, AxisSubset
+from WDC.core.dbc import Dbc
+from WDC.core.dco import Dco
+from WDC.core.switch import Case, Switch
+from WDC.helper.operations.nodes import Node, freeze
+from WDC.helper.operations.numoperations import AggregationMethod, MathOperation, RangeConstructor
+from WDC.helper.util.useful_classes import Date, RGB
+
+
+@pytest.fixture
+def coverage():
+    coverage = Coverage("AvgLandTemp")
+    coverage.set_subset(AxisSubset('ansi', Date(2014, 7)))
+    return coverage
+
+
+class TestNode:
+    """Unit tests for Node and freeze."""
+
+    def test_text_matches_expression(self, coverage):
+        """A frozen expression is written exactly like the expression it was created from."""
+        expression = AggregationMethod.avg(MathOperation.pow(coverage - 273.15, 2)) / 2
+        assert str(freeze(expression)) == str(expression)
+
+    def test_identical_subtrees_are_interned(self, coverage):
+        """Separately built identical expressions are frozen into the same node."""
+        other = Coverage("AvgLandTemp")
+        other.set_subset(AxisSubset('ansi', Date(2014, 7)))
+        first, second = freeze((coverage + 1) * 2), freeze((other + 1) * 2)
+        assert first is second
+        assert first.children[0] is freeze(coverage + 1)
+
+    def test_range_constructor(self, coverage):
+        """Frozen range constructors keep their band names and are interned with them."""
+        bands = RangeConstructor(['b0', 'b1'], [AggregationMethod.max(coverage), AggregationMethod.min(coverage)])
+        frozen = freeze(bands)
+        assert str(frozen) == str(bands)
+        assert freeze(RangeConstructor(['b0', 'b1'], bands.components)) is frozen
+        assert freeze(RangeConstructor(['c0', 'c1'], bands.components)) is not frozen
+
+    def test_different_literals(self, coverage):
+        """Literals of different types are different nodes."""
+        assert freeze(coverage + 1) is not freeze(coverage + 1.0)
+
+    def test_dictionary_keys(self, coverage):
+        """Nodes work as dictionary keys with structural equality."""
+        results = {freeze(AggregationMethod.max(coverage)): 25.98}
+        assert results[freeze(AggregationMethod.max(coverage))] == 25.98
+        assert hash(freeze(coverage * 2)) == hash(freeze(coverage * 2))
+
+    def test_immutable(self, coverage):
+        """Attributes of a node can't be changed."""
+        node = freeze(coverage + 1)
+        with pytest.raises(AttributeError, match='Node objects are immutable.'):
+            node.label = '-'
+
+    def test_coverage_is_copied(self, coverage):
+        """Changing a coverage after freezing doesn't change the frozen expression."""
+        node = freeze(coverage * 2)
+        text = str(node)
+        coverage.set_subset(AxisSubset('ansi', Date(2015, 1)))
+        assert str(node) == text
+
+    def test_switch_text_is_memoized(self, coverage):
+        """Shared subtrees of a switch keep their text."""
+        switch = freeze(Switch(Case(coverage > 10, RGB(255, 0, 0)), Case(coverage < 0, RGB(0, 0, 255)),
+                               default=RGB(0, 0, 0)))
+        text = str(switch)
+        assert switch.children[0].children[0].children[0]._text == str(coverage)
+        assert str(switch) is text
+
+    def test_pickle(self, coverage):
+        """Unpickled nodes are interned again."""
+        node = freeze(coverage + 1)
+        assert pickle.loads(pickle.dumps(node)) is node
+
+    def test_deep_tree(self, coverage):
+        """Trees deeper than the recursion limit are frozen and written."""
+        expression = coverage
+        for _ in range(20000):
+            expression = expression + 1
+        node = freeze(expression)
+        assert node.size == 40001
+        assert str(node) == str(expression)
+
+    def test_dco_accepts_nodes(self, coverage):
+        """Frozen expressions compile to the same query as the original ones."""
+        dbc = Dbc()
+        dbc.post_query = MagicMock(side_effect=lambda query: query.encode())
+        difference = coverage - 10
+        expression = AggregationMethod.avg(difference * difference)
+        dco = Dco(Coverage("AvgLandTemp"), dbc=dbc)
+        expected = dco.return_expression(expression).execute()
+        assert dco.return_expression(freeze(expression)).execute() == expected
+        assert b'let $t0' in expected
@@ -0,0 +1,40 @@
+# unit testing for the coverage planner
+
+from WDC.core.coverage import Coverage
+from WDC.helper.operations.planner import VariableAllocator, plan_coverages
+
+
+class TestVariableAllocator:
+    """Unit tests for the VariableAllocator class."""
+
+    def test_names_are_unique_per_prefix(self):
+        """Names are numbered from 0 separately for every prefix."""
+        allocator = VariableAllocator()
+        assert [allocator.allocate() for _ in range(3)] == ['$i0', '$i1', '$i2']
+        assert allocator.allocate('$t') == '$t0'
+        assert allocator.allocate() == '$i3'
+
+
+class TestPlanCoverages:
+    """Unit tests for plan_coverages."""
+
+    def test_same_name_shares_a_variable(self):
+        """Coverage objects of the same coverage get one binding."""
+        first, second = Coverage("AvgLandTemp"), Coverage("AvgLandTemp")
+        bindings, variables = plan_coverages([first, second])
+        assert bindings == [('$i0', 'AvgLandTemp')]
+        assert variables == {id(first): '$i0', id(second): '$i0'}
+
+    def test_expression_coverages_are_bound_after_the_given_ones(self):
+        """Coverages only used in the expression get their own variables."""
+        first, other = Coverage("AvgLandTemp"), Coverage("S2_NDVI")
+        bindings, variables = plan_coverages([first], other + Coverage("AvgLandTemp"))
+        assert bindings == [('$i0', 'AvgLandTemp'), ('$i1', 'S2_NDVI')]
+        assert variables[id(other)] == '$i1'
+
+    def test_shared_allocator(self):
+        """An allocator passed in continues its numbering."""
+        allocator = VariableAllocator()
+        allocator.allocate()
+        bindings, _ = plan_coverages([Coverage("AvgLandTemp")], allocator=allocator)
+        assert bindings == [('$i1', 'AvgLandTemp')]
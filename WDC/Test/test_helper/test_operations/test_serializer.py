@@ -0,0 +1,78 @@
+# unit testing for the query serializer
+
+import io
+import pytest
+from WDC.core.coverage import Coverage
+from WDC.core.switch import Case, Switch
+from WDC.helper.operations.nodes import freeze
+from WDC.helper.operations.numoperations import AggregationMethod, MathOperation, RangeConstructor
+from WDC.helper.operations.serializer import serialize, serialize_into
+from WDC.helper.util.useful_classes import RGB
+
+
+@pytest.fixture
+def coverage():
+    return Coverage("AvgLandTemp")
+
+
+class TestSerializer:
+    """Unit tests for serialize and serialize_into."""
+
+    def test_matches_nested_formatting(self, coverage):
+        """The serialized text is the same as the old recursive string formatting."""
+        expression = AggregationMethod.avg(MathOperation.pow(coverage + 1, 2) / (coverage - 3))
+        assert serialize(expression) == f'avg((pow(({coverage} + 1), 2) / ({coverage} - 3)))'
+
+    def test_switch(self, coverage):
+        """Switches are serialized with one case per line."""
+        switch = Switch(Case(coverage > 10, RGB(255, 0, 0)), default=RGB(0, 0, 0))
+        assert serialize(switch) == (f'switch\ncase ({coverage} > 10) return {RGB(255, 0, 0)}\n'
+                                     f'default return {RGB(0, 0, 0)}\n')
+        assert str(switch) == serialize(switch)
+
+    def test_range_constructor(self, coverage):
+        """Range constructors are written as named bands in braces."""
+        bands = RangeConstructor(['b0', 'b1'], [AggregationMethod.max(coverage), AggregationMethod.min(coverage)])
+        assert serialize(bands) == f'{{b0: max({coverage}); b1: min({coverage})}}'
+        with pytest.raises(ValueError):
+            RangeConstructor(['b0'], [1, 2])
+        with pytest.raises(ValueError):
+            RangeConstructor(['max value'], [1])
+
+    def test_literals(self):
+        """Leaves that aren't query nodes are written with str()."""
+        assert serialize(5) == '5'
+        assert serialize('$i0') == '$i0'
+
+    def test_serialize_into_buffer(self, coverage):
+        """serialize_into writes into a caller's buffer."""
+        buffer = io.StringIO()
+        buffer.write('return ')
+        serialize_into(coverage * 2, buffer.write)
+        assert buffer.getvalue() == f'return ({coverage} * 2)'
+
+    def test_memoized_text_with_variables(self, coverage):
+        """Frozen subtrees without coverages are written from their memoized text."""
+        constant = freeze(MathOperation.sqrt(2) * 3)
+        node = freeze(coverage + MathOperation.sqrt(2) * 3)
+        assert constant._text is None
+        assert serialize(node, variables={id(node.children[0].value): '$c'}) == '($c + (sqrt(2) * 3))'
+        assert constant._text == '(sqrt(2) * 3)'
+
+    def test_deep_left_chain(self, coverage):
+        """Chains far deeper than the recursion limit are serialized."""
+        expression = coverage
+        for _ in range(20000):
+            expression = expression + 1
+        text = str(expression)
+        assert text.startswith('(' * 20000 + str(coverage) + ' + 1)')
+        assert text.count('+ 1)') == 20000
+
+    def test_deep_right_chain(self, coverage):
+        """Right-nested trees and functions deeper than the recursion limit are serialized."""
+        expression = coverage
+        for _ in range(10000):
+            expression = MathOperation.abs(coverage - expression)
+        text = str(expression)
+        assert text.startswith(f'abs(({coverage} - abs(')
+        assert text.endswith(')' * 20000)
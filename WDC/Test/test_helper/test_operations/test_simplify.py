@@ -0,0 +1,106 @@
+# unit testing for expression simplification
+
+import pytest
+from WDC.core.coverage import Coverage
+from WDC.core.switch import Case, Switch
+from WDC.helper.operations.binary_expressions import BinaryArithmeticOperation, BinaryComparisonOperation
+from WDC.helper.operations.nodes import Node, freeze
+from WDC.helper.operations.numoperations import AggregationMethod, MathOperation
+from WDC.helper.operations.simplify import simplify
+from WDC.helper.util.useful_classes import RGB
+
+
+@pytest.fixture
+def coverage():
+    return Coverage("AvgLandTemp")
+
+
+def literal_operation(left, operator, right):
+    return BinaryArithmeticOperation(left, operator, right)
+
+
+class TestSimplify:
+    """Unit tests for simplify."""
+
+    def test_generated_expression(self, coverage):
+        """The identities in a typical generated expression are removed and literals folded."""
+        expression = ((coverage + 0) * 1) + literal_operation(273.15, '-', 0)
+        assert str(simplify(expression)) == f'({coverage} + 273.15)'
+
+    @pytest.mark.parametrize("left, operator, right, expected", [
+        (2, '+', 3, 5),
+        (2, '-', 3.5, -1.5),
+        (4, '*', 2, 8),
+        (7, '/', 2, 3.5),
+    ])
+    def test_folds_literals(self, left, operator, right, expected):
+        """Arithmetic on two literals becomes one literal."""
+        assert simplify(literal_operation(left, operator, right)) == expected
+
+    @pytest.mark.parametrize("left, operator, right", [
+        (1, '/', 0),
+        (2 ** 62, '*', 4),
+        (1e308, '*', 10.0),
+    ])
+    def test_leaves_undefined_results_to_the_server(self, left, operator, right):
+        """Division by zero and overflows are not folded."""
+        expression = literal_operation(left, operator, right)
+        assert simplify(expression) is expression
+
+    @pytest.mark.parametrize("build", [
+        lambda c: c + 0,
+        lambda c: literal_operation(0, '+', c),
+        lambda c: c - 0,
+        lambda c: c * 1,
+        lambda c: literal_operation(1.0, '*', c),
+        lambda c: c / 1,
+    ])
+    def test_identities(self, build, coverage):
+        """Operations with their neutral element are removed."""
+        assert simplify(build(coverage)) is coverage
+
+    def test_multiplication_by_zero(self, coverage):
+        """x * 0 becomes 0 for scalars but not for coverages."""
+        assert simplify(AggregationMethod.avg(coverage) * 0) == 0
+        expression = coverage * 0
+        assert simplify(expression) is expression
+
+    def test_nested_functions(self, coverage):
+        """Redundant outer functions are removed."""
+        assert str(simplify(MathOperation.floor(MathOperation.round(coverage)))) == f'round({coverage})'
+        assert str(simplify(MathOperation.abs(MathOperation.sqrt(coverage)))) == f'sqrt({coverage})'
+        expression = MathOperation.sqrt(MathOperation.abs(coverage))
+        assert simplify(expression) is expression
+
+    def test_folds_functions_of_literals(self):
+        """abs, floor and ceil of a literal are folded."""
+        assert simplify(MathOperation('abs', -3)) == 3
+        assert simplify(MathOperation.floor(literal_operation(5, '/', 2))) == 2
+
+    def test_original_is_unchanged(self, coverage):
+        """Simplifying builds new nodes instead of changing the expression."""
+        expression = AggregationMethod.max((coverage + 0) * 2)
+        text = str(expression)
+        simplified = simplify(expression)
+        assert str(simplified) == f'max(({coverage} * 2))'
+        assert str(expression) == text
+
+    def test_switch(self, coverage):
+        """Cases and the default of a switch are simplified."""
+        switch = Switch(Case(BinaryComparisonOperation(coverage + 0, '>', 10), RGB(0, 0, 0)), default=coverage * 1)
+        assert str(simplify(switch)) == f'switch\ncase ({coverage} > 10) return {RGB(0, 0, 0)}\ndefault return {coverage}\n'
+
+    def test_frozen_expression(self, coverage):
+        """Frozen expressions are simplified into frozen nodes."""
+        assert simplify(freeze((coverage + 0) * 1)) is freeze(coverage)
+        assert simplify(freeze(coverage * literal_operation(2, '+', 3))) is freeze(coverage * 5)
+        assert simplify(freeze(MathOperation.abs(MathOperation.sqrt(coverage)))) is freeze(MathOperation.sqrt(coverage))
+        zero = simplify(freeze(AggregationMethod.avg(coverage) * 0))
+        assert type(zero) is Node and zero.value == 0
+
+    def test_deep_tree(self, coverage):
+        """Trees deeper than the recursion limit are simplified."""
+        expression = coverage
+        for _ in range(20000):
+            expression = expression * 1
+        assert simplify(expression) is coverage
@@ -0,0 +1,26 @@
+# unit testing for the compact layout of the query-model classes
+
+import pytest
+from WDC.core.coverage import Coverage, AxisSubset
+from WDC.core.switch import Case
+from WDC.helper.operations.numoperations import AggregationMethod, MathOperation
+from WDC.helper.util.useful_classes import Date, RGB
+
+coverage = Coverage("AvgLandTemp")
+
+
+@pytest.mark.parametrize("instance", [
+    Date(2014, 7, 1),
+    RGB(255, 0, 0),
+    AxisSubset('Lat', (35, 75)),
+    Case(coverage > 10, RGB(255, 0, 0)),
+    coverage + 1,
+    coverage > 1,
+    AggregationMethod.max(coverage),
+    MathOperation.abs(coverage),
+])
+def test_instances_have_no_dict(instance):
+    """Instances store their attributes in slots and reject unknown attributes."""
+    assert not hasattr(instance, '__dict__')
+    with pytest.raises(AttributeError):
+        instance.unknown_attribute = 1
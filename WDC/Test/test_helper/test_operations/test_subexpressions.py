@@ -0,0 +1,83 @@
+# unit testing for common-subexpression elimination
+
+import pytest
+from WDC.core.coverage import Coverage, AxisSubset
+from WDC.helper.operations.numoperations import AggregationMethod, MathOperation, RangeConstructor
+from WDC.helper.operations.serializer import serialize
+from WDC.helper.operations.subexpressions import find_common_subexpressions, number_subtrees
+from WDC.helper.util.useful_classes import Date
+
+
+@pytest.fixture
+def coverage():
+    coverage = Coverage("AvgLandTemp")
+    coverage.set_subset(AxisSubset('ansi', Date(2014, 7)))
+    return coverage
+
+
+def render(root):
+    bindings, names = find_common_subexpressions(root)
+    return [(variable, serialize(node, names)) for variable, node in bindings], serialize(root, names)
+
+
+class TestSubexpressions:
+    """Unit tests for numbering subtrees and finding common subexpressions."""
+
+    def test_identical_subtrees_share_a_number(self, coverage):
+        """Separately built but identical subtrees get the same number."""
+        left, right = coverage + 1, coverage + 1
+        node_numbers, subtrees = number_subtrees(left * right)
+        assert node_numbers[id(left)] == node_numbers[id(right)]
+        assert len(subtrees) == 4
+
+    def test_different_subtrees(self, coverage):
+        """Subtrees differing in an operator or literal get different numbers."""
+        left, right = coverage + 1, coverage - 1
+        node_numbers, _ = number_subtrees(left * right)
+        assert node_numbers[id(left)] != node_numbers[id(right)]
+
+    def test_range_constructor_bands_share_operand(self, coverage):
+        """The operand aggregated in several bands is computed once."""
+        operand = coverage * 2
+        root = RangeConstructor(['b0', 'b1'], [AggregationMethod.max(operand), AggregationMethod.min(coverage * 2)])
+        bindings, text = render(root)
+        assert bindings == [('$t0', f'({coverage} * 2)')]
+        assert text == '{b0: max($t0); b1: min($t0)}'
+
+    def test_no_repetition(self, coverage):
+        """Nothing is bound if no computation is repeated."""
+        assert render(AggregationMethod.max(coverage)) == ([], f'max({coverage})')
+
+    def test_repeated_coverage_subset(self, coverage):
+        """A repeated subsetted coverage is bound once."""
+        bindings, text = render(MathOperation.pow(coverage, 2) / coverage)
+        assert bindings == [('$t0', str(coverage))]
+        assert text == '(pow($t0, 2) / $t0)'
+
+    def test_unsubsetted_coverage_is_not_bound(self):
+        """Plain coverage variables are not worth binding."""
+        coverage = Coverage("AvgLandTemp")
+        assert render(coverage * coverage) == ([], f'({coverage} * {coverage})')
+
+    def test_only_outermost_repetition_is_bound(self, coverage):
+        """Parts of a repeated subtree are not bound unless they are also used elsewhere."""
+        bindings, text = render(AggregationMethod.max((coverage - 1) * 2) + AggregationMethod.min((coverage - 1) * 2))
+        assert bindings == [('$t0', f'(({coverage} - 1) * 2)')]
+        assert text == '(max($t0) + min($t0))'
+
+    def test_bindings_in_dependency_order(self, coverage):
+        """Bindings come after the bindings they use."""
+        difference = coverage - 10
+        square = difference * difference
+        bindings, text = render(AggregationMethod.avg(square) / AggregationMethod.max(square))
+        assert bindings == [('$t0', f'({coverage} - 10)'), ('$t1', '($t0 * $t0)')]
+        assert text == '(avg($t1) / max($t1))'
+
+    def test_deep_tree(self, coverage):
+        """Trees deeper than the recursion limit are handled."""
+        expression = coverage
+        for _ in range(5000):
+            expression = expression + 1
+        bindings, text = render(expression / expression)
+        assert len(bindings) == 1
+        assert text == '($t0 / $t0)'
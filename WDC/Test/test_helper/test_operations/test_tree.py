@@ -0,0 +1,28 @@
+# unit testing for the expression tree helpers
+
+from WDC.core.coverage import Coverage, AxisSubset
+from WDC.helper.operations.nodes import freeze
+from WDC.helper.operations.numoperations import AggregationMethod
+from WDC.helper.operations.tree import result_ndim
+from WDC.helper.util.useful_classes import Date
+
+
+class TestResultNdim:
+    """Unit tests for result_ndim."""
+
+    def test_trimmed_axes_are_dimensions(self):
+        coverage = Coverage("AvgLandTemp")
+        coverage.set_subset(AxisSubset('Lat', (35, 75)), AxisSubset('Long', (-20, 40)),
+                            AxisSubset('ansi', Date(2014, 7)))
+        assert result_ndim(coverage) == 2
+        assert result_ndim(coverage * 2 + 1) == 2
+        assert result_ndim(freeze(coverage > 0)) == 2
+
+    def test_aggregations_and_literals_are_scalars(self):
+        coverage = Coverage("AvgLandTemp")
+        assert result_ndim(AggregationMethod.max(coverage) - 1) == 0
+        assert result_ndim(freeze(AggregationMethod.max(coverage))) == 0
+        assert result_ndim(3) == 0
+
+    def test_coverage_without_subset_is_unknown(self):
+        assert result_ndim(Coverage("AvgLandTemp") + 1) is None
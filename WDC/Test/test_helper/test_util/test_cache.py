@@ -0,0 +1,55 @@
+# unit tests for the query result cache
+
+import time
+import pytest
+from WDC.helper.util.cache import ResultCache
+
+
+@pytest.fixture
+def cache():
+    return ResultCache(max_bytes=10)
+
+
+class TestResultCache:
+    def test_key_includes_endpoint_query_and_format(self):
+        key = ResultCache.make_key("https://endpoint", "for $i0 in (A) return 1", "csv")
+        assert key != ResultCache.make_key("https://endpoint", "for $i0 in (A) return 1", "json")
+        assert key != ResultCache.make_key("https://other", "for $i0 in (A) return 1", "csv")
+
+    def test_hit_and_miss_counters(self, cache):
+        assert cache.get("query") is None
+        cache.put("query", b"1")
+        assert cache.get("query") == b"1"
+        assert cache.stats() == {"hits": 1, "misses": 1, "evictions": 0, "entries": 1, "bytes": 1}
+
+    def test_least_recently_used_is_evicted(self, cache):
+        cache.put("a", b"aaaa")
+        cache.put("b", b"bbbb")
+        cache.get("a")
+        cache.put("c", b"cccc")
+        assert cache.get("b") is None
+        assert cache.get("a") == b"aaaa"
+        assert cache.get("c") == b"cccc"
+        assert cache.evictions == 1
+
+    def test_size_bound(self, cache):
+        cache.put("too large", b"x" * 11)
+        assert len(cache) == 0
+
+    def test_error_objects_are_not_cached(self, cache):
+        cache.put("query", {"success": False})
+        assert len(cache) == 0
+
+    def test_ttl(self):
+        cache = ResultCache(ttl=0.05)
+        cache.put("query", b"1")
+        assert cache.get("query") == b"1"
+        time.sleep(0.06)
+        assert cache.get("query") is None
+        assert cache.stats()["bytes"] == 0
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            ResultCache(max_bytes=0)
+        with pytest.raises(ValueError):
+            ResultCache(ttl=0)
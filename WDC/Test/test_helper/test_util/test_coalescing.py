@@ -0,0 +1,75 @@
+# unit tests for the coalescing of identical requests in flight
+
+import threading
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from WDC.helper.util.coalescing import QueryCoalescer
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+@pytest.fixture
+def coalescer():
+    return QueryCoalescer()
+
+
+class TestQueryCoalescer:
+    def test_concurrent_calls_share_one_request(self, coalescer):
+        release = threading.Event()
+        calls = []
+
+        def send():
+            calls.append(None)
+            release.wait(5)
+            return b"25.98"
+
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            futures = [executor.submit(coalescer.run, "query", send) for _ in range(5)]
+            wait_for(lambda: coalescer.coalesced == 4)
+            release.set()
+            results = [future.result() for future in futures]
+        assert results == [b"25.98"] * 5
+        assert len(calls) == 1
+        assert coalescer.stats() == {"requests": 1, "coalesced": 4, "in_flight": 0}
+
+    def test_error_objects_are_shared(self, coalescer):
+        release = threading.Event()
+        error = {"success": False, "error": {"code": 503}}
+
+        def send():
+            release.wait(5)
+            return error
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [executor.submit(coalescer.run, "query", send) for _ in range(2)]
+            wait_for(lambda: coalescer.coalesced == 1)
+            release.set()
+            assert [future.result() for future in futures] == [error, error]
+
+    def test_exceptions_reach_every_caller(self, coalescer):
+        release = threading.Event()
+
+        def send():
+            release.wait(5)
+            raise ConnectionError("refused")
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [executor.submit(coalescer.run, "query", send) for _ in range(2)]
+            wait_for(lambda: coalescer.coalesced == 1)
+            release.set()
+            for future in futures:
+                with pytest.raises(ConnectionError):
+                    future.result()
+        assert coalescer.stats()["in_flight"] == 0
+
+    def test_finished_requests_are_not_reused(self, coalescer):
+        assert coalescer.run("query", lambda: b"1") == b"1"
+        assert coalescer.run("query", lambda: b"2") == b"2"
+        assert coalescer.run("other", lambda: b"3") == b"3"
+        assert coalescer.stats() == {"requests": 3, "coalesced": 0, "in_flight": 0}
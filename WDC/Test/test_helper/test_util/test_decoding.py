@@ -0,0 +1,54 @@
+# unit tests for decoding CSV and JSON results into arrays
+
+import numpy as np
+import pytest
+from WDC.helper.util.decoding import decode_array
+
+
+class TestDecodeArray:
+    """Unit tests for decode_array."""
+
+    def test_scalar(self):
+        result = decode_array(b"25.984251", "csv")
+        assert result.shape == ()
+        assert result.dtype == np.float64
+        assert result == 25.984251
+
+    def test_nested_csv_keeps_shape(self):
+        result = decode_array(b"{{1,2,3},{4,5,6}}", "csv")
+        assert result.dtype == np.int64
+        np.testing.assert_array_equal(result, [[1, 2, 3], [4, 5, 6]])
+
+    def test_rows_without_outer_brackets(self):
+        np.testing.assert_array_equal(decode_array(b"{1,2},{3,4}", "csv"), [[1, 2], [3, 4]])
+
+    def test_json(self):
+        result = decode_array(b"[[1.5, 2], [3, NaN]]", "json")
+        assert result.shape == (2, 2)
+        assert np.isnan(result[1, 1])
+
+    @pytest.mark.parametrize("data", [b'{"1 2 3","4 5 6"}', b"{{1 2 3},{4 5 6}}"])
+    def test_bands_become_trailing_axis(self, data):
+        np.testing.assert_array_equal(decode_array(data, "csv"), [[1, 2, 3], [4, 5, 6]])
+
+    def test_ndim_keeps_single_cell_groups(self):
+        """Groups of one cell are a dimension if the query result has that many dimensions."""
+        assert decode_array(b"{{1},{2}}", "csv", ndim=2).shape == (2, 1)
+        assert decode_array(b"{{1 2 3},{4 5 6}}", "csv", ndim=1).shape == (2, 3)
+
+    def test_dtype(self):
+        assert decode_array(b"{1,2}", "csv", dtype=np.uint8).dtype == np.uint8
+
+    @pytest.mark.parametrize("data, message", [
+        (b"{{1,2},{3}}", "not a rectangular array"),
+        (b"{{1,2}", "not balanced"),
+        (b"{1,x}", "not int64 numbers"),
+        (b"{}", "empty"),
+    ])
+    def test_invalid_results(self, data, message):
+        with pytest.raises(ValueError, match=message):
+            decode_array(data, "csv")
+
+    def test_unsupported_format(self):
+        with pytest.raises(ValueError, match="can't be decoded"):
+            decode_array(b"\x89PNG", "png")
@@ -0,0 +1,157 @@
+# unit tests for memory-mapping encoded raster results
+
+import struct
+import tempfile
+import numpy as np
+import pytest
+from WDC.helper.util.raster import map_raster, map_tiff, map_netcdf
+
+
+def tiff_bytes(pixels, order='<', strips=1, compression=1):
+    """Builds an uncompressed striped TIFF file with the pixels first and the IFD after them."""
+    pixels = np.ascontiguousarray(pixels, dtype=pixels.dtype.newbyteorder(order))
+    rows, width = pixels.shape[:2]
+    bands = pixels.shape[2] if pixels.ndim == 3 else 1
+    data = pixels.tobytes()
+    strip_rows = -(-rows // strips)
+    strip_size = strip_rows * width * bands * pixels.itemsize
+    offsets = [8 + i * strip_size for i in range(strips)]
+    counts = [min(strip_size, len(data) - i * strip_size) for i in range(strips)]
+    kind = {'u': 1, 'i': 2, 'f': 3}[pixels.dtype.kind]
+    tags = [(256, 4, [width]), (257, 4, [rows]), (258, 3, [pixels.itemsize * 8] * bands),
+            (259, 3, [compression]), (273, 4, offsets), (277, 3, [bands]), (278, 4, [strip_rows]),
+            (279, 4, counts), (339, 3, [kind] * bands)]
+    ifd_offset = 8 + len(data)
+    extra_offset = ifd_offset + 2 + 12 * len(tags) + 4
+    entries, extra = b'', b''
+    for tag, field_type, values in tags:
+        packed = struct.pack(order + ('H' if field_type == 3 else 'I') * len(values), *values)
+        if len(packed) <= 4:
+            value = packed.ljust(4, b'\0')
+        else:
+            value = struct.pack(order + 'I', extra_offset + len(extra))
+            extra += packed
+        entries += struct.pack(order + 'HHI', tag, field_type, len(values)) + value
+    header = (b'II' if order == '<' else b'MM') + struct.pack(order + 'HI', 42, ifd_offset)
+    return header + data + struct.pack(order + 'H', len(tags)) + entries + b'\0' * 4 + extra
+
+
+def _name(name):
+    encoded = name.encode()
+    return struct.pack('>I', len(encoded)) + encoded.ljust(-(-len(encoded) // 4) * 4, b'\0')
+
+
+def netcdf_bytes(dimensions, variables, records=0):
+    """Builds a CDF-1 file; variables are (name, dimension ids, nc_type, big-endian array)."""
+    lengths = [length for _, length in dimensions]
+    is_record = [bool(ids) and lengths[ids[0]] == 0 for _, ids, _, _ in variables]
+    record_count = sum(is_record)
+
+    def vsize(data, record):
+        size = (data[0].nbytes if record else data.nbytes)
+        return size if record and record_count == 1 else -(-size // 4) * 4
+
+    def header(begins):
+        text = b'CDF\x01' + struct.pack('>I', records)
+        text += struct.pack('>II', 10, len(dimensions))
+        for name, length in dimensions:
+            text += _name(name) + struct.pack('>I', length)
+        text += struct.pack('>II', 0, 0)
+        text += struct.pack('>II', 11, len(variables))
+        for (name, ids, nc_type, data), record, begin in zip(variables, is_record, begins):
+            text += _name(name) + struct.pack('>I', len(ids)) + struct.pack(f'>{len(ids)}I', *ids)
+            text += struct.pack('>II', 12, 1) + _name('units') + struct.pack('>II', 2, 1) + b'K\0\0\0'
+            text += struct.pack('>III', nc_type, vsize(data, record), begin)
+        return text
+
+    size = len(header([0] * len(variables)))
+    begins, body = [], b''
+    for (_, _, _, data), record in zip(variables, is_record):
+        if not record:
+            begins.append(size + len(body))
+            body += data.tobytes().ljust(vsize(data, False), b'\0')
+    record_begins = {}
+    for index, ((_, _, _, data), record) in enumerate(zip(variables, is_record)):
+        if record:
+            record_begins[index] = size + len(body) + sum(
+                vsize(variables[other][3], True) for other in record_begins)
+    for r in range(records):
+        for index, (_, _, _, data) in enumerate(variables):
+            if is_record[index]:
+                body += data[r:r + 1].tobytes().ljust(vsize(data, True), b'\0')
+    begins = [record_begins[i] if is_record[i] else begins.pop(0) for i in range(len(variables))]
+    return header(begins) + body
+
+
+class TestMapTiff:
+    """Unit tests for map_tiff."""
+
+    @pytest.mark.parametrize("order", ['<', '>'])
+    def test_single_band_strips(self, tmp_path, order):
+        pixels = np.arange(35, dtype=np.float32).reshape(7, 5)
+        path = tmp_path / "result.tiff"
+        path.write_bytes(tiff_bytes(pixels, order, strips=3))
+        result = map_tiff(path)
+        np.testing.assert_array_equal(result, pixels)
+        assert not result.flags.writeable
+        assert isinstance(result.base, np.memmap)
+
+    def test_interleaved_bands(self, tmp_path):
+        pixels = np.arange(24, dtype=np.uint8).reshape(2, 4, 3)
+        path = tmp_path / "result.tiff"
+        path.write_bytes(tiff_bytes(pixels))
+        np.testing.assert_array_equal(map_tiff(path), pixels)
+
+    def test_compressed_image(self, tmp_path):
+        path = tmp_path / "result.tiff"
+        path.write_bytes(tiff_bytes(np.zeros((2, 2), np.uint8), compression=5))
+        with pytest.raises(ValueError, match="Compressed"):
+            map_tiff(path)
+
+    def test_not_a_tiff(self, tmp_path):
+        path = tmp_path / "result.tiff"
+        path.write_bytes(b"\x89PNG\r\n\x1a\n" + bytes(16))
+        with pytest.raises(ValueError, match="not a TIFF file"):
+            map_tiff(path)
+
+
+class TestMapNetcdf:
+    """Unit tests for map_netcdf."""
+
+    def test_fixed_and_record_variables(self, tmp_path):
+        lat = np.array([1.5, 2.5, 3.5], dtype='>f8')
+        grid = np.arange(6, dtype='>f4').reshape(3, 2)
+        time = np.array([10, 20], dtype='>i4')
+        temperature = np.arange(6, dtype='>i2').reshape(2, 3)
+        path = tmp_path / "result.nc"
+        path.write_bytes(netcdf_bytes(
+            [('time', 0), ('lat', 3), ('lon', 2)],
+            [('lat', [1], 6, lat), ('grid', [1, 2], 5, grid), ('time', [0], 4, time),
+             ('temperature', [0, 1], 3, temperature)], records=2))
+        result = map_netcdf(path)
+        assert list(result) == ['lat', 'grid', 'time', 'temperature']
+        np.testing.assert_array_equal(result['lat'], lat)
+        np.testing.assert_array_equal(result['grid'], grid)
+        np.testing.assert_array_equal(result['time'], time)
+        np.testing.assert_array_equal(result['temperature'], temperature)
+
+    def test_netcdf4_is_rejected(self, tmp_path):
+        path = tmp_path / "result.nc"
+        path.write_bytes(b"\x89HDF\r\n\x1a\n" + bytes(16))
+        with pytest.raises(ValueError, match="netCDF-4"):
+            map_netcdf(path)
+
+
+class TestMapRaster:
+    """Unit tests for map_raster."""
+
+    def test_spooled_file(self):
+        pixels = np.arange(6, dtype=np.int16).reshape(2, 3)
+        with tempfile.SpooledTemporaryFile() as file:
+            file.write(tiff_bytes(pixels))
+            result = map_raster(file, "gtiff")
+        np.testing.assert_array_equal(result, pixels)
+
+    def test_unsupported_format(self, tmp_path):
+        with pytest.raises(ValueError, match="can't be memory-mapped"):
+            map_raster(tmp_path / "result.png", "png")
@@ -0,0 +1,124 @@
+# unit tests for the retry and hedging policies
+
+import time
+import pytest
+from unittest.mock import MagicMock
+from WDC.helper.util.retry import RetryPolicy, HedgePolicy, parse_retry_after
+
+
+class TestRetryPolicy:
+    def test_exponential_backoff_without_jitter(self):
+        policy = RetryPolicy(backoff_factor=0.5, max_backoff=3, jitter=False)
+        assert [policy.backoff(attempt) for attempt in range(4)] == [0.5, 1, 2, 3]
+
+    def test_jitter_stays_below_exponential_delay(self):
+        policy = RetryPolicy(backoff_factor=1)
+        assert all(0 <= policy.backoff(2) <= 4 for _ in range(50))
+
+    def test_retry_after_replaces_backoff(self):
+        policy = RetryPolicy(max_backoff=10)
+        assert policy.backoff(0, "7") == 7
+        assert policy.backoff(0, "120") == 10
+
+    def test_retry_after_can_be_ignored(self):
+        policy = RetryPolicy(backoff_factor=1, jitter=False, respect_retry_after=False)
+        assert policy.backoff(0, "7") == 1
+
+    def test_invalid_max_retries(self):
+        with pytest.raises(ValueError):
+            RetryPolicy(max_retries=-1)
+
+
+class TestParseRetryAfter:
+    def test_seconds(self):
+        assert parse_retry_after("3") == 3
+
+    def test_http_date_in_the_past(self):
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+
+    def test_invalid_value(self):
+        assert parse_retry_after("soon") is None
+
+
+class TestHedgePolicy:
+    def test_fixed_delay_until_enough_samples(self):
+        policy = HedgePolicy(delay=0.2, percentile=50, min_samples=3)
+        assert policy.hedge_delay() == 0.2
+        for latency in (0.1, 0.3, 0.5):
+            policy.record(latency)
+        assert policy.hedge_delay() == 0.3
+
+    def test_requires_delay_or_percentile(self):
+        with pytest.raises(ValueError):
+            HedgePolicy(delay=None, percentile=None)
+
+    def test_slow_request_is_hedged(self):
+        policy = HedgePolicy(delay=0.02, percentile=None)
+        slow_response, fast_response = MagicMock(), MagicMock()
+        calls = []
+
+        def request():
+            calls.append(None)
+            if len(calls) == 1:
+                time.sleep(0.3)
+                return slow_response
+            return fast_response
+
+        start = time.perf_counter()
+        assert policy.run(request) is fast_response
+        assert time.perf_counter() - start < 0.25
+        assert len(calls) == 2
+
+    def test_fast_request_is_not_hedged(self):
+        policy = HedgePolicy(delay=0.5, percentile=None)
+        request = MagicMock(return_value="response")
+        assert policy.run(request) == "response"
+        request.assert_called_once()
+
+    def test_failing_request_raises(self):
+        policy = HedgePolicy(delay=0.5, percentile=None)
+        with pytest.raises(ConnectionError):
+            policy.run(MagicMock(side_effect=ConnectionError("refused")))
+
+    def test_fast_error_status_does_not_win(self):
+        policy = HedgePolicy(delay=0.02, percentile=None)
+        slow_ok, fast_busy = MagicMock(status_code=200), MagicMock(status_code=503)
+        calls = []
+
+        def request():
+            calls.append(None)
+            if len(calls) == 1:
+                time.sleep(0.1)
+                return slow_ok
+            return fast_busy
+
+        assert policy.run(request) is slow_ok
+        assert len(calls) == 2
+
+    def test_error_status_is_returned_if_nothing_succeeds(self):
+        policy = HedgePolicy(delay=0.5, percentile=None)
+        busy = MagicMock(status_code=503)
+        assert policy.run(MagicMock(return_value=busy)) is busy
+
+    def test_duplicates_are_timed_from_their_own_start(self):
+        policy = HedgePolicy(delay=0.05, percentile=None)
+        calls = []
+
+        def request():
+            calls.append(None)
+            if len(calls) == 1:
+                time.sleep(0.3)
+            return MagicMock(status_code=200)
+
+        policy.run(request)
+        assert min(policy._latencies) < 0.04
+
+    def test_close_stops_the_threads(self):
+        policy = HedgePolicy(delay=0.5, percentile=None)
+        policy.run(MagicMock(return_value="response"))
+        assert policy._executor is not None
+        policy.close()
+        assert policy._executor is None
+        # a closed policy starts its threads again when it is used
+        assert policy.run(MagicMock(return_value="again")) == "again"
+        policy.close()
@@ -0,0 +1,49 @@
+# unit tests for reading streamed responses
+
+import io
+import pytest
+from unittest.mock import MagicMock
+from WDC.helper.util.streaming import iter_response, write_response, spool_response
+
+
+@pytest.fixture
+def streamed_response():
+    payload = bytes(range(256)) * 40
+    response = MagicMock()
+    response.iter_content.side_effect = lambda chunk_size: (
+        payload[i:i + chunk_size] for i in range(0, len(payload), chunk_size))
+    response.payload = payload
+    return response
+
+
+class TestIterResponse:
+    def test_chunks_are_bounded(self, streamed_response):
+        chunks = list(iter_response(streamed_response, chunk_size=1000))
+        assert max(len(chunk) for chunk in chunks) == 1000
+        assert b"".join(chunks) == streamed_response.payload
+        streamed_response.close.assert_called_once()
+
+
+class TestWriteResponse:
+    def test_write_to_file_object(self, streamed_response):
+        buffer = io.BytesIO()
+        written = write_response(streamed_response, buffer, chunk_size=512)
+        assert written == len(streamed_response.payload)
+        assert buffer.getvalue() == streamed_response.payload
+
+    def test_write_to_path(self, streamed_response, tmp_path):
+        target = tmp_path / "result.tiff"
+        write_response(streamed_response, target)
+        assert target.read_bytes() == streamed_response.payload
+
+
+class TestSpoolResponse:
+    def test_small_result_stays_in_memory(self, streamed_response):
+        with spool_response(streamed_response, spool_threshold=1024 * 1024) as spooled:
+            assert not spooled._rolled
+            assert spooled.read() == streamed_response.payload
+
+    def test_large_result_is_spilled_to_disk(self, streamed_response):
+        with spool_response(streamed_response, chunk_size=512, spool_threshold=1024) as spooled:
+            assert spooled._rolled
+            assert spooled.read() == streamed_response.payload
@@ -0,0 +1,117 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing_extensions import Unpack
+from .dbc import Dbc
+from WDC.helper.util.types import RequestType
+from WDC.helper.util.wrappers import request_failed
+
+
+class AsyncDbc:
+    """
+    asyncio counterpart of the Dbc class.
+
+    Requests are sent through the pooled session of the wrapped Dbc by a fixed number of worker
+    threads, so a single event loop can keep many WCPS requests in flight without one thread per
+    request. Results follow the same format as `network_wrapper`: the response content on success
+    and an error object on failure.
+
+    Attributes:
+        dbc (Dbc): The connection whose session and endpoint are used for every request.
+        max_concurrency (int): The maximum number of requests in flight at the same time.
+    """
+
+    def __init__(self, dbc: Dbc = None, max_concurrency: int = 16):
+        """
+        Initializes the AsyncDbc instance.
+
+        Args:
+            dbc (Dbc, optional): The connection to send requests through. A default Dbc is
+                created (and closed together with this instance) if none is given.
+            max_concurrency (int): The maximum number of requests in flight at the same time.
+
+        Raises:
+            TypeError: If dbc is not an instance of Dbc.
+            ValueError: If max_concurrency is not a positive integer.
+        """
+        if dbc is not None and not isinstance(dbc, Dbc):
+            raise TypeError('A Dbc object must be passed.')
+        if not isinstance(max_concurrency, int) or max_concurrency < 1:
+            raise ValueError("max_concurrency must be a positive integer.")
+
+        self._owns_dbc = dbc is None
+        self.dbc = Dbc() if dbc is None else dbc
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="AsyncDbc")
+
+    async def _submit(self, request, timeout):
+        """
+        Runs a blocking request on the worker threads once a concurrency slot is free.
+
+        The slot is held until the worker thread is done with the request, even if the awaiting
+        task times out or is cancelled first, so abandoned requests still count against
+        `max_concurrency` and later requests are not queued behind them unnoticed. The timeout
+        is passed to the request as well, so that the HTTP call itself gives up.
+        """
+        await self._semaphore.acquire()
+        loop = asyncio.get_running_loop()
+        try:
+            concurrent_future = self._executor.submit(request)
+        except BaseException:
+            self._semaphore.release()
+            raise
+        concurrent_future.add_done_callback(lambda _: self._release(loop))
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(concurrent_future), timeout)
+        except asyncio.TimeoutError:
+            return request_failed(408, "Request Timeout Error")
+
+    def _release(self, loop):
+        """Frees a concurrency slot from the worker thread, unless the event loop is gone already."""
+        try:
+            loop.call_soon_threadsafe(self._semaphore.release)
+        except RuntimeError:
+            pass
+
+    async def post_query(self, query: str, timeout: float = None):
+        """Sends a query request to the WCPS Server
+
+        Args:
+            query (str): A WCPS query string
+            timeout (float, optional): Seconds to wait for the result before giving up.
+
+        Returns: on success -> Response content
+                on failure -> object containing information of the failed request
+        """
+        request = functools.partial(self.dbc.post_query, query)
+        if timeout is not None:
+            request = functools.partial(request, timeout=timeout)
+        return await self._submit(request, timeout)
+
+    async def post_request(self, timeout: float = None, **kwargs: Unpack[RequestType]):
+        """Sends a request to the WCPS Server
+
+        Args:
+            timeout (float, optional): Seconds to wait for the result before giving up.
+            **kwargs: The key-value pairs of the request parameters, see `Dbc.post_request`.
+
+        Returns: on success -> Response content
+                on failure -> object containing information of the failed request
+        """
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+        return await self._submit(functools.partial(self.dbc.post_request, **kwargs), timeout)
+
+    def close(self):
+        """Stops the worker threads and closes the wrapped Dbc if it was created by this instance."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if self._owns_dbc:
+            self.dbc.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,138 @@
+import calendar
+import copy
+import datetime
+
+from WDC.helper.operations.binary_expressions import BinaryComparisonOperation
+from WDC.helper.operations.nodes import Node
+from WDC.helper.operations.numoperations import AggregationMethod
+from WDC.helper.operations.tree import iter_nodes, replace_nodes
+from WDC.helper.util.useful_classes import Date
+from .coverage import Coverage, AxisSubset
+
+# how the partial results of every aggregation are combined
+MERGEABLE_AGGREGATIONS = {
+    'sum': sum,
+    'count': sum,
+    'min': min,
+    'max': max,
+}
+
+
+def _first_day(date: Date):
+    """Returns the day a Date stands for in a trim: its first day, e.g. 2014-07-01 for "2014-07"."""
+    return datetime.date(date.year, int(date.month or 1), int(date.day or 1))
+
+
+def _next_boundary(day, unit):
+    """Returns the first day of the year or month after the one `day` lies in."""
+    if unit == 'year':
+        return datetime.date(day.year + 1, 1, 1)
+    return day + datetime.timedelta(days=calendar.monthrange(day.year, day.month)[1] - day.day + 1)
+
+
+def split_time_range(start: Date, end: Date, unit: str = 'year'):
+    """
+    Splits a time trim into consecutive, non-overlapping chunks of at most one year or month.
+
+    The chunks cover exactly the days of the original trim, which starts and ends on the first
+    day of its bounds, so their bounds are written with day precision.
+
+    Args:
+        start (Date): The lower bound of the trim.
+        end (Date): The upper bound of the trim.
+        unit (str): 'year' or 'month'.
+
+    Returns:
+        list of tuple: The (start, end) Date pair of every chunk, in order.
+
+    Raises:
+        ValueError: If the unit is unknown or the bounds are in the wrong order.
+    """
+    if unit not in ('year', 'month'):
+        raise ValueError("The chunk unit must be 'year' or 'month'.")
+    first, last = _first_day(start), _first_day(end)
+    if first > last:
+        raise ValueError("The lower bound of the time trim is greater than its upper bound.")
+    chunks = []
+    while first <= last:
+        boundary = _next_boundary(first, unit)
+        chunk_end = min(last, boundary - datetime.timedelta(days=1))
+        chunks.append((Date(first.year, first.month, first.day), Date(chunk_end.year, chunk_end.month, chunk_end.day)))
+        first = boundary
+    return chunks
+
+
+def time_trim(expression, axis_name):
+    """
+    Returns the time trim shared by all coverages of an expression.
+
+    Raises:
+        ValueError: If the coverages are not all trimmed alike along the axis with Date bounds.
+    """
+    trims = set()
+    for node in iter_nodes(expression):
+        if isinstance(node, Coverage):
+            ranges = {axis.axis_name: axis.axis_range for axis in node.axes}
+            trim = ranges.get(axis_name)
+            if not (isinstance(trim, tuple) and all(isinstance(bound, Date) for bound in trim)):
+                raise ValueError(f"Every coverage must be trimmed along '{axis_name}' with Date bounds.")
+            trims.add(tuple(str(bound) for bound in trim))
+            start, end = trim
+    if len(trims) != 1:
+        raise ValueError(f"The coverages must share one trim along '{axis_name}'.")
+    return start, end
+
+
+def chunk_expression(expression, axis_name, bounds):
+    """Returns a copy of a query expression with every coverage trimmed to one chunk of the time axis."""
+    replacements = {}
+    for node in iter_nodes(expression):
+        frozen = type(node) is Node and node.kind == 'Coverage'
+        coverage = node.value if frozen else node
+        if not isinstance(coverage, Coverage) or id(node) in replacements:
+            continue
+        chunked = copy.copy(coverage)
+        chunked.apply_axes([AxisSubset(axis_name, bounds) if axis.axis_name == axis_name else axis
+                            for axis in coverage.axes])
+        if frozen:
+            chunked = Node('Coverage', (chunked.get_used_coverage(), chunked.subset), (), chunked)
+        replacements[id(node)] = chunked
+    return replace_nodes(expression, replacements)
+
+
+def partial_aggregations(aggregation):
+    """
+    Returns the mergeable aggregations a chunk has to compute for an aggregation: the
+    aggregation itself, or for avg the sum and the number of cells of its operand.
+
+    Raises:
+        ValueError: If the root of the expression is not an aggregation.
+    """
+    if type(aggregation) is Node and aggregation.kind == 'AggregationMethod':
+        operation, operand = aggregation.label, aggregation.children[0]
+    elif isinstance(aggregation, AggregationMethod):
+        operation, operand = aggregation.operation, aggregation.expression
+    else:
+        raise ValueError("Only aggregations can be computed from time chunks.")
+    if operation in MERGEABLE_AGGREGATIONS:
+        return operation, [aggregation]
+    if operation == 'avg':
+        # every cell is equal to itself, so counting the comparison counts the cells (except NaN cells)
+        return operation, [AggregationMethod('sum', operand),
+                           AggregationMethod('count', BinaryComparisonOperation(operand, '=', operand))]
+    raise ValueError(f"The aggregation '{operation}' can't be computed from time chunks.")
+
+
+def merge_partials(operation, partials):
+    """
+    Combines the results of the chunks into the result of the whole aggregation.
+
+    Args:
+        operation (str): The aggregation, e.g. 'avg'.
+        partials (list of list): The results of the partial aggregations of every chunk, see `partial_aggregations`.
+    """
+    if operation == 'avg':
+        total = sum(values[0] for values in partials)
+        count = sum(values[1] for values in partials)
+        return total / count
+    return MERGEABLE_AGGREGATIONS[operation](values[0] for values in partials)
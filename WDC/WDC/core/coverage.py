@@ -1,9 +1,12 @@
-from WDC.helper.error_handling.type_checks import is_string, is_list_of_strings
+import warnings
+
+from WDC.helper.error_handling.type_checks import is_string, is_list_of_strings, register_operand_type
 from WDC.helper.operations.binary_expressions import OperatorOverloading
 from WDC.helper.util.utils import concat_coverage_names
-from WDC.helper.util.useful_classes import Date
+from WDC.helper.util.useful_classes import Date, Param
 
 
+@register_operand_type
 class Coverage(OperatorOverloading):
     """
     A Coverage class representing a dataset or variable coverage in query operations. It holds
@@ -11,7 +14,9 @@ class Coverage(OperatorOverloading):
 
     Attributes:
         subset (str): The subset string related to the Coverage instance.
-        variable (str): A unique variable name associated with the Coverage instance.
+        axes (tuple of AxisSubset): The axis subsets the subset string was built from.
+        variable (str): A variable name associated with the Coverage instance. Queries don't use it;
+            their iteration variables are assigned per query (see `WDC.helper.operations.planner`).
         name (str): The name or names of coverages retrieved from the server.
     """
     variable_count = 0
@@ -39,6 +44,8 @@ class Coverage(OperatorOverloading):
         self.variable_count += 1
         self.variable = '$i' + str(Coverage.variable_count)
         self.subset = None
+        self.axes = ()
+        self.clamp = False
 
     def get_variable_name(self):
         """Returns the variable name of the Coverage instance."""
@@ -52,12 +59,17 @@ class Coverage(OperatorOverloading):
         """
         Sets the variable name for the Coverage instance.
 
+        Deprecated: the variable name has no effect on queries, whose iteration variables are
+        assigned per query, so that all Coverage objects of a coverage share one variable.
+
         Args:
             variable_name (str): The new variable name to be set.
 
         Raises:
             TypeError: If `variable_name` is not a string.
         """
+        warnings.warn("set_variable_name has no effect on queries and will be removed.",
+                      DeprecationWarning, stacklevel=2)
         is_string(variable_name)
         self.variable = variable_name
 
@@ -78,12 +90,17 @@ class Coverage(OperatorOverloading):
             if is_list_of_strings(coverage_names):
                 self.name = concat_coverage_names(coverage_names)
 
-    def set_subset(self, *axises):
+    def set_subset(self, *axises, clamp=False):
         """
         Set the subset of the coverage based on provided axis subsets.
 
+        The subsets are checked against the schema of the coverage when a query is compiled by a
+        Dbc with `validate_subsets=True`, since only then is the server, and so the schema, known.
+
         Args:
             axises (tuple of AxisSubset): Axis subsets to define the subset of the coverage.
+            clamp (bool): If True, trim bounds outside the coverage's extent are moved onto the extent
+                instead of raising an error.
 
         Raises:
             TypeError: If any of the arguments are not instances of AxisSubset or if no axises are provided
@@ -94,11 +111,23 @@ class Coverage(OperatorOverloading):
                 "The arguments must be instances of AxisSubset class")
         if len(axises) == 0:
             raise ValueError("No axises provided.")
+
+        self.clamp = clamp
+        self.apply_axes(axises)
+
+    def apply_axes(self, axises):
+        """
+        Stores axis subsets and builds the subset string from them without validating them.
+
+        Args:
+            axises (iterable of AxisSubset): Axis subsets to define the subset of the coverage.
+        """
+        self.axes = tuple(axises)
         # combining all axises to one subset under []
         subset = '''['''
-        for axis in axises[:-1]:
+        for axis in self.axes[:-1]:
             subset += axis.get_axis_with_interval() + ', '
-        subset += axises[-1].get_axis_with_interval() + ''']'''
+        subset += self.axes[-1].get_axis_with_interval() + ''']'''
 
         self.subset = subset
 
@@ -120,6 +149,7 @@ class AxisSubset:
         start (Date): Optional starting boundary of the axis.
         stop (Date): Optional ending boundary of the axis.
     """
+    __slots__ = ('axis_name', 'axis_range')
 
     def __init__(self, axis_name: str, axis_range: tuple):
         """
@@ -155,12 +185,12 @@ class AxisSubset:
         Sets the range of the axis.
 
         Args:
-            axis_range (tuple): The range of the axis.
+            axis_range (tuple): The range of the axis; bounds can be Param placeholders.
 
         Raises:
             TypeError: If `axis_range` is not a tuple or is more than 2 elements.
         """
-        if not isinstance(axis_range, (tuple, int, float, Date)):
+        if not isinstance(axis_range, (tuple, int, float, Date, Param)):
             raise TypeError(
                 "Incorrect range type.")
         if isinstance(axis_range, tuple) and (len(axis_range) != 2):
@@ -1,55 +1,158 @@
+import functools
 import requests
+from requests.adapters import HTTPAdapter
 from typing_extensions import Unpack
-from WDC.helper.util.wrappers import network_wrapper
+from WDC.helper.util.wrappers import network_wrapper, stream_network_wrapper
 from WDC.helper.error_handling.err import InvalidRequestError
-from WDC.helper.util.types import RequestType 
-from WDC.helper.util.utils import getRequestParams 
+from WDC.helper.util.types import RequestType
+from WDC.helper.util.utils import getRequestParams
+from WDC.helper.util.concurrency import run_in_parallel
+from WDC.helper.util.retry import RetryPolicy, HedgePolicy
+from WDC.helper.util.cache import ResultCache
+from WDC.helper.util.coalescing import QueryCoalescer
 
 
 class Dbc:
     params = {}
 
-    def __init__(self, server_url = "https://ows.rasdaman.org/rasdaman/ows", service="WCS", version="2.0.1", request=None):
+    def __init__(self, server_url = "https://ows.rasdaman.org/rasdaman/ows", service="WCS", version="2.0.1", request=None,
+                 pool_connections=10, pool_maxsize=10, pool_block=False, keep_alive=True,
+                 timeout=None, retry_policy: RetryPolicy = None, hedge_policy: HedgePolicy = None,
+                 result_cache: ResultCache = None, validate_subsets=False, coalescer: QueryCoalescer = None):
         """Sets the service endpoint URL based on provided details.
 
+        Every Dbc owns a pooled HTTP session, so all Dco instances bound to it reuse the same
+        keep-alive connections instead of opening a new TCP/TLS connection per query.
+
         Args:
             service (str): The Rasdaman service name (e.g., WCS).
             version (str): The Rasdaman service version (e.g., 2.0.1).
             request (str): The Rasdaman request type (e.g., GetCapabilities).
+            pool_connections (int): Number of per-host connection pools to keep cached.
+            pool_maxsize (int): Maximum number of connections kept open per host.
+            pool_block (bool): If True, a request waits for a free pooled connection once
+                `pool_maxsize` connections to a host are in use instead of opening an extra one.
+            keep_alive (bool): If False, connections are closed after every request.
+            timeout (float | tuple, optional): Seconds to wait for the server to connect and answer.
+            retry_policy (RetryPolicy, optional): How transient failures (e.g. 503 or timeouts) are retried.
+            hedge_policy (HedgePolicy, optional): When duplicates of slow requests are sent.
+            result_cache (ResultCache, optional): Cache for the results of queries executed through a Dco.
+            validate_subsets (bool): If True, Dco checks every subset against the coverage's
+                DescribeCoverage schema before a query is sent.
+            coalescer (QueryCoalescer, optional): Lets concurrent calls of `post_query` with the same
+                query share one request; its counters report how many calls were coalesced.
         """
         self.params = {
             "service": service, "version": version, "request": request, "endpoint":server_url
         }
+        self.timeout = timeout
+        self.retry_policy = retry_policy
+        self.hedge_policy = hedge_policy
+        self.result_cache = result_cache
+        self.validate_subsets = validate_subsets
+        self.coalescer = coalescer
+        self._session = self._create_session(
+            pool_connections, pool_maxsize, pool_block, keep_alive)
 
-    @network_wrapper
-    def post_query(self, query: str):
+    @staticmethod
+    def _create_session(pool_connections, pool_maxsize, pool_block, keep_alive):
+        """Creates the pooled session shared by all requests of this Dbc."""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections,
+                              pool_maxsize=pool_maxsize, pool_block=pool_block)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        if not keep_alive:
+            session.headers["Connection"] = "close"
+        return session
+
+    def close(self):
+        """Closes all pooled connections of this Dbc and stops the threads of its hedge policy."""
+        self._session.close()
+        if self.hedge_policy is not None:
+            self.hedge_policy.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def post_query(self, query: str, timeout=None):
         """Sends a query request to the WCPS Server
 
+        With a coalescer, calls made while a request with the same endpoint, parameters and
+        query is in flight don't send their own request but receive the result of that one.
+
         Args:
             query (str): A WCPS query string
+            timeout (float | tuple, optional): Replaces the timeout of the Dbc for this request
 
         Returns: on success -> Response content
                 on failure -> object containing information of the failed request
         """
-        result = requests.post(
-            self.params['endpoint'], params=self.params, data={"query": query})
+        if self.coalescer is None:
+            return self._send_query(query, timeout)
+        # the parameters include the endpoint
+        key = (tuple(sorted(self.params.items())), query)
+        return self.coalescer.run(key, functools.partial(self._send_query, query, timeout))
+
+    @network_wrapper
+    def _send_query(self, query: str, timeout=None):
+        """Sends a query request to the WCPS Server, see `post_query`."""
+        result = self._session.post(
+            self.params['endpoint'], params=self.params, data={"query": query},
+            timeout=self.timeout if timeout is None else timeout)
         return result
 
+    @stream_network_wrapper
+    def post_query_stream(self, query: str):
+        """Sends a query request to the WCPS Server without reading the response body
+
+        Args:
+            query (str): A WCPS query string
+
+        Returns: on success -> Response whose content is read in chunks
+                on failure -> object containing information of the failed request
+        """
+        return self._session.post(
+            self.params['endpoint'], params=self.params, data={"query": query}, stream=True, timeout=self.timeout)
+
+    def post_queries(self, queries: list[str], max_workers: int = 8):
+        """Sends several query requests to the WCPS Server in parallel
+
+        The queries share the pooled session of this Dbc, so at most `max_workers` connections
+        are used no matter how many queries are given.
+
+        Args:
+            queries (list[str]): The WCPS query strings
+            max_workers (int): The maximum number of queries in flight at the same time
+
+        Returns: a list with one entry per query, in input order:
+                on success -> Response content
+                on failure -> object containing information of the failed request
+        """
+        return run_in_parallel(
+            (functools.partial(self.post_query, query) for query in queries), max_workers)
+
     @network_wrapper
-    def post_request(self, **kwargs: Unpack[RequestType]):
+    def post_request(self, timeout=None, **kwargs: Unpack[RequestType]):
         """Sends a request to the WCPS Server
 
         Args:
+            timeout (float | tuple, optional): Replaces the timeout of the Dbc for this request
             **kwargs: The key-value pairs of the request parameters
 
         Form: (lon: 80, lat: 80, ansi: ("2014-01", "2014-12"), coverage: "coverage_name")
             request params must be one of the following: ['GetCapabilities', 'DescribeCoverage', 'GetCoverage']
+            a `request` key overrides the request type the Dbc was created with for this call only
 
         Returns: on success -> Response content
                 on failure -> object containing information of the failed request
         """
-        if self.params.get("request") not in ['GetCapabilities', 'DescribeCoverage', 'GetCoverage']:
+        current_params = {**self.params, "request": kwargs.pop("request", self.params.get("request"))}
+        if current_params.get("request") not in ['GetCapabilities', 'DescribeCoverage', 'GetCoverage']:
             raise InvalidRequestError
-        self.endpoint, params = getRequestParams(
-            self.endpoint, self.params, kwargs)
-        return requests.post(self.endpoint, params=params)
+        endpoint, params = getRequestParams(
+            self.params['endpoint'], current_params, kwargs)
+        return self._session.post(endpoint, params=params, timeout=self.timeout if timeout is None else timeout)
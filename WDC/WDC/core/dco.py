@@ -1,19 +1,59 @@
+import copy
+import functools
+import io
+import itertools
+import tempfile
+import time
+import numpy as np
 from .dbc import Dbc
-from WDC.helper.error_handling.type_checks import type_check_for_binary_and_numeric_operations
+from .async_dbc import AsyncDbc
+from WDC.helper.error_handling.type_checks import type_check_for_binary_and_numeric_operations, validate_expression
 from WDC.helper.error_handling.type_checks import is_string, data_format_exists
 from WDC.helper.error_handling.err import VariableArgumentException
+from WDC.helper.util.concurrency import run_in_parallel
+from WDC.helper.util.retry import RetryPolicy
+from WDC.helper.util.wrappers import request_failed
+from WDC.helper.util.constants import DEFAULT_CHUNK_SIZE, DEFAULT_SPOOL_THRESHOLD
+from WDC.helper.util.decoding import decode_array
+from WDC.helper.util.raster import MAPPABLE_FORMATS, map_raster
+from WDC.helper.util.streaming import spool_response, write_response
+from WDC.helper.util.useful_classes import Param
 from .switch import Switch
-from .coverage import Coverage
+from .coverage import Coverage, AxisSubset
+from .schema import schema_cache
+from .prepared import PreparedQuery
+from .result import LabeledResult
+from .tiling import plan_tiles, tile_expression, stitch
+from .chunking import split_time_range, time_trim, chunk_expression, partial_aggregations, merge_partials
+from .sampling import PointAxis, group_points, box_coverage, box_array, extract_points
+from WDC.helper.operations.tree import find_coverages, result_ndim, iter_nodes
+from WDC.helper.operations.serializer import serialize_into
+from WDC.helper.operations.subexpressions import find_common_subexpressions
+from WDC.helper.operations.planner import VariableAllocator, plan_coverages
+from WDC.helper.operations.simplify import simplify
+from WDC.helper.operations.numoperations import AggregationMethod, RangeConstructor
+from WDC.helper.operations.nodes import Node
+
+# the number of compiled query texts a Dco keeps, e.g. per encoding and subset
+_COMPILED_QUERIES = 32
 
 
 class Dco:
     """
     Manages the creation and execution of WCPS queries using various components and operations.
 
+    A Dco is never changed after it is created: the builder methods return a new Dco, and the
+    compiled query text is cached per encoding on the object. One template Dco can therefore be
+    shared between threads and executed with different encodings, or used as the starting point
+    of many queries. The cache is keyed on the current subsets of the coverages as well, so
+    changing a subset with `set_subset` and executing again sends the new subset.
+
     Attributes:
         _dbc (Dbc): The database connection object used to execute queries.
-        _coverages (list): A list of Coverage objects over which operations are performed.
-        _returnQuery (str): The dynamically constructed WCPS query as a string.
+        _coverages (tuple): The Coverage objects over which operations are performed.
+        _returnQuery (str): The return statement of the WCPS query as a string.
+        _returnExpression: The expression or Switch the return statement is rendered from, if any.
+        _rawQuery (str): The return statement of queries that are not built from an expression.
 
     Methods:
         condenser: Adds a CoverageCondenser operation to the query.
@@ -22,8 +62,15 @@ class Dco:
         construct: Constructs a customized query using coverages.
         clip: Adds a clipping operation to the query based on provided polygon coordinates.
         execute: Executes the constructed WCPS query using the associated Dbc object.
+        execute_to: Executes the constructed WCPS query and writes the result to a file.
+        execute_async: Executes the constructed WCPS query through an AsyncDbc object.
+        execute_many: Executes the queries of several Dco instances in parallel.
+        aggregate: Computes several aggregations of an expression in one query.
+        sample: Reads the values of a coverage at many points with a few box queries.
+        prepare: Compiles the query into a template with Param placeholders.
     """
-    _returnQuery = "1"
+    _rawQuery = "1"
+    _returnExpression = None
 
     def __init__(self, *coverages, dbc: Dbc):
         """
@@ -44,7 +91,39 @@ class Dco:
                 'All coverages must be instances of the Coverage class.')
 
         self._dbc = dbc
-        self._coverages = list(coverages)
+        self._coverages = tuple(coverages)
+        self._compiled = {}
+        self._query_coverages = None
+
+    def _derive(self, expression=None, raw_query="1"):
+        """Returns a copy of this Dco with another return statement and an empty query cache."""
+        dco = copy.copy(self)
+        dco._returnExpression = expression
+        dco._rawQuery = raw_query
+        dco._compiled = {}
+        dco._query_coverages = None
+        return dco
+
+    def _subset_state(self):
+        """
+        Returns the coverage names and subsets the query is compiled from. The coverages of the
+        expression are collected once, their subsets are read on every call, since Coverage
+        objects can be changed with `set_subset` after the Dco was built.
+        """
+        coverages = self._query_coverages
+        if coverages is None:
+            coverages = {id(coverage): coverage for coverage in self._coverages}
+            if self._returnExpression is not None:
+                coverages.update((id(coverage), coverage) for coverage in find_coverages(self._returnExpression))
+            coverages = self._query_coverages = tuple(coverages.values())
+        return tuple((coverage.get_used_coverage(), coverage.subset) for coverage in coverages)
+
+    @property
+    def _returnQuery(self):
+        """The return statement of the query as a string."""
+        if self._returnExpression is None:
+            return self._rawQuery
+        return str(self._returnExpression)
 
     def switch(self, *cases, default):
         """ Sets up on the fly switch querying
@@ -54,11 +133,9 @@ class Dco:
             cases (Case): Variable number of Case objects to set as cases of the switch.
 
         Returns:
-            the instance itself to be used in method chaining
+            Dco: A new Dco returning the switch; this one is unchanged.
         """
-        switch = Switch(*cases, default=default)
-        self._returnQuery = f'{switch}'
-        return self
+        return self._derive(Switch(*cases, default=default))
 
     def return_expression(self, expression):
         """
@@ -69,10 +146,12 @@ class Dco:
 
         Raises:
             TypeError: If the expression is not suitable for binary or numeric operations.
+
+        Returns:
+            Dco: A new Dco returning the expression; this one is unchanged.
         """
         type_check_for_binary_and_numeric_operations(expression)
-        self._returnQuery = f'''{expression}'''
-        return self
+        return self._derive(expression)
 
     def construct(self, values: list[tuple], operator: str):
         """
@@ -86,7 +165,7 @@ class Dco:
             VariableArgumentException: If the input values do not meet the expected format or types.
 
         Returns:
-            Dco: Returns self to allow method chaining.
+            Dco: A new Dco returning the constructed coverage; this one is unchanged.
         """
         if len(values) != 2:
             raise VariableArgumentException(
@@ -96,8 +175,8 @@ class Dco:
             if len(value) != 2 or any(not isinstance(el, (int, float)) for el in value):
                 raise VariableArgumentException('Tuple values are incorrect.')
             coverages.append(f"({value[0]}:{value[1]})")
-        self._returnQuery = f"coverage myCoverage\nover $p x({coverages[0]}), $q y({coverages[1]}) values $p {operator} $q"
-        return self
+        return self._derive(
+            raw_query=f"coverage myCoverage\nover $p x({coverages[0]}), $q y({coverages[1]}) values $p {operator} $q")
 
     def clip(self, values: list[tuple]):
         """
@@ -110,7 +189,7 @@ class Dco:
             VariableArgumentException: If the input values do not meet the expected format or types.
 
         Returns:
-            Dco: Returns self to allow method chaining.
+            Dco: A new Dco returning the clipped coverage; this one is unchanged.
         """
         polygon = []
         for value in values:
@@ -118,33 +197,620 @@ class Dco:
                 raise VariableArgumentException('Tuple values are incorrect.')
             polygon.append(f"{value[0]} {value[1]}")
         polygon = f"POLYGON(({','.join(polygon)}))"
-        self._returnQuery = f"clip({self._coverages[0].variable}, {polygon})"
-        return self
+        # the same variables are assigned when the query is compiled, since a raw query has no expression
+        _, variables = plan_coverages(self._coverages)
+        return self._derive(raw_query=f"clip({variables[id(self._coverages[0])]}, {polygon})")
 
-    def execute(self, return_format: str = None):
+    def _validate_subsets(self):
         """
-        Executes the constructed query and returns the response.
+        Checks the subsets of all coverages used by the query against their DescribeCoverage schema,
+        which is fetched once per coverage and cached for the whole process.
+
+        The coverages themselves are left as they are; for those whose subset was set with
+        `clamp=True`, the subset with the out-of-range bounds moved onto the extent is returned.
+
+        Returns:
+            dict: Maps the id() of the clamped coverages to the subset the query uses for them.
+
+        Raises:
+            ValueError: If a subset uses an unknown axis or lies outside the coverage's extent.
+            NetworkRequestError: If the schema of a coverage can't be fetched.
+        """
+        coverages = {id(coverage): coverage for coverage in self._coverages}
+        if self._returnExpression is not None:
+            coverages.update((id(coverage), coverage) for coverage in find_coverages(self._returnExpression))
+        subsets = {}
+        for coverage in coverages.values():
+            if not coverage.axes or ', ' in coverage.get_used_coverage():
+                continue
+            schema = schema_cache.get(self._dbc, coverage.get_used_coverage())
+            axes = schema.validate_axes(coverage.axes, coverage.clamp)
+            if any(new is not old for new, old in zip(axes, coverage.axes)):
+                clamped = copy.copy(coverage)
+                clamped.apply_axes(axes)
+                subsets[id(coverage)] = clamped.subset
+        return subsets
+
+    def _result_coverage(self):
+        """
+        Returns a copy of the coverage whose axes the query result keeps: the one with the most
+        trimmed or unsubset axes among the coverages of the expression, or None if there are none.
+        """
+        if self._returnExpression is not None:
+            coverages = find_coverages(self._returnExpression)
+        else:
+            coverages = list(self._coverages)
+        if not coverages:
+            return None
+
+        def kept_axes(coverage):
+            if not coverage.axes:
+                return float('inf')
+            return sum(isinstance(axis.axis_range, tuple) for axis in coverage.axes)
+
+        return copy.copy(max(coverages, key=kept_axes))
+
+    def _build_query(self, return_format: str = None, optimize: bool = True, prepared: bool = False):
+        """
+        Builds the full WCPS query from the coverages and the return statement.
+
+        The query is compiled once per combination of arguments and subsets of its coverages
+        and cached on the Dco. Threads that compile the same query at the same time may both do
+        the work, but they build the same text, so the result is the same.
+
+        The operands of the return expression are checked in one pass (see `validate_expression`).
+        Coverage objects that refer to the same coverage share one iteration variable, and all
+        variables are named by a VariableAllocator of this query. With `optimize`, the return
+        expression is simplified first (see `simplify`), and sub-expressions that occur more than
+        once in it are computed once in a `let` clause and referred to by their variable.
 
         Args:
             return_format (str, optional): Specifies the format in which to return the query result.
+            optimize (bool): If False, the return statement is written exactly as it was built.
+            prepared (bool): If True, Param placeholders are allowed and left in the query as markers.
 
         Returns:
-            Response: The result of the executed query, formatted according to return_format if specified.
+            str: The WCPS query to send to the server.
+
+        Raises:
+            ValueError: If the query contains Param placeholders and is not being prepared.
+            TypeError: If an operand of the return expression has a type that is not allowed, which
+                is only possible if it was built inside `deferred_validation()`.
         """
+        key = (return_format, optimize, prepared, self._subset_state())
+        query = self._compiled.get(key)
+        if query is None:
+            query = self._compile(return_format, optimize, prepared)
+            if len(self._compiled) >= _COMPILED_QUERIES:
+                # the texts of earlier subsets are unlikely to be needed again
+                self._compiled.clear()
+            self._compiled[key] = query
+        return query
+
+    def _compile(self, return_format, optimize, prepared):
+        """Builds the query text for `_build_query`, without looking at the cache."""
         if return_format is not None:
             is_string(return_format)
             data_format_exists(return_format)
+        subsets = self._validate_subsets() if self._dbc.validate_subsets else None
 
-        for_query = 'for '
-        if len(self._coverages) > 1:
-            for_query += ',\n'.join(
-                f"{coverage.get_variable_name()} in ({coverage.get_used_coverage()})" for coverage in self._coverages[:-1])
-            for_query += f"\n{self._coverages[-1].get_variable_name()} in ({self._coverages[-1].get_used_coverage()})"
-        else:
-            coverage = self._coverages[0]
-            for_query += f"{coverage.get_variable_name()} in ({coverage.get_used_coverage()})"
+        expression = self._returnExpression
+        if expression is not None:
+            validate_expression(expression)
+        if optimize and expression is not None:
+            expression = simplify(expression)
+
+        allocator = VariableAllocator()
+        bindings, variables = plan_coverages(self._coverages, expression, allocator)
+        query = io.StringIO()
+        write = query.write
+        write('for ')
+        for index, (variable, name) in enumerate(bindings):
+            if index:
+                write(',\n' if index < len(bindings) - 1 else '\n')
+            write(f"{variable} in ({name})")
+
+        names = None
+        if optimize and expression is not None:
+            lets, names = find_common_subexpressions(expression, allocator)
+            for index, (variable, node) in enumerate(lets):
+                write(',\n' if index else ' let ')
+                write(f'{variable} := ')
+                serialize_into(node, write, names, variables, subsets)
 
+        write(' return ')
+        if return_format:
+            write('encode(')
+        if expression is None:
+            write(self._returnQuery)
+        else:
+            serialize_into(expression, write, names, variables, subsets)
         if return_format:
-            self._returnQuery = f'encode({self._returnQuery}, "{return_format}")'
-        query = f"{for_query} return {self._returnQuery}"
-        return self._dbc.post_query(query)
+            write(f', "{return_format}")')
+        query = query.getvalue()
+        if not prepared and Param.MARKER in query:
+            raise ValueError("The query contains Param placeholders; use prepare() and bind() to execute it.")
+        return query
+
+    def prepare(self, return_format: str = None, optimize: bool = True):
+        """
+        Compiles the query once into a template whose Param placeholders are filled in by
+        `PreparedQuery.bind()` or `PreparedQuery.execute()`, so that running the same query
+        shape with many different subset bounds or literals doesn't rebuild and re-serialize it.
+
+        Args:
+            return_format (str, optional): Specifies the format in which to return the query results.
+            optimize (bool): If False, the return expression is neither simplified nor are repeated
+                sub-expressions compiled into a `let` clause.
+
+        Returns:
+            PreparedQuery: The compiled query; it doesn't change when this Dco changes.
+        """
+        return PreparedQuery(self, self._build_query(return_format, optimize, prepared=True), return_format)
+
+    def _cache_key(self, query: str, return_format: str = None):
+        """Returns the result cache key of a query, or None if the Dbc has no result cache."""
+        if self._dbc.result_cache is None:
+            return None
+        return self._dbc.result_cache.make_key(self._dbc.params['endpoint'], query, return_format)
+
+    def _cached_result(self, query: str, return_format: str = None, use_cache: bool = True):
+        """
+        Looks up the result of a query in the Dbc's result cache.
+
+        Returns:
+            tuple: The cached result or None, and a function that stores the result of the
+                query once it has been sent.
+        """
+        key = self._cache_key(query, return_format) if use_cache else None
+        if key is None:
+            return None, lambda result: None
+        return self._dbc.result_cache.get(key), functools.partial(self._dbc.result_cache.put, key)
+
+    def _post_query(self, query: str, return_format: str = None, use_cache: bool = True):
+        """
+        Sends a built query through the Dbc, answering it from the Dbc's result cache if possible.
+
+        Returns:
+            Response: The result of the query or the error object of the failed request.
+        """
+        result, store = self._cached_result(query, return_format, use_cache)
+        if result is not None:
+            return result
+        result = self._dbc.post_query(query)
+        store(result)
+        return result
+
+    def execute(self, return_format: str = None, stream: bool = False,
+                spool_threshold: int = DEFAULT_SPOOL_THRESHOLD, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                use_cache: bool = True, optimize: bool = True, as_array: bool = False, dtype=None,
+                labeled: bool = False):
+        """
+        Executes the constructed query and returns the response.
+
+        Args:
+            return_format (str, optional): Specifies the format in which to return the query result.
+            stream (bool): If True, the result is read in chunks and returned as a file object instead of bytes.
+            spool_threshold (int): With `stream`, the result size in bytes above which it is kept in a
+                temporary file on disk instead of in memory.
+            chunk_size (int): With `stream`, the maximum number of bytes read at once.
+            use_cache (bool): If False, the result cache of the Dbc is bypassed for this call.
+                Streamed results are never cached.
+            optimize (bool): If False, the query is sent without simplifying the return expression
+                and compiling repeated sub-expressions into a `let` clause.
+            as_array (bool): If True, a 'csv' or 'json' result is decoded into a NumPy array of
+                the shape it encodes (see `decode_array`).
+            dtype (numpy.dtype, optional): With `as_array`, the type of the array values; by
+                default int64 for whole numbers and float64 otherwise.
+            labeled (bool): With `as_array`, the array is returned as a LabeledResult whose axis
+                names and labels are computed from the subsets and the coverage grid when accessed.
+
+        Returns:
+            Response: The result of the executed query, formatted according to return_format if specified.
+                With `stream` the result is a SpooledTemporaryFile positioned at its start, and with
+                `as_array` a numpy.ndarray, or a LabeledResult with `labeled`. Failed requests return
+                their error object.
+
+        Raises:
+            ValueError: If `as_array` is combined with `stream` or a format other than 'csv' or 'json',
+                `labeled` is used without `as_array`, or the result can't be decoded into an array.
+        """
+        if as_array and (stream or return_format not in ('csv', 'json')):
+            raise ValueError("as_array requires the 'csv' or 'json' return format and no stream.")
+        if labeled and not as_array:
+            raise ValueError("labeled requires as_array.")
+        query = self._build_query(return_format, optimize)
+        if not stream:
+            result = self._post_query(query, return_format, use_cache)
+            if not as_array or isinstance(result, dict):
+                return result
+            ndim = result_ndim(self._returnExpression) if self._returnExpression is not None else None
+            array = decode_array(result, return_format, dtype, ndim)
+            return LabeledResult(array, self._result_coverage(), self._dbc) if labeled else array
+
+        response = self._dbc.post_query_stream(query)
+        if isinstance(response, dict):
+            return response
+        return spool_response(response, chunk_size, spool_threshold)
+
+    def execute_to(self, target, return_format: str = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                   optimize: bool = True):
+        """
+        Executes the constructed query and writes the result to a file chunk by chunk, so that
+        at most `chunk_size` bytes of it are held in memory.
+
+        Args:
+            target (str | os.PathLike | file object): A path to write to, or a binary file object.
+            return_format (str, optional): Specifies the format in which to return the query result.
+            chunk_size (int): The maximum number of bytes read at once.
+            optimize (bool): If False, the return expression is neither simplified nor are repeated
+                sub-expressions compiled into a `let` clause.
+
+        Returns:
+            int | dict: The number of bytes written, or the error object if the request failed.
+        """
+        query = self._build_query(return_format, optimize)
+        response = self._dbc.post_query_stream(query)
+        if isinstance(response, dict):
+            return response
+        return write_response(response, target, chunk_size)
+
+    def execute_tiled(self, return_format: str = "csv", tile_size=None, max_bytes: int = None,
+                      max_workers: int = 8, retry_policy: RetryPolicy = None, dtype=None,
+                      use_cache: bool = True, optimize: bool = True):
+        """
+        Executes the query as a grid of smaller queries over tiles of its Lat/Long (or other
+        numeric) trims, sends them concurrently and assembles the decoded tiles into one array.
+
+        The tiles follow the cells of the coverage grid taken from DescribeCoverage, so that
+        neighbouring tiles neither overlap nor leave gaps. Tiles that fail are sent again on
+        their own, after the delays of the retry policy, while the tiles that succeeded are kept.
+
+        Args:
+            return_format (str): The encoding of the tiles, 'csv' or 'json'.
+            tile_size (int | dict, optional): The maximum number of cells of a tile along every
+                numeric trim, or per axis name, e.g. {'Lat': 500, 'Long': 500}.
+            max_bytes (int, optional): The maximum size of a decoded tile in bytes.
+            max_workers (int): The maximum number of tile queries in flight at the same time.
+            retry_policy (RetryPolicy, optional): How often and after which delays failed tiles are
+                sent again; by default the policy of the Dbc or a RetryPolicy().
+            dtype (numpy.dtype, optional): The type of the array values, see `execute(as_array=True)`.
+            use_cache (bool): If False, the result cache of the Dbc is bypassed. Retries always bypass it.
+            optimize (bool): If False, the tile queries are sent without simplification and `let` clauses.
+
+        Returns:
+            numpy.ndarray | dict: The whole result, or the error object of a tile that failed on
+                every attempt.
+
+        Raises:
+            ValueError: If the query has no expression, aggregates its coverages, has no numeric
+                trim on a regular grid, or neither tile_size nor max_bytes is given.
+            NetworkRequestError: If the schema of the coverage can't be fetched.
+        """
+        if return_format not in ('csv', 'json'):
+            raise ValueError("Tiled execution requires the 'csv' or 'json' return format.")
+        expression = self._returnExpression
+        reference = self._result_coverage() if expression is not None else None
+        if reference is None:
+            raise ValueError("Only return expressions over a coverage can be tiled.")
+        if any(isinstance(node, AggregationMethod) or (type(node) is Node and node.kind == 'AggregationMethod')
+               for node in iter_nodes(expression)):
+            raise ValueError("Aggregations can't be assembled from tiles.")
+
+        schema = schema_cache.get(self._dbc, reference.get_used_coverage())
+        tiles = plan_tiles(reference, schema, tile_size, max_bytes)
+        sliced = {axis.axis_name for axis in reference.axes if not isinstance(axis.axis_range, tuple)}
+        dims = [name for name in schema.axis_labels if name not in sliced]
+        positions = [dims.index(axis.name) for axis in tiles]
+        combinations = list(itertools.product(*(axis.pieces for axis in tiles)))
+        queries = [self._derive(tile_expression(expression, reference, tiles, [piece[2] for piece in pieces]))
+                   ._build_query(return_format, optimize) for pieces in combinations]
+        ndim = result_ndim(expression)
+
+        arrays = self._execute_parts(queries, return_format,
+                                     lambda result: decode_array(result, return_format, dtype, ndim),
+                                     max_workers, retry_policy, use_cache)
+        if isinstance(arrays, dict):
+            return arrays
+        return stitch(arrays, combinations, tiles, positions, dtype)
+
+    def execute_chunked(self, axis: str = 'ansi', unit: str = 'year', max_workers: int = 8,
+                        retry_policy: RetryPolicy = None, use_cache: bool = True, optimize: bool = True):
+        """
+        Computes an aggregation over a long time trim as several smaller queries over year or
+        month chunks of the trim, sent concurrently, and combines their partial results.
+
+        sum and count of the chunks are added, min and max are reduced, and avg is computed from
+        the sums and cell counts of the chunks, so the result is the one of the single query.
+        Chunks that fail are sent again on their own, after the delays of the retry policy.
+
+        Args:
+            axis (str): The time axis to split.
+            unit (str): The length of a chunk, 'year' or 'month'.
+            max_workers (int): The maximum number of chunk queries in flight at the same time.
+            retry_policy (RetryPolicy, optional): How often and after which delays failed chunks are
+                sent again; by default the policy of the Dbc or a RetryPolicy().
+            use_cache (bool): If False, the result cache of the Dbc is bypassed. Retries always bypass it.
+            optimize (bool): If False, the chunk queries are sent without simplification and `let` clauses.
+
+        Returns:
+            int | float | dict: The value of the aggregation, or the error object of a chunk that
+                failed on every attempt.
+
+        Raises:
+            ValueError: If the return expression is not a sum, count, min, max or avg, or its
+                coverages don't share one trim of the axis with Date bounds.
+        """
+        operation, aggregations = partial_aggregations(self._returnExpression)
+        start, end = time_trim(self._returnExpression, axis)
+        chunks = split_time_range(start, end, unit)
+        queries = [self._derive(chunk_expression(aggregation, axis, bounds))._build_query(None, optimize)
+                   for bounds in chunks for aggregation in aggregations]
+
+        values = self._execute_parts(queries, None, lambda result: decode_array(result, 'csv').item(),
+                                     max_workers, retry_policy, use_cache)
+        if isinstance(values, dict):
+            return values
+        width = len(aggregations)
+        return merge_partials(operation, [values[index:index + width] for index in range(0, len(values), width)])
+
+    def aggregate(self, expression, operations, use_cache: bool = True, optimize: bool = True):
+        """
+        Computes several aggregations of the same expression in a single query, so that the
+        server reads the subset once and only one round trip is paid.
+
+        The aggregations become the bands of one range constructor, e.g.
+        `{b0: max($i0); b1: min($i0); b2: avg($i0)}`, whose values are decoded into a dict.
+
+        Args:
+            expression (any): The expression to aggregate, e.g. a subset Coverage.
+            operations (list | dict): The names of the aggregations, e.g. ["max", "min", "avg", "count"],
+                or a dict mapping result keys to names or to AggregationMethod instances over any
+                expression, e.g. {"max": "max", "warm": AggregationMethod.count(coverage > 15)}.
+            use_cache (bool): If False, the result cache of the Dbc is bypassed for this call.
+            optimize (bool): If False, the query is sent without simplification and `let` clauses.
+
+        Returns:
+            dict | Error: The value of every aggregation by name or key, or the error object if
+                the request failed.
+
+        Raises:
+            ValueError: If no aggregation or an unknown one is requested, or the result doesn't
+                hold one number per aggregation.
+            TypeError: If the expression is not suitable for numeric operations.
+        """
+        if not isinstance(operations, dict):
+            operations = {operation: operation for operation in operations}
+        if not operations:
+            raise ValueError("At least one aggregation must be requested.")
+        aggregations, counts = [], []
+        for operation in operations.values():
+            if isinstance(operation, str):
+                if operation not in ('max', 'min', 'avg', 'sum', 'count'):
+                    raise ValueError(f"Unknown aggregation '{operation}'.")
+                operation = getattr(AggregationMethod, operation)(expression)
+            elif not (isinstance(operation, AggregationMethod)
+                      or (type(operation) is Node and operation.kind == 'AggregationMethod')):
+                raise TypeError("Aggregations must be given by name or as AggregationMethod instances.")
+            aggregations.append(operation)
+            counts.append((operation.label if type(operation) is Node else operation.operation) == 'count')
+
+        fused = aggregations[0] if len(aggregations) == 1 else RangeConstructor(
+            [f"b{index}" for index in range(len(aggregations))], aggregations)
+        query = self._derive(fused)._build_query(None, optimize)
+        result = self._post_query(query, None, use_cache)
+        if isinstance(result, dict):
+            return result
+        values = decode_array(result, 'csv', ndim=0).ravel()
+        if values.size != len(aggregations):
+            raise ValueError(f"The result has {values.size} values, but {len(aggregations)} aggregations were requested.")
+        # cell counts are whole numbers even if other values make the result a float array
+        return {key: int(value) if count else value.item() for key, count, value in zip(operations, counts, values)}
+
+    def sample(self, coverage: Coverage, points, time=None, axes=('Lat', 'Long'), box_size: int = 64,
+               max_workers: int = 8, retry_policy: RetryPolicy = None, dtype=None, use_cache: bool = True,
+               optimize: bool = True):
+        """
+        Reads the values of a coverage at many points, e.g. station locations, with a few queries.
+
+        The points are located on the grid of the coverage taken from DescribeCoverage. Nearby
+        points are grouped into boxes of at most `box_size` cells per axis, one query per box is
+        sent concurrently, and the value of every point is picked out of the decoded box locally.
+        Boxes that fail are sent again on their own, after the delays of the retry policy.
+
+        Args:
+            coverage (Coverage): The coverage to sample; its subsets of other axes are kept.
+            points (sequence): The coordinates of every point along `axes`, e.g. [(53.08, 8.80), ...].
+            time (Date | tuple, optional): A slice or trim of the time axis of the coverage.
+            axes (tuple of str): The axes the point coordinates refer to, in order.
+            box_size (int): The maximum number of cells of a box along every point axis.
+            max_workers (int): The maximum number of box queries in flight at the same time.
+            retry_policy (RetryPolicy, optional): How often and after which delays failed boxes are
+                sent again; by default the policy of the Dbc or a RetryPolicy().
+            dtype (numpy.dtype, optional): The type of the values, see `execute(as_array=True)`.
+            use_cache (bool): If False, the result cache of the Dbc is bypassed. Retries always bypass it.
+            optimize (bool): If False, the box queries are sent without simplification and `let` clauses.
+
+        Returns:
+            numpy.ndarray | dict: The values in the order of the points, with shape (points,), or
+                (points, time steps) for a time trim; or the error object of a box that failed on
+                every attempt.
+
+        Raises:
+            ValueError: If there are no points, a point has the wrong number of coordinates or lies
+                outside of the coverage, an axis has no regular grid or the coverage has no time axis.
+            NetworkRequestError: If the schema of the coverage can't be fetched.
+        """
+        if not isinstance(coverage, Coverage):
+            raise TypeError('The coverage must be an instance of the Coverage class.')
+        if not isinstance(box_size, int) or box_size < 1:
+            raise ValueError("box_size must be a positive number of cells.")
+        coordinates = np.asarray(points, dtype=np.float64)
+        if coordinates.ndim != 2 or coordinates.shape[1] != len(axes) or not coordinates.size:
+            raise ValueError(f"Points must be a non-empty sequence of ({', '.join(axes)}) coordinates.")
+
+        schema = schema_cache.get(self._dbc, coverage.get_used_coverage())
+        point_axes = [PointAxis(schema, name) for name in axes]
+        cells = np.stack([axis.cells(coordinates[:, index]) for index, axis in enumerate(point_axes)], axis=1)
+        time_subset = None
+        if time is not None:
+            time_axes = [name for name in schema.axis_labels if schema.is_time_axis(name)]
+            if not time_axes:
+                raise ValueError(f"Coverage '{coverage.get_used_coverage()}' has no time axis.")
+            time_subset = AxisSubset(time_axes[0], time)
+
+        boxes = group_points(cells, box_size)
+        coverages = [box_coverage(coverage, point_axes, first, last, time_subset) for _, first, last in boxes]
+        sliced = {axis.axis_name for axis in coverages[0].axes if not isinstance(axis.axis_range, tuple)}
+        dims = [name for name in schema.axis_labels if name not in sliced]
+        positions = [dims.index(name) for name in axes]
+        queries = [self._derive(boxed)._build_query("csv", optimize) for boxed in coverages]
+
+        arrays = self._execute_parts(queries, "csv", lambda result: decode_array(result, "csv", dtype, len(dims)),
+                                     max_workers, retry_policy, use_cache)
+        if isinstance(arrays, dict):
+            return arrays
+        result = None
+        for array, (indices, first, last) in zip(arrays, boxes):
+            array = box_array(array, dims, {name: int(high - low) + 1 for name, low, high in zip(axes, first, last)})
+            values = extract_points(array, positions, cells[indices] - first)
+            if result is None:
+                result = np.empty((len(coordinates),) + values.shape[1:], dtype=dtype or values.dtype)
+            elif result.shape[1:] != values.shape[1:]:
+                raise ValueError("The boxes of the points have different shapes along the other axes.")
+            result[indices] = values
+        return result
+
+    def _execute_parts(self, queries, return_format, decode, max_workers, retry_policy, use_cache):
+        """
+        Sends the queries of the parts of a split query concurrently and decodes their results.
+        Parts that fail or can't be decoded are sent again on their own, after the delays of the
+        retry policy, while the results of the other parts are kept.
+
+        Returns:
+            list | dict: The decoded result of every query in order, or the error object of a
+                part that failed on every attempt.
+        """
+        policy = retry_policy or self._dbc.retry_policy or RetryPolicy()
+        results, errors = [None] * len(queries), {}
+        pending = list(range(len(queries)))
+        for attempt in range(policy.max_retries + 1):
+            if attempt:
+                time.sleep(policy.backoff(attempt - 1))
+            calls = [functools.partial(self._post_query, queries[index], return_format, use_cache and not attempt)
+                     for index in pending]
+            failed = []
+            for index, result in zip(pending, run_in_parallel(calls, max_workers)):
+                if isinstance(result, dict):
+                    errors[index] = result
+                    failed.append(index)
+                    continue
+                try:
+                    results[index] = decode(result)
+                except ValueError as e:
+                    errors[index] = request_failed(None, f"Part {index} could not be decoded: {e}", e)
+                    failed.append(index)
+            pending = failed
+            if not pending:
+                break
+        if pending:
+            return errors[pending[0]]
+        return results
+
+    def execute_mapped(self, return_format: str = "tiff", path=None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                       optimize: bool = True):
+        """
+        Executes the constructed query, writes the encoded raster to a file chunk by chunk and
+        maps it into memory, so that large results are never held in memory as a whole.
+
+        The pixels are only read from disk when they are accessed, and all arrays mapping the
+        same file share its pages. Without `path` the result goes to an anonymous temporary file
+        that is removed once the arrays are no longer used.
+
+        Args:
+            return_format (str): The encoding of the result: 'tiff', 'gtiff' or 'netcdf' (classic).
+            path (str | os.PathLike, optional): A file to keep the result in, e.g. to map it from
+                other processes with `map_raster`.
+            chunk_size (int): The maximum number of bytes read at once.
+            optimize (bool): If False, the return expression is neither simplified nor are repeated
+                sub-expressions compiled into a `let` clause.
+
+        Returns:
+            numpy.ndarray | dict: The pixels of a TIFF image or the variables of a netCDF file by
+                name (see `map_raster`), or the error object if the request failed.
+
+        Raises:
+            ValueError: If the format can't be memory-mapped or the result is stored in a layout
+                that can't be mapped, e.g. compressed.
+        """
+        if return_format not in MAPPABLE_FORMATS:
+            raise ValueError(f"Results in the '{return_format}' format can't be memory-mapped.")
+        query = self._build_query(return_format, optimize)
+        response = self._dbc.post_query_stream(query)
+        if isinstance(response, dict):
+            return response
+        if path is not None:
+            write_response(response, path, chunk_size)
+            return map_raster(path, return_format)
+        with tempfile.TemporaryFile() as file:
+            write_response(response, file, chunk_size)
+            return map_raster(file, return_format)
+
+    async def execute_async(self, async_dbc: AsyncDbc, return_format: str = None, timeout: float = None,
+                            use_cache: bool = True, optimize: bool = True):
+        """
+        Executes the constructed query without blocking the running event loop.
+
+        Args:
+            async_dbc (AsyncDbc): The asyncio connection used to send the query.
+            return_format (str, optional): Specifies the format in which to return the query result.
+            timeout (float, optional): Seconds to wait for the result before giving up.
+            use_cache (bool): If False, the result cache of the Dbc is bypassed for this call.
+            optimize (bool): If False, the return expression is neither simplified nor are repeated
+                sub-expressions compiled into a `let` clause.
+
+        Raises:
+            TypeError: If async_dbc is not an instance of AsyncDbc.
+
+        Returns:
+            Response: The result of the executed query, formatted according to return_format if specified.
+        """
+        if not isinstance(async_dbc, AsyncDbc):
+            raise TypeError('An AsyncDbc object must be passed.')
+        query = self._build_query(return_format, optimize)
+        result, store = self._cached_result(query, return_format, use_cache)
+        if result is not None:
+            return result
+        result = await async_dbc.post_query(query, timeout=timeout)
+        store(result)
+        return result
+
+    @staticmethod
+    def execute_many(dcos: list, return_format: str = None, max_workers: int = 8, use_cache: bool = True,
+                     optimize: bool = True):
+        """
+        Executes the queries of several Dco instances on a thread pool.
+
+        Each query is sent through the Dbc of its own Dco, so instances bound to the same Dbc share
+        its connection pool.
+
+        Args:
+            dcos (list[Dco]): The query builders to execute.
+            return_format (str, optional): Specifies the format in which to return every query result.
+            max_workers (int): The maximum number of queries in flight at the same time.
+            use_cache (bool): If False, the result caches of the Dbc objects are bypassed.
+            optimize (bool): If False, the return expressions are neither simplified nor are repeated
+                sub-expressions compiled into `let` clauses.
+
+        Raises:
+            TypeError: If any of dcos is not an instance of Dco.
+
+        Returns:
+            list: One result per Dco in input order, either the response content or an error object.
+        """
+        if not all(isinstance(dco, Dco) for dco in dcos):
+            raise TypeError('All arguments must be instances of the Dco class.')
+        calls = [functools.partial(dco._post_query, dco._build_query(return_format, optimize), return_format,
+                                   use_cache)
+                 for dco in dcos]
+        return run_in_parallel(calls, max_workers)
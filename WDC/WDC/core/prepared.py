@@ -0,0 +1,108 @@
+import functools
+
+from WDC.helper.util.concurrency import run_in_parallel
+from WDC.helper.util.useful_classes import Date, Param
+
+
+def _format_value(name, value):
+    """Returns the query text of a parameter value."""
+    if type(value) in (int, float) or isinstance(value, Date):
+        return str(value)
+    raise TypeError(f"The value of parameter '{name}' must be an int, float or Date.")
+
+
+class PreparedQuery:
+    """
+    A WCPS query compiled once by `Dco.prepare()`, with Param placeholders that are filled in
+    for every execution. Binding only joins the precompiled text with the formatted values,
+    so it's cheap, and since a PreparedQuery is never changed after it is created, it can be
+    bound and executed from many threads at once.
+
+    Attributes:
+        parameters (frozenset of str): The names of the placeholders in the query.
+        return_format (str): The encoding format of the query results, if any.
+    """
+
+    def __init__(self, dco, query: str, return_format: str = None):
+        """
+        Initializes a PreparedQuery from a compiled query.
+
+        Args:
+            dco (Dco): The query builder the query was compiled from; its Dbc executes the query.
+            query (str): The compiled query, with placeholders written as Param markers.
+            return_format (str, optional): The encoding format the query was compiled with.
+        """
+        parts = query.split(Param.MARKER)
+        self._dco = dco
+        self._texts = tuple(parts[0::2])
+        self._names = tuple(parts[1::2])
+        self.parameters = frozenset(self._names)
+        self.return_format = return_format
+
+    def bind(self, **params):
+        """
+        Fills in the placeholders of the query.
+
+        Args:
+            params: One value per placeholder name; numbers for scalars and numeric bounds,
+                Date objects for time bounds.
+
+        Returns:
+            str: The final WCPS query.
+
+        Raises:
+            ValueError: If a placeholder has no value or a value has no placeholder.
+            TypeError: If a value is neither a number nor a Date.
+        """
+        missing = self.parameters.difference(params)
+        if missing:
+            raise ValueError(f"Missing values for parameters: {', '.join(sorted(missing))}.")
+        unknown = set(params).difference(self.parameters)
+        if unknown:
+            raise ValueError(f"Unknown parameters: {', '.join(sorted(unknown))}.")
+        return self._join({name: _format_value(name, value) for name, value in params.items()})
+
+    def _join(self, values):
+        """Returns the query text with the given text in place of every placeholder."""
+        texts = self._texts
+        pieces = [texts[0]]
+        for index, name in enumerate(self._names, 1):
+            pieces.append(values[name])
+            pieces.append(texts[index])
+        return ''.join(pieces)
+
+    def execute(self, use_cache: bool = True, **params):
+        """
+        Binds the placeholders and executes the query through the Dbc of the Dco it was prepared from.
+
+        Args:
+            use_cache (bool): If False, the result cache of the Dbc is bypassed for this call.
+            params: The values of the placeholders, see `bind`.
+
+        Returns:
+            Response: The result of the executed query or the error object of the failed request.
+        """
+        return self._dco._post_query(self.bind(**params), self.return_format, use_cache)
+
+    def execute_many(self, param_sets: list, max_workers: int = 8, use_cache: bool = True):
+        """
+        Executes the query once per set of parameter values on a thread pool.
+
+        Args:
+            param_sets (list of dict): The placeholder values of every execution.
+            max_workers (int): The maximum number of queries in flight at the same time.
+            use_cache (bool): If False, the result cache of the Dbc is bypassed.
+
+        Returns:
+            list: One result per parameter set in input order, either the response content or an error object.
+
+        Raises:
+            ValueError, TypeError: If any parameter set doesn't fit the placeholders, see `bind`.
+        """
+        calls = [functools.partial(self._dco._post_query, self.bind(**params), self.return_format, use_cache)
+                 for params in param_sets]
+        return run_in_parallel(calls, max_workers)
+
+    def __repr__(self):
+        """Returns the query with every placeholder written as {name}."""
+        return self._join({name: '{' + name + '}' for name in self.parameters})
@@ -0,0 +1,144 @@
+import math
+
+import numpy as np
+
+from WDC.helper.util.useful_classes import Date
+from .schema import schema_cache, _date_text
+
+
+def _time_coordinates(start, count, resolution):
+    """
+    Returns the labels of a time axis.
+
+    Starting from a Date, the labels are consecutive years, months or days depending on the
+    precision of the Date. Starting from an ISO time string, they are `resolution` days apart.
+    """
+    if isinstance(start, Date):
+        first = np.datetime64(_date_text(start))
+        return first + np.arange(count)
+    if resolution is None:
+        return None
+    first = np.datetime64(start[:19].rstrip('Z'), 's')
+    return first + (np.arange(count) * resolution * 86400).astype('timedelta64[s]')
+
+
+def _numeric_coordinates(low, high, count, lower, upper, resolution):
+    """
+    Returns the cell centers of `count` cells of a numeric axis, starting with the first cell
+    that intersects [low, high], on the grid described by the axis extent and resolution.
+    """
+    if resolution is None:
+        return low + (np.arange(count) + 0.5) * (high - low) / count
+    if resolution > 0:
+        first = math.floor((low - lower) / resolution)
+        origin = lower
+    else:
+        first = math.floor((high - upper) / resolution)
+        origin = upper
+    return origin + (max(first, 0) + np.arange(count) + 0.5) * resolution
+
+
+class LabeledResult:
+    """
+    The array of a query result together with the names and labels of its axes.
+
+    The labels are derived from the subsets the query was sent with and the DescribeCoverage
+    grid of the coverage, and are only computed when `dims` or `coords` is first accessed, so
+    code that only uses the values pays nothing for them.
+
+    Attributes:
+        data (numpy.ndarray): The values of the result.
+        coverage (Coverage): A copy of the coverage the result was computed from, as it was subset
+            when the query was sent; None for results that are not derived from one coverage.
+    """
+
+    def __init__(self, data, coverage=None, dbc=None):
+        """
+        Initializes a LabeledResult.
+
+        Args:
+            data (numpy.ndarray): The values of the result.
+            coverage (Coverage, optional): The coverage whose axes the result keeps.
+            dbc (Dbc, optional): The connection the DescribeCoverage request of the coverage is sent through.
+        """
+        self.data = data
+        self.coverage = coverage
+        self._dbc = dbc
+        self._dims = None
+        self._coords = None
+
+    @property
+    def shape(self):
+        """The shape of the data."""
+        return self.data.shape
+
+    def __array__(self, dtype=None, copy=None):
+        if dtype is None:
+            return self.data
+        return self.data.astype(dtype)
+
+    def _schema(self):
+        """Returns the DescribeCoverage schema of the coverage, fetching it on first use."""
+        if self.coverage is None or self._dbc is None:
+            raise ValueError("The result is not derived from a coverage and has no axis labels.")
+        return schema_cache.get(self._dbc, self.coverage.get_used_coverage())
+
+    @property
+    def dims(self):
+        """
+        tuple of str: The axis names in the order of the data axes. Sliced axes are not part of
+        the result; a trailing 'band' axis holds the bands of multi-band cells.
+
+        Raises:
+            ValueError: If the axes of the coverage don't match the dimensions of the data.
+        """
+        if self._dims is None:
+            if self.data.ndim == 0:
+                self._dims = ()
+                return self._dims
+            schema = self._schema()
+            sliced = {axis.axis_name for axis in self.coverage.axes if not isinstance(axis.axis_range, tuple)}
+            dims = tuple(name for name in schema.axis_labels if name not in sliced)
+            if self.data.ndim == len(dims) + 1:
+                dims += ('band',)
+            if self.data.ndim != len(dims):
+                raise ValueError(
+                    f"The result has {self.data.ndim} dimensions, but coverage "
+                    f"'{self.coverage.get_used_coverage()}' keeps the axes {', '.join(dims) or 'none'}.")
+            self._dims = dims
+        return self._dims
+
+    @property
+    def coords(self):
+        """
+        dict: The labels of every axis by name: cell centers for numeric axes, numpy.datetime64
+        values for time axes and band names for the band axis. Time axes that are neither subset
+        with a Date nor have a regular grid have the label None.
+        """
+        if self._coords is None:
+            dims = self.dims
+            coords = {}
+            if dims:
+                schema = self._schema()
+                ranges = {axis.axis_name: axis.axis_range for axis in self.coverage.axes}
+                for name, count in zip(dims, self.data.shape):
+                    coords[name] = self._coordinates(schema, name, count, ranges.get(name))
+            self._coords = coords
+        return self._coords
+
+    @staticmethod
+    def _coordinates(schema, name, count, axis_range):
+        """Returns the labels of one axis with `count` cells, trimmed to `axis_range` if given."""
+        if name == 'band':
+            names = schema.band_names
+            return np.array(names) if len(names) == count else np.arange(count)
+        index = schema.axis_index(name)
+        lower, upper = schema.lower_bounds[index], schema.upper_bounds[index]
+        resolution = schema.resolution[index]
+        if schema.is_time_axis(name):
+            return _time_coordinates(axis_range[0] if axis_range else lower, count, resolution)
+        low, high = sorted(axis_range) if axis_range else (lower, upper)
+        return _numeric_coordinates(low, high, count, lower, upper, resolution)
+
+    def __repr__(self):
+        return f"LabeledResult(shape={self.data.shape}, dtype={self.data.dtype})"
@@ -0,0 +1,129 @@
+import copy
+
+import numpy as np
+
+from .coverage import AxisSubset
+
+# point coordinates this close to a cell edge count as lying on it, like in tiling
+_EDGE_TOLERANCE = 1e-9
+
+
+class PointAxis:
+    """
+    The grid of one coverage axis that points are sampled along.
+
+    Attributes:
+        name (str): The name of the axis.
+    """
+
+    def __init__(self, schema, name):
+        """
+        Raises:
+            ValueError: If the axis has no regular grid.
+        """
+        index = schema.axis_index(name)
+        resolution = schema.resolution[index]
+        if resolution is None:
+            raise ValueError(f"Axis '{name}' has no regular grid and can't be sampled at points.")
+        self.name = name
+        self._resolution = resolution
+        self._origin = schema.lower_bounds[index] if resolution > 0 else schema.upper_bounds[index]
+        self._size = schema.grid_size[index]
+
+    def cells(self, coordinates):
+        """
+        Returns the grid indices of the cells that contain the coordinates.
+
+        Raises:
+            ValueError: If a coordinate lies outside of the coverage.
+        """
+        cells = np.floor((coordinates - self._origin) / self._resolution + _EDGE_TOLERANCE).astype(np.int64)
+        outside = (cells < 0) | (cells >= self._size if self._size is not None else False)
+        if np.any(outside):
+            point = int(np.flatnonzero(outside)[0])
+            raise ValueError(f"Point {point} lies outside of the coverage along axis '{self.name}'.")
+        return cells
+
+    def bounds(self, first, last):
+        """Returns the trim from the center of cell `first` to the center of cell `last`, low bound first."""
+        # rounded, so that the bound is written as e.g. 50.15 rather than 50.150000000000006
+        centers = [round(self._origin + (cell + 0.5) * self._resolution, 10) for cell in (first, last)]
+        return min(centers), max(centers)
+
+
+def group_points(cells, box_size):
+    """
+    Groups points into boxes of at most `box_size` cells along every axis.
+
+    The grid is divided into blocks of `box_size` cells per axis and every block that contains
+    points becomes one box, trimmed to the cells its points occupy, so nearby points share a
+    query and the number of boxes is at most the number of occupied blocks.
+
+    Args:
+        cells (numpy.ndarray): The grid indices of every point, with shape (points, axes).
+        box_size (int): The maximum number of cells of a box along every axis.
+
+    Returns:
+        list of tuple: The indices of the points of every box and the first and last grid index
+            of the box along every axis.
+    """
+    blocks = cells // box_size
+    _, box_of_point = np.unique(blocks, axis=0, return_inverse=True)
+    box_of_point = box_of_point.reshape(-1)
+    order = np.argsort(box_of_point, kind='stable')
+    splits = np.flatnonzero(np.diff(box_of_point[order])) + 1
+    boxes = []
+    for points in np.split(order, splits):
+        box_cells = cells[points]
+        boxes.append((points, box_cells.min(axis=0), box_cells.max(axis=0)))
+    return boxes
+
+
+def box_coverage(coverage, axes, first, last, time_subset=None):
+    """Returns a copy of a coverage trimmed to a box of cells along the point axes, and to the time subset if given."""
+    trims = {axis.name: AxisSubset(axis.name, axis.bounds(int(low), int(high)))
+             for axis, low, high in zip(axes, first, last)}
+    if time_subset is not None:
+        trims[time_subset.axis_name] = time_subset
+    boxed = copy.copy(coverage)
+    boxed.apply_axes([axis for axis in coverage.axes if axis.axis_name not in trims] + list(trims.values()))
+    return boxed
+
+
+def box_array(array, dims, sizes):
+    """
+    Gives the decoded result of a box the shape of its axes. Boxes that are one cell wide along
+    an axis are written without the brackets of that axis, so the decoder can't restore it.
+
+    Args:
+        array (numpy.ndarray): The decoded values of the box.
+        dims (list of str): The names of the axes the result keeps, in order.
+        sizes (dict): The number of cells of the box along every point axis.
+
+    Raises:
+        ValueError: If the values don't fit the box.
+    """
+    shape = [sizes.get(name, -1) for name in dims]
+    # a trailing band axis is not part of dims
+    if array.ndim in (len(shape), len(shape) + 1) and all(size in (-1, length) for size, length in zip(shape, array.shape)):
+        return array
+    if shape.count(-1) > 1:
+        raise ValueError(f"A box has {array.shape} cells, which don't match the axes {', '.join(dims)}.")
+    return array.reshape(shape)
+
+
+def extract_points(array, positions, offsets):
+    """
+    Picks the values of points out of the decoded result of their box.
+
+    Args:
+        array (numpy.ndarray): The values of the box.
+        positions (list of int): The position of every point axis among the array axes.
+        offsets (numpy.ndarray): The cell of every point counted from the first cell of the box,
+            with shape (points, point axes).
+
+    Returns:
+        numpy.ndarray: The values with shape (points,) followed by the shape of the other axes, e.g. time.
+    """
+    array = np.moveaxis(array, positions, range(len(positions)))
+    return array[tuple(offsets.T)]
@@ -0,0 +1,295 @@
+import re
+import threading
+import xml.etree.ElementTree as ET
+
+from WDC.helper.error_handling.err import NetworkRequestError
+from WDC.helper.util.useful_classes import Date
+
+
+def _local_name(tag):
+    """Returns the tag of an XML element without its namespace."""
+    return tag.rsplit('}', 1)[-1]
+
+
+def _split_coordinates(text):
+    """Splits a GML coordinate list such as '"2000-02-01T00:00:00.000Z" -90 -180' into its values."""
+    values = []
+    for token in re.findall(r'"[^"]*"|\S+', text or ''):
+        if token.startswith('"'):
+            values.append(token.strip('"'))
+        else:
+            try:
+                values.append(int(token))
+            except ValueError:
+                try:
+                    values.append(float(token))
+                except ValueError:
+                    values.append(token)
+    return values
+
+
+def _date_from_text(text, precision):
+    """Creates a Date from an ISO time string, keeping `precision` components (1: year, 2: month, 3: day)."""
+    parts = [int(part) for part in text[:10].split('-')[:precision]]
+    return Date(*parts)
+
+
+def _date_text(date: Date):
+    """Returns the ISO form of a Date without quotes, e.g. '2014-07'."""
+    return str(date).strip('"')
+
+
+class CoverageSchema:
+    """
+    Describes the axes of a coverage as reported by a DescribeCoverage request.
+
+    Attributes:
+        coverage_id (str): The name of the coverage.
+        axis_labels (list of str): The axis names in the coverage's native order.
+        lower_bounds (list): The lower bound of each axis; a number, or an ISO string for time axes.
+        upper_bounds (list): The upper bound of each axis; a number, or an ISO string for time axes.
+        resolution (list): The signed cell size of each axis taken from the grid offset vectors,
+            or None where the grid doesn't report one.
+        grid_size (list): The number of grid cells along each axis, or None if unknown.
+        crs (str): The CRS identifier of the coverage.
+        cell_types (list of str): The data type of every band, e.g. 'float32'.
+        band_names (list of str): The name of every band.
+    """
+
+    def __init__(self, coverage_id, axis_labels, lower_bounds, upper_bounds, resolution=None,
+                 grid_size=None, crs=None, cell_types=None, band_names=None):
+        self.coverage_id = coverage_id
+        self.axis_labels = list(axis_labels)
+        self.lower_bounds = list(lower_bounds)
+        self.upper_bounds = list(upper_bounds)
+        self.resolution = list(resolution) if resolution is not None else [None] * len(self.axis_labels)
+        self.grid_size = list(grid_size) if grid_size is not None else [None] * len(self.axis_labels)
+        self.crs = crs
+        self.cell_types = list(cell_types or [])
+        self.band_names = list(band_names or [])
+
+    @classmethod
+    def from_describe_coverage(cls, document):
+        """
+        Builds a CoverageSchema from the XML returned by a WCS DescribeCoverage request.
+
+        Args:
+            document (str | bytes): The DescribeCoverage response.
+
+        Raises:
+            ValueError: If the document does not describe a coverage envelope.
+        """
+        root = ET.fromstring(document)
+        elements = {}
+        for element in root.iter():
+            elements.setdefault(_local_name(element.tag), element)
+
+        envelope = elements.get('Envelope')
+        if envelope is None:
+            raise ValueError("The DescribeCoverage response does not contain an Envelope.")
+        axis_labels = envelope.attrib.get('axisLabels', '').split()
+        lower_bounds = _split_coordinates(elements['lowerCorner'].text)
+        upper_bounds = _split_coordinates(elements['upperCorner'].text)
+
+        coverage_id = elements['CoverageId'].text if 'CoverageId' in elements else None
+
+        resolution = [None] * len(axis_labels)
+        for element in root.iter():
+            if _local_name(element.tag) != 'offsetVector':
+                continue
+            vector = _split_coordinates(element.text)
+            for index, component in enumerate(vector[:len(axis_labels)]):
+                if isinstance(component, (int, float)) and component != 0:
+                    resolution[index] = component
+
+        grid_size = None
+        if 'low' in elements and 'high' in elements:
+            low = _split_coordinates(elements['low'].text)
+            high = _split_coordinates(elements['high'].text)
+            grid_size = [int(h - l) + 1 for l, h in zip(low, high)]
+
+        band_names, cell_types = [], []
+        for element in root.iter():
+            if _local_name(element.tag) != 'field':
+                continue
+            band_names.append(element.attrib.get('name'))
+            quantity = next(iter(element), None)
+            definition = quantity.attrib.get('definition', '') if quantity is not None else ''
+            cell_types.append(definition.rsplit('/', 1)[-1] or None)
+
+        return cls(coverage_id, axis_labels, lower_bounds, upper_bounds, resolution, grid_size,
+                   envelope.attrib.get('srsName'), cell_types, band_names)
+
+    def axis_index(self, axis_name):
+        """
+        Returns the position of an axis in the coverage's native axis order.
+
+        Raises:
+            ValueError: If the coverage has no axis with this name.
+        """
+        try:
+            return self.axis_labels.index(axis_name)
+        except ValueError:
+            raise ValueError(
+                f"Axis '{axis_name}' does not exist in coverage '{self.coverage_id}'. "
+                f"Available axes: {', '.join(self.axis_labels)}.") from None
+
+    def is_time_axis(self, axis_name):
+        """Returns True if the bounds of the axis are time strings."""
+        return isinstance(self.lower_bounds[self.axis_index(axis_name)], str)
+
+    def _check_bound(self, axis_name, value):
+        """Returns -1, 0 or 1 depending on whether value lies below, inside or above the axis extent."""
+        index = self.axis_index(axis_name)
+        lower, upper = self.lower_bounds[index], self.upper_bounds[index]
+        if isinstance(lower, str):
+            if not isinstance(value, Date):
+                raise TypeError(f"Axis '{axis_name}' is a time axis and must be subset with Date values.")
+            text = _date_text(value)
+            lower, upper = lower[:len(text)], upper[:len(text)]
+        elif isinstance(value, (int, float)):
+            text = value
+        else:
+            raise TypeError(f"Axis '{axis_name}' must be subset with numbers.")
+        if text < lower:
+            return -1
+        if text > upper:
+            return 1
+        return 0
+
+    def _bound(self, axis_name, side, like):
+        """Returns the lower (side -1) or upper (side 1) bound of an axis in the type of `like`."""
+        index = self.axis_index(axis_name)
+        bound = self.lower_bounds[index] if side < 0 else self.upper_bounds[index]
+        if isinstance(like, Date):
+            precision = 1 + (like.month is not None) + (like.day is not None)
+            return _date_from_text(bound, precision)
+        return bound
+
+    def validate_subset(self, axis_subset, clamp=False):
+        """
+        Checks an axis subset against the extent of the coverage.
+
+        Args:
+            axis_subset (AxisSubset): The subset to check.
+            clamp (bool): If True, trim bounds that exceed the extent are moved onto it instead of
+                raising an error.
+
+        Returns:
+            AxisSubset: The subset itself, or a clamped copy of it.
+
+        Raises:
+            ValueError: If the axis does not exist, the subset lies outside the extent, or its
+                bounds are in the wrong order.
+            TypeError: If the subset values don't match the type of the axis.
+        """
+        from .coverage import AxisSubset
+
+        name = axis_subset.axis_name
+        axis_range = axis_subset.axis_range
+        if not isinstance(axis_range, tuple):
+            if not isinstance(axis_range, (int, float, Date)):
+                return axis_subset
+            position = self._check_bound(name, axis_range)
+            if position == 0:
+                return axis_subset
+            if not clamp:
+                raise ValueError(
+                    f"Slice {axis_range} is outside the extent of axis '{name}' in coverage '{self.coverage_id}'.")
+            return AxisSubset(name, self._bound(name, position, axis_range))
+
+        low, high = axis_range
+        if not all(isinstance(value, (int, float, Date)) for value in axis_range):
+            return axis_subset
+        low_position, high_position = self._check_bound(name, low), self._check_bound(name, high)
+        lower_text = _date_text(low) if isinstance(low, Date) else low
+        upper_text = _date_text(high) if isinstance(high, Date) else high
+        if lower_text > upper_text:
+            raise ValueError(f"The lower bound of axis '{name}' is greater than its upper bound.")
+        if low_position == high_position != 0:
+            raise ValueError(
+                f"Trim {lower_text}:{upper_text} is outside the extent of axis '{name}' in coverage '{self.coverage_id}'.")
+        if low_position == high_position == 0:
+            return axis_subset
+        if not clamp:
+            raise ValueError(
+                f"Trim {lower_text}:{upper_text} exceeds the extent of axis '{name}' in coverage '{self.coverage_id}'.")
+        low = self._bound(name, -1, low) if low_position < 0 else low
+        high = self._bound(name, 1, high) if high_position > 0 else high
+        return AxisSubset(name, (low, high))
+
+    def validate_axes(self, axes, clamp=False):
+        """Validates several axis subsets, see `validate_subset`, and returns the resulting subsets."""
+        names = [axis.axis_name for axis in axes]
+        if len(set(names)) != len(names):
+            raise ValueError(f"An axis is subset more than once in coverage '{self.coverage_id}'.")
+        return [self.validate_subset(axis, clamp) for axis in axes]
+
+
+class SchemaCache:
+    """
+    Process-wide cache of coverage schemas, so that DescribeCoverage is requested only once per
+    coverage and endpoint no matter how many Coverage and Dco instances use it.
+    """
+
+    def __init__(self):
+        self._schemas = {}
+        # one lock per endpoint and coverage, so a slow DescribeCoverage only holds up its own callers
+        self._fetch_locks = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, coverage_id, endpoint=None):
+        """
+        Returns an already cached schema without contacting the server.
+
+        Args:
+            coverage_id (str): The name of the coverage.
+            endpoint (str, optional): The server endpoint; if omitted, a schema from any endpoint is used.
+
+        Returns:
+            CoverageSchema | None: The cached schema, or None if it hasn't been fetched yet.
+        """
+        if endpoint is not None:
+            return self._schemas.get((endpoint, coverage_id))
+        for (_, cached_id), schema in list(self._schemas.items()):
+            if cached_id == coverage_id:
+                return schema
+        return None
+
+    def put(self, endpoint, schema):
+        """Stores the schema of a coverage served by the given endpoint."""
+        self._schemas[(endpoint, schema.coverage_id)] = schema
+
+    def get(self, dbc, coverage_id):
+        """
+        Returns the schema of a coverage, requesting DescribeCoverage through the Dbc on first use.
+
+        Raises:
+            NetworkRequestError: If the DescribeCoverage request fails.
+        """
+        endpoint = dbc.params['endpoint']
+        schema = self.lookup(coverage_id, endpoint)
+        if schema is not None:
+            return schema
+        with self._lock:
+            fetch_lock = self._fetch_locks.setdefault((endpoint, coverage_id), threading.Lock())
+        with fetch_lock:
+            schema = self.lookup(coverage_id, endpoint)
+            if schema is None:
+                response = dbc.post_request(request='DescribeCoverage', coverageId=coverage_id)
+                if isinstance(response, dict):
+                    raise NetworkRequestError(
+                        f"DescribeCoverage for '{coverage_id}' failed: {response['error']['exceptionDetail']}")
+                schema = CoverageSchema.from_describe_coverage(response)
+                schema.coverage_id = schema.coverage_id or coverage_id
+                self._schemas[(endpoint, coverage_id)] = schema
+        return schema
+
+    def clear(self):
+        """Removes all cached schemas."""
+        with self._lock:
+            self._schemas.clear()
+            self._fetch_locks.clear()
+
+
+schema_cache = SchemaCache()
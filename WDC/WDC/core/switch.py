@@ -2,6 +2,7 @@
 from WDC.helper.util.useful_classes import RGB
 from WDC.helper.error_handling.type_checks import type_check_for_binary_and_numeric_operations
 from WDC.helper.operations.binary_expressions import BinaryComparisonOperation
+from WDC.helper.operations.serializer import serialize
 
 
 class Case:
@@ -18,6 +19,7 @@ class Case:
         set_condition(condition): Sets the condition for the case.
         set_return_value(return_value): Sets the return value for the case.
     """
+    __slots__ = ('condition', 'return_value')
 
     def __init__(self, condition, return_value):
         """
@@ -64,7 +66,7 @@ class Case:
 
     def __repr__(self):
         """Returns a formal string representation of the Case object."""
-        return f'case {self.condition} return {self.return_value}'
+        return serialize(self)
 
     def __str__(self):
         """Returns the string representation of the Case object, identical to __repr__."""
@@ -134,11 +136,7 @@ class Switch:
 
     def __repr__(self):
         """Returns a formal string representation of the Switch object."""
-        switch_representation = 'switch\n'
-        for case in self.cases:
-            switch_representation += str(case) + '\n'
-        switch_representation += f'default return {self.default}\n'
-        return switch_representation
+        return serialize(self)
 
     def __str__(self):
         """Returns the string representation of the Switch object, identical to __repr__."""
@@ -0,0 +1,197 @@
+import copy
+import math
+
+import numpy as np
+
+from WDC.helper.operations.nodes import Node
+from WDC.helper.operations.tree import iter_nodes, replace_nodes
+from .coverage import Coverage, AxisSubset
+
+# cell positions this close to a cell edge count as lying on it
+_EDGE_TOLERANCE = 1e-9
+
+
+class AxisTiling:
+    """
+    The split of one trimmed axis into tiles that follow the cells of the coverage grid.
+
+    Attributes:
+        name (str): The name of the axis.
+        low (float): The lower bound of the trim.
+        high (float): The upper bound of the trim.
+        first (int): The grid index of the first cell of the trim.
+        count (int): The number of cells of the trim.
+        pieces (list of tuple): The (offset, length, (low, high)) of every tile along the axis;
+            offsets count cells from `first` and the bounds are the trim of the tile.
+    """
+
+    def __init__(self, schema, name, low, high):
+        """
+        Locates the cells of a trim on the grid of a coverage axis.
+
+        Raises:
+            ValueError: If the axis has no regular grid.
+        """
+        index = schema.axis_index(name)
+        resolution = schema.resolution[index]
+        if resolution is None:
+            raise ValueError(f"Axis '{name}' has no regular grid and can't be tiled.")
+        self.name = name
+        self.low, self.high = low, high
+        self._resolution = resolution
+        self._origin = schema.lower_bounds[index] if resolution > 0 else schema.upper_bounds[index]
+        # grid indices grow from the origin in the direction of the resolution
+        near, far = (low, high) if resolution > 0 else (high, low)
+        first = math.floor((near - self._origin) / resolution + _EDGE_TOLERANCE)
+        end = math.ceil((far - self._origin) / resolution - _EDGE_TOLERANCE)
+        self.first = max(first, 0)
+        if schema.grid_size[index] is not None:
+            end = min(end, schema.grid_size[index])
+        self.count = max(end - self.first, 1)
+        self.pieces = [(0, self.count, (low, high))]
+
+    def center(self, cell):
+        """Returns the coordinate of the center of a cell, counted from `first`."""
+        # rounded, so that the bound is written as e.g. 50.15 rather than 50.150000000000006
+        return round(self._origin + (self.first + cell + 0.5) * self._resolution, 10)
+
+    def split(self, tile_cells):
+        """
+        Splits the axis into tiles of at most `tile_cells` cells. Inner tile bounds are the
+        centers of the first and last cell of the tile, so that neighbouring tiles share no cell;
+        the outer bounds stay those of the original trim.
+        """
+        pieces = []
+        for offset in range(0, self.count, tile_cells):
+            length = min(tile_cells, self.count - offset)
+            near = self.center(offset) if offset else None
+            far = self.center(offset + length - 1) if offset + length < self.count else None
+            if self._resolution > 0:
+                bounds = (self.low if near is None else near, self.high if far is None else far)
+            else:
+                bounds = (self.low if far is None else far, self.high if near is None else near)
+            pieces.append((offset, length, bounds))
+        self.pieces = pieces
+
+
+def _cell_bytes(schema):
+    """Returns the size of one decoded cell from the band types of the coverage, 8 bytes per band if unknown."""
+    size = 0
+    for cell_type in schema.cell_types or [None]:
+        try:
+            size += np.dtype(cell_type).itemsize if cell_type else 8
+        except TypeError:
+            size += 8
+    return size
+
+
+def plan_tiles(coverage, schema, tile_size=None, max_bytes=None):
+    """
+    Splits the numeric trims of a coverage into a grid of tiles.
+
+    Args:
+        coverage (Coverage): The coverage whose subset is tiled.
+        schema (CoverageSchema): The DescribeCoverage schema of the coverage.
+        tile_size (int | dict, optional): The maximum number of cells of a tile along every
+            tiled axis, or per axis name; axes missing from the dict are not split.
+        max_bytes (int, optional): The maximum size of a decoded tile, counting the cells of the
+            tiled axes and the band types of the coverage; other trimmed axes, e.g. time, are not counted.
+
+    Returns:
+        list of AxisTiling: The tiled axes.
+
+    Raises:
+        ValueError: If neither limit is given, the coverage has no numeric trim or an axis has no regular grid.
+    """
+    if tile_size is None and max_bytes is None:
+        raise ValueError("Either tile_size or max_bytes must be given.")
+    axes = [AxisTiling(schema, axis.axis_name, *axis.axis_range) for axis in coverage.axes
+            if isinstance(axis.axis_range, tuple) and not schema.is_time_axis(axis.axis_name)
+            and all(type(bound) in (int, float) for bound in axis.axis_range)]
+    if not axes:
+        raise ValueError(f"Coverage '{coverage.get_used_coverage()}' has no numeric trim that can be tiled.")
+
+    cells = {axis.name: axis.count for axis in axes}
+    if tile_size is not None:
+        for axis in axes:
+            limit = tile_size.get(axis.name) if isinstance(tile_size, dict) else tile_size
+            if limit is not None:
+                if not isinstance(limit, int) or limit < 1:
+                    raise ValueError("tile_size must be a positive number of cells.")
+                cells[axis.name] = min(cells[axis.name], limit)
+    if max_bytes is not None:
+        allowed = max(1, max_bytes // _cell_bytes(schema))
+        while math.prod(cells.values()) > allowed:
+            name = max(cells, key=cells.get)
+            if cells[name] == 1:
+                break
+            cells[name] = -(-cells[name] // 2)
+    for axis in axes:
+        axis.split(cells[axis.name])
+    return axes
+
+
+def tile_expression(expression, reference, tiles, bounds):
+    """
+    Returns a copy of a query expression in which every coverage is trimmed to one tile.
+
+    Args:
+        expression (any): The root of the query expression.
+        reference (Coverage): The coverage the tiles were planned for.
+        tiles (list of AxisTiling): The tiled axes.
+        bounds (tuple): The trim of the tile along every tiled axis.
+
+    Raises:
+        ValueError: If a coverage of the expression is not trimmed like the reference along a tiled axis.
+    """
+    trims = {axis.name: (axis.low, axis.high) for axis in tiles}
+    tile_trims = {axis.name: bound for axis, bound in zip(tiles, bounds)}
+    replacements = {}
+    for node in iter_nodes(expression):
+        frozen = type(node) is Node and node.kind == 'Coverage'
+        coverage = node.value if frozen else node
+        if not isinstance(coverage, Coverage) or id(node) in replacements:
+            continue
+        ranges = {axis.axis_name: axis.axis_range for axis in coverage.axes}
+        if any(ranges.get(name) != trim for name, trim in trims.items()):
+            raise ValueError(
+                f"Coverage '{coverage.get_used_coverage()}' is not trimmed like "
+                f"'{reference.get_used_coverage()}' along the tiled axes.")
+        tiled = copy.copy(coverage)
+        tiled.apply_axes([AxisSubset(axis.axis_name, tile_trims[axis.axis_name])
+                          if axis.axis_name in tile_trims else axis for axis in coverage.axes])
+        if frozen:
+            tiled = Node('Coverage', (tiled.get_used_coverage(), tiled.subset), (), tiled)
+        replacements[id(node)] = tiled
+    return replace_nodes(expression, replacements)
+
+
+def stitch(arrays, combinations, tiles, positions, dtype=None):
+    """
+    Assembles decoded tiles into one array.
+
+    Args:
+        arrays (list of numpy.ndarray): The decoded tiles.
+        combinations (list of tuple): The piece of every tiled axis each tile covers, see `AxisTiling.pieces`.
+        tiles (list of AxisTiling): The tiled axes.
+        positions (list of int): The position of every tiled axis among the array axes.
+        dtype (numpy.dtype, optional): The type of the result; by default the common type of the tiles.
+
+    Returns:
+        numpy.ndarray: The whole result.
+
+    Raises:
+        ValueError: If a tile doesn't have the number of cells it was planned with.
+    """
+    shape = list(arrays[0].shape)
+    for axis, position in zip(tiles, positions):
+        shape[position] = axis.count
+    result = np.empty(shape, dtype=dtype or np.result_type(*arrays))
+    for array, pieces in zip(arrays, combinations):
+        index = [slice(None)] * len(shape)
+        for axis, (offset, length, _), position in zip(tiles, pieces, positions):
+            if array.ndim != len(shape) or array.shape[position] != length:
+                raise ValueError(f"A tile has {array.shape} cells, but {length} were planned along axis '{axis.name}'.")
+            index[position] = slice(offset, offset + length)
+        result[tuple(index)] = array
+    return result
@@ -1,3 +1,6 @@
+import contextlib
+import threading
+
 from WDC.helper.util.constants import dictionary_of_data_formats
 
 
@@ -55,13 +58,78 @@ def type_check_subset(argument, additional_type):
             f"The arguments must be int, float, or {additional_type}")
 
 
+class _ValidationState(threading.local):
+    """Per-thread switch of the deferred validation mode."""
+    deferred = False
+
+
+_validation_state = _ValidationState()
+
+# classes whose instances can be operands of query expressions; extended by register_operand_type
+_operand_types = {int, float}
+
+# the result of the operand check per concrete class, filled on first use
+_operand_type_cache = {}
+
+
+def register_operand_type(cls):
+    """
+    Allows instances of a class and its subclasses as operands of query expressions.
+
+    The query-model classes register themselves when they are defined.
+
+    Args:
+        cls (type): The class to allow.
+
+    Returns:
+        type: The class itself, so the function can be used as a class decorator.
+    """
+    _operand_types.add(cls)
+    _operand_type_cache.clear()
+    return cls
+
+
+def is_operand_type(cls):
+    """
+    Returns True if instances of the class can be operands of query expressions.
+
+    The answer is computed once per class from the registered classes; bool is never an operand.
+    """
+    allowed = _operand_type_cache.get(cls)
+    if allowed is None:
+        allowed = not issubclass(cls, bool) and issubclass(cls, tuple(_operand_types))
+        _operand_type_cache[cls] = allowed
+    return allowed
+
+
+@contextlib.contextmanager
+def deferred_validation():
+    """
+    Skips the operand check of every operator and builder call in the current thread while active.
+
+    The expression is then checked once as a whole by `validate_expression`, which `Dco` runs
+    when it builds the query, so building large expressions in a loop doesn't pay for a check per
+    operation.
+
+    Example:
+        with deferred_validation():
+            expression = sum_of_terms(coverage)
+        dco.return_expression(expression).execute()
+    """
+    previous = _validation_state.deferred
+    _validation_state.deferred = True
+    try:
+        yield
+    finally:
+        _validation_state.deferred = previous
+
+
 def type_check_for_binary_and_numeric_operations(instance_to_check):
     """
     Validates the type of the instance to ensure it is appropriate for binary and numeric operations.
 
-    This function checks if the instance belongs to a set of allowed types suitable for various
-    operations like arithmetic or comparison within a system. If the instance is not one of the
-    allowed types, the function raises a TypeError.
+    The check dispatches on the class of the instance (see `register_operand_type`), so subclasses
+    of the allowed classes are accepted. Inside `deferred_validation()` the check is skipped.
 
     Args:
         instance_to_check (any): The instance whose type is to be validated.
@@ -77,20 +145,50 @@ def type_check_for_binary_and_numeric_operations(instance_to_check):
         - 'float': The floating-point data type.
         - 'AggregationMethod': Represents a method for data aggregation.
         - 'MathOperation': Represents a mathematical operation.
+        - 'Param': Represents a placeholder filled in when a prepared query is bound.
+        - 'Node': Represents an immutable, interned expression created by `freeze`.
     """
-    allowed_types = {
-        'Coverage',
-        'BinaryArithmeticOperation',
-        'BinaryComparisonOperation',
-        'int',
-        'float',
-        'AggregationMethod',
-        'MathOperation'
-    }
-    if type(instance_to_check).__name__ not in allowed_types:
+    if _validation_state.deferred:
+        return
+    if not is_operand_type(type(instance_to_check)):
         raise TypeError("The type of the instance you passed is not allowed.")
 
 
+def validate_expression(root):
+    """
+    Checks the operands of a whole query expression in one pass without recursion, the same way
+    they are checked when the expression is built.
+
+    Args:
+        root (any): The return expression or Switch of a query.
+
+    Raises:
+        TypeError: If an operand anywhere in the expression has a type that is not allowed.
+    """
+    from WDC.helper.operations.tree import children_of, iter_nodes
+    from WDC.helper.operations.binary_expressions import BinaryArithmeticOperation, BinaryComparisonOperation
+    from WDC.helper.operations.numoperations import AggregationMethod, MathOperation, ArgumentList, RangeConstructor
+    from WDC.helper.util.useful_classes import RGB
+    from WDC.core.switch import Case, Switch
+
+    def check(operand):
+        if not is_operand_type(type(operand)):
+            raise TypeError("The type of the instance you passed is not allowed.")
+
+    if not isinstance(root, Switch):
+        check(root)
+    for node in iter_nodes(root):
+        if isinstance(node, (BinaryArithmeticOperation, BinaryComparisonOperation, ArgumentList, RangeConstructor)):
+            for child in children_of(node):
+                check(child)
+        elif isinstance(node, (Case, Switch)):
+            value = node.return_value if isinstance(node, Case) else node.default
+            if not isinstance(value, RGB):
+                check(value)
+        elif isinstance(node, (AggregationMethod, MathOperation)) and not isinstance(node.expression, ArgumentList):
+            check(node.expression)
+
+
 def data_format_exists(data_format: str):
     """
     Checks if a given data format exists in the dictionary of data formats and returns its MIME type.
@@ -1,4 +1,5 @@
-from WDC.helper.error_handling.type_checks import type_check_for_binary_and_numeric_operations
+from WDC.helper.error_handling.type_checks import type_check_for_binary_and_numeric_operations, register_operand_type
+from .serializer import serialize
 
 
 class OperatorOverloading:
@@ -11,6 +12,7 @@ class OperatorOverloading:
         BinaryArithmeticOperation(for arithmetic operations) or BinaryComparisonOperation(for comparison opeartions)
 
     """
+    __slots__ = ()
 
     def __add__(self, other):
         type_check_for_binary_and_numeric_operations(other)
@@ -53,6 +55,7 @@ class OperatorOverloading:
         return BinaryComparisonOperation(self, '>=', other)
 
 
+@register_operand_type
 class BinaryArithmeticOperation:
     """
     Class representing binary arithmetic operations between expressions.
@@ -62,6 +65,7 @@ class BinaryArithmeticOperation:
     Returns for each method:
          an instance of itself(BinaryArithmeticOperation): The string form of the arithmetic operation.
     """
+    __slots__ = ('left', 'operator', 'right')
 
     def __init__(self, left, operator, right):
         """
@@ -77,7 +81,7 @@ class BinaryArithmeticOperation:
         self.right = right
 
     def __str__(self):
-        return f"({self.left} {self.operator} {self.right})"
+        return serialize(self)
 
     def __add__(self, other):
         type_check_for_binary_and_numeric_operations(other)
@@ -96,6 +100,7 @@ class BinaryArithmeticOperation:
         return BinaryArithmeticOperation(self, '/', other)
 
 
+@register_operand_type
 class BinaryComparisonOperation:
     """
     Class representing binary comparison operations between expressions.
@@ -105,6 +110,7 @@ class BinaryComparisonOperation:
     Returns for each method:
          an instance of itself(BinaryComparisonOperation): The string form of the comparison operation.
     """
+    __slots__ = ('left', 'operator', 'right')
 
     def __init__(self, left, operator, right):
         """
@@ -120,7 +126,7 @@ class BinaryComparisonOperation:
         self.right = right
 
     def __str__(self):
-        return f"({self.left} {self.operator} {self.right})"
+        return serialize(self)
 
     def __lt__(self, other):
         type_check_for_binary_and_numeric_operations(other)
@@ -0,0 +1,203 @@
+import copy
+import threading
+import weakref
+
+from .binary_expressions import BinaryArithmeticOperation, BinaryComparisonOperation
+from .numoperations import AggregationMethod, MathOperation, ArgumentList, RangeConstructor
+from .serializer import serialize, range_constructor_parts
+from WDC.helper.error_handling.type_checks import register_operand_type
+
+# subtrees with at most this many nodes keep their text once it has been computed; bigger ones
+# are rebuilt from their (memoized) parts, so deep trees don't hold a copy of their text per level
+MEMO_SIZE = 256
+
+_BINARY_KINDS = {'BinaryArithmeticOperation', 'BinaryComparisonOperation'}
+_FUNCTION_KINDS = {'AggregationMethod', 'MathOperation'}
+
+
+@register_operand_type
+class Node:
+    """
+    An immutable query expression node. Nodes are interned: creating a node that is structurally
+    identical to a living one returns that node, so equal subtrees share memory, equality is
+    identity and the structural hash is computed once. This makes nodes cheap and stable
+    dictionary keys. Their text is computed on first use and memoized.
+
+    Nodes are created with `freeze()` from an expression built with the usual classes and can be
+    used wherever such an expression is accepted, e.g. in `Dco.return_expression`.
+
+    Attributes:
+        kind (str): The class of the expression the node stands for, e.g. 'BinaryArithmeticOperation'.
+        label: The operator, function name, (coverage name, subset) pair or literal text of the node.
+        children (tuple of Node): The sub-expressions of the node.
+        value: For coverages and literals, the object the node was created from.
+        size (int): The number of nodes of the subtree, counting shared subtrees every time they're used.
+        has_coverage (bool): Whether a coverage appears in the subtree.
+    """
+    __slots__ = ('kind', 'label', 'children', 'value', 'size', 'has_coverage', '_hash', '_text', '__weakref__')
+
+    _interned = weakref.WeakValueDictionary()
+    _lock = threading.Lock()
+
+    def __new__(cls, kind, label=None, children=(), value=None):
+        """
+        Returns the interned node with this structure, creating it if there is none.
+
+        Args:
+            kind (str): The class of the expression the node stands for.
+            label: The operator, function name, coverage key or literal text of the node.
+            children (tuple of Node): The sub-expressions of the node.
+            value (any, optional): The coverage or literal the node is created from; only the
+                first node of a structure keeps it.
+        """
+        key = (kind, label, children)
+        node = cls._interned.get(key)
+        if node is not None:
+            return node
+        with cls._lock:
+            node = cls._interned.get(key)
+            if node is None:
+                node = object.__new__(cls)
+                setattr_ = object.__setattr__
+                setattr_(node, 'kind', kind)
+                setattr_(node, 'label', label)
+                setattr_(node, 'children', children)
+                setattr_(node, 'value', value)
+                setattr_(node, 'size', 1 + sum(child.size for child in children))
+                setattr_(node, 'has_coverage', kind == 'Coverage' or any(child.has_coverage for child in children))
+                setattr_(node, '_hash', hash(key))
+                setattr_(node, '_text', None)
+                cls._interned[key] = node
+        return node
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Node objects are immutable.")
+
+    def __delattr__(self, name):
+        raise AttributeError("Node objects are immutable.")
+
+    def __hash__(self):
+        return self._hash
+
+    def __reduce__(self):
+        return (Node, (self.kind, self.label, self.children, self.value))
+
+    @property
+    def operands(self):
+        """The sub-expressions of the node as seen by tree walks; the Coverage object for coverages."""
+        if self.kind == 'Coverage':
+            return (self.value,)
+        return self.children
+
+    def parts(self):
+        """Returns the text pieces and sub-expressions the node is written as, in order."""
+        kind, label, children = self.kind, self.label, self.children
+        if kind in _BINARY_KINDS:
+            return ('(', children[0], f' {label} ', children[1], ')')
+        if kind in _FUNCTION_KINDS:
+            return (f'{label}(', children[0], ')')
+        if kind == 'ArgumentList':
+            parts = []
+            for child in children:
+                parts.extend((child, ', '))
+            return parts[:-1]
+        if kind == 'Case':
+            return ('case ', children[0], ' return ', children[1])
+        if kind == 'RangeConstructor':
+            return range_constructor_parts(label, children)
+        if kind == 'Switch':
+            parts = ['switch\n']
+            for case in children[:-1]:
+                parts.extend((case, '\n'))
+            parts.extend(('default return ', children[-1], '\n'))
+            return parts
+        if kind == 'Coverage':
+            return (self.value,)
+        return (label,)
+
+    def _memoize(self):
+        """Computes the text of all small subtrees that don't have it yet, children before parents."""
+        pending, stack, seen = [], [self], set()
+        while stack:
+            node = stack.pop()
+            if id(node) in seen or node._text is not None:
+                continue
+            seen.add(id(node))
+            if node.size <= MEMO_SIZE:
+                pending.append(node)
+            stack.extend(node.children)
+        for node in sorted(pending, key=lambda small: small.size):
+            text = ''.join(part if type(part) is str else str(part) for part in node.parts())
+            object.__setattr__(node, '_text', text)
+
+    def memoized_text(self):
+        """Returns the memoized text of the node, computing it if the subtree is small enough to keep it, else None."""
+        if self._text is None and self.size <= MEMO_SIZE:
+            self._memoize()
+        return self._text
+
+    def __str__(self):
+        """Returns the WCPS text of the expression, computed once."""
+        text = self._text
+        if text is None:
+            self._memoize()
+            text = self._text
+            if text is None:
+                text = serialize(self)
+                object.__setattr__(self, '_text', text)
+        return text
+
+    def __repr__(self):
+        return self.__str__()
+
+
+def _freeze_one(node, children):
+    """Returns the interned node for one mutable node whose children have been frozen already."""
+    from WDC.core.coverage import Coverage
+    from WDC.core.switch import Case, Switch
+
+    if isinstance(node, Node):
+        return node
+    if isinstance(node, (BinaryArithmeticOperation, BinaryComparisonOperation)):
+        return Node(type(node).__name__, node.operator, children)
+    if isinstance(node, (AggregationMethod, MathOperation)):
+        return Node(type(node).__name__, node.operation, children)
+    if isinstance(node, RangeConstructor):
+        return Node('RangeConstructor', node.names, children)
+    if isinstance(node, (ArgumentList, Case, Switch)):
+        return Node(type(node).__name__, None, children)
+    if isinstance(node, Coverage):
+        return Node('Coverage', (node.get_used_coverage(), node.subset or ''), (), copy.copy(node))
+    return Node(type(node).__name__, str(node), (), node)
+
+
+def freeze(expression):
+    """
+    Converts a query expression into interned immutable nodes without recursion.
+
+    Coverages are copied, so later changes to their subsets don't affect the frozen expression.
+
+    Args:
+        expression (any): The root of the expression, e.g. a BinaryArithmeticOperation or a Switch.
+
+    Returns:
+        Node: The frozen root.
+    """
+    from .tree import children_of
+
+    frozen = {}
+    stack = [(expression, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if id(node) in frozen:
+            continue
+        if isinstance(node, Node):
+            frozen[id(node)] = node
+            continue
+        children = children_of(node)
+        if not expanded:
+            stack.append((node, True))
+            stack.extend((child, False) for child in reversed(children))
+            continue
+        frozen[id(node)] = _freeze_one(node, tuple(frozen[id(child)] for child in children))
+    return frozen[id(expression)]
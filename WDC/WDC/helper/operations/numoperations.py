@@ -1,7 +1,62 @@
 from .binary_expressions import OperatorOverloading
-from WDC.helper.error_handling.type_checks import type_check_for_binary_and_numeric_operations
+from WDC.helper.error_handling.type_checks import type_check_for_binary_and_numeric_operations, register_operand_type
+from .serializer import serialize
 
 
+class ArgumentList:
+    """
+    The comma-separated arguments of a function that takes more than one, e.g. the dividend and
+    divisor of mod. The arguments are kept as nodes, so they are serialized with the rest of the query.
+
+    Attributes:
+        arguments (tuple): The arguments in order.
+    """
+    __slots__ = ('arguments',)
+    def __init__(self, *arguments):
+        self.arguments = arguments
+
+    def __str__(self):
+        """Returns the arguments separated by commas, e.g. '$i0, 2'."""
+        return serialize(self)
+
+    def __repr__(self):
+        return self.__str__()
+
+
+@register_operand_type
+class RangeConstructor:
+    """
+    A range constructor, which combines expressions into the bands of one value, e.g.
+    `{max: max($i0); min: min($i0)}`. The components are kept as nodes, so sub-expressions
+    they share are found and computed once like in any other expression.
+
+    Attributes:
+        names (tuple of str): The band names in order.
+        components (tuple): The expression of every band.
+    """
+    __slots__ = ('names', 'components')
+    def __init__(self, names, components):
+        """
+        Raises:
+            ValueError: If there is not exactly one band name per component or a name is not an identifier.
+        """
+        names, components = tuple(names), tuple(components)
+        if len(names) != len(components) or not components:
+            raise ValueError("A range constructor needs one band name per component.")
+        if not all(isinstance(name, str) and name.isidentifier() for name in names):
+            raise ValueError("Band names must be identifiers.")
+        self.names = names
+        self.components = components
+
+    def __str__(self):
+        """Returns the bands in braces, e.g. '{b0: max($i0); b1: min($i0)}'."""
+        return serialize(self)
+
+    def __repr__(self):
+        return self.__str__()
+
+
+@register_operand_type
 class AggregationMethod(OperatorOverloading):
     """
     A class to represent aggregation operations in WCPS queries.
@@ -15,6 +70,7 @@ class AggregationMethod(OperatorOverloading):
         max, min, avg, sum, count: Class methods to instantiate the class
         with specific operations.
     """
+    __slots__ = ('operation', 'expression')
     def __init__(self, operation, expression):
         """
         Initialize an AggregationMethod instance.
@@ -33,7 +89,7 @@ class AggregationMethod(OperatorOverloading):
         Returns:
             str: A string that represents the object in the format operation(expression).
         """
-        return f'{self.operation}({self.expression})'
+        return serialize(self)
 
     def __repr__(self):
         """
@@ -116,13 +172,14 @@ class AggregationMethod(OperatorOverloading):
 
     
 
+@register_operand_type
 class MathOperation(OperatorOverloading):
     """
     Represents arithmetic operations for expressions, supporting basic and advanced mathematical functions.
 
     Attributes:
         operation (str): The name of the mathematical operation.
-        expression (str): The expression to which the operation is applied, could be a single value or a comma-separated pair of values.
+        expression (str): The expression to which the operation is applied, could be a single value or an ArgumentList of two values.
 
     Methods:
         __str__: Returns a string representation of the mathematical operation.
@@ -147,6 +204,7 @@ class MathOperation(OperatorOverloading):
         arctan: Calculates the inverse tangent of an expression.
         atan2: Calculates the inverse tangent of two expressions.
     """
+    __slots__ = ('operation', 'expression')
 
     def __init__(self, operation, expression):
         """
@@ -161,7 +219,7 @@ class MathOperation(OperatorOverloading):
 
     def __str__(self):
         """Returns the string representation of the MathOperation."""
-        return f'''{self.operation}({self.expression})'''
+        return serialize(self)
 
     @classmethod
     def round(cls, expression):
@@ -186,7 +244,7 @@ class MathOperation(OperatorOverloading):
         """
         type_check_for_binary_and_numeric_operations(dividend)
         type_check_for_binary_and_numeric_operations(divisor)
-        return cls(operation='mod', expression=f'''{dividend}, {divisor}''')
+        return cls(operation='mod', expression=ArgumentList(dividend, divisor))
 
     @classmethod
     def floor(cls, expression):
@@ -235,7 +293,7 @@ class MathOperation(OperatorOverloading):
         """
         type_check_for_binary_and_numeric_operations(antilogarithm)
         type_check_for_binary_and_numeric_operations(base)
-        return cls(operation='log', expression=f'''{antilogarithm}, {base}''')
+        return cls(operation='log', expression=ArgumentList(antilogarithm, base))
 
     @classmethod
     def pow(cls, base, exponent):
@@ -244,7 +302,7 @@ class MathOperation(OperatorOverloading):
         """
         type_check_for_binary_and_numeric_operations(base)
         type_check_for_binary_and_numeric_operations(exponent)
-        return cls(operation='pow', expression=f'''{base}, {exponent}''')
+        return cls(operation='pow', expression=ArgumentList(base, exponent))
 
     @classmethod
     def sin(cls, expression):
@@ -325,4 +383,4 @@ class MathOperation(OperatorOverloading):
         """
         type_check_for_binary_and_numeric_operations(x)
         type_check_for_binary_and_numeric_operations(y)
-        return cls(operation='atan2', expression=f'''{x}, {y}''')
+        return cls(operation='atan2', expression=ArgumentList(x, y))
@@ -0,0 +1,60 @@
+from .tree import find_coverages
+
+
+class VariableAllocator:
+    """
+    Hands out the variable names of a single query. Every name is handed out once, so the
+    names of coverages, `let` bindings and other variables of the query never collide.
+
+    Attributes:
+        counts (dict): The number of names handed out per prefix.
+    """
+
+    def __init__(self):
+        self.counts = {}
+
+    def allocate(self, prefix='$i'):
+        """
+        Returns a new variable name.
+
+        Args:
+            prefix (str): The start of the name, e.g. '$i' for coverages; names are numbered from 0 per prefix.
+
+        Returns:
+            str: The variable name, e.g. '$i0'.
+        """
+        count = self.counts.get(prefix, 0)
+        self.counts[prefix] = count + 1
+        return f'{prefix}{count}'
+
+
+def plan_coverages(coverages, root=None, allocator=None):
+    """
+    Assigns the iteration variables of a query, giving all Coverage objects that refer to the
+    same coverage a single variable, so the server iterates every coverage only once.
+
+    Args:
+        coverages (list of Coverage): The coverages the query was created with; they are bound first.
+        root (any, optional): The return expression; coverages used in it are bound as well.
+        allocator (VariableAllocator, optional): The allocator of the query; a new one is used if omitted.
+
+    Returns:
+        tuple: The list of (variable, coverage name) pairs for the for-clause, and a dict mapping
+            the id() of every Coverage object to its variable, as accepted by `serialize_into`.
+    """
+    allocator = allocator or VariableAllocator()
+    used = list(coverages)
+    if root is not None:
+        used.extend(find_coverages(root))
+
+    bindings = []
+    by_name = {}
+    variables = {}
+    for coverage in used:
+        name = coverage.get_used_coverage()
+        variable = by_name.get(name)
+        if variable is None:
+            variable = by_name[name] = allocator.allocate('$i')
+            bindings.append((variable, name))
+        variables[id(coverage)] = variable
+    return bindings, variables
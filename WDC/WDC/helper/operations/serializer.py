@@ -0,0 +1,149 @@
+import io
+
+_renderers = None
+_Node = None
+
+
+def _load_renderers():
+    """
+    Builds the table mapping node classes to functions that expand a node into its parts.
+
+    The query classes import this module themselves, so they are looked up on first use
+    instead of at import time.
+    """
+    global _Node
+    from .binary_expressions import BinaryArithmeticOperation, BinaryComparisonOperation
+    from .numoperations import AggregationMethod, MathOperation, ArgumentList, RangeConstructor
+    from .nodes import Node
+    from WDC.core.switch import Case, Switch
+
+    _Node = Node
+
+    def binary(node):
+        return ('(', node.left, f' {node.operator} ', node.right, ')')
+
+    def function(node):
+        return (f'{node.operation}(', node.expression, ')')
+
+    def arguments(node):
+        parts = []
+        for argument in node.arguments:
+            parts.extend((argument, ', '))
+        return parts[:-1]
+
+    def bands(node):
+        return range_constructor_parts(node.names, node.components)
+
+    def case(node):
+        return ('case ', node.condition, ' return ', node.return_value)
+
+    def switch(node):
+        parts = ['switch\n']
+        for case_node in node.cases:
+            parts.extend((case_node, '\n'))
+        parts.extend(('default return ', node.default, '\n'))
+        return parts
+
+    return {
+        BinaryArithmeticOperation: binary,
+        BinaryComparisonOperation: binary,
+        AggregationMethod: function,
+        MathOperation: function,
+        ArgumentList: arguments,
+        RangeConstructor: bands,
+        Case: case,
+        Switch: switch,
+        Node: Node.parts,
+    }
+
+
+def range_constructor_parts(names, components):
+    """Returns the text pieces and components of a range constructor, `{name: component; ...}`."""
+    parts = ['{']
+    for name, component in zip(names, components):
+        parts.extend((f'{name}: ', component, '; '))
+    parts[-1] = '}'
+    return parts
+
+
+def _renderer_for(node_type):
+    """Returns the renderer of a node class, taking subclasses of the known classes into account."""
+    global _renderers
+    if _renderers is None:
+        _renderers = _load_renderers()
+    renderer = _renderers.get(node_type)
+    if renderer is None:
+        for known_type, known_renderer in list(_renderers.items()):
+            if known_type is not None and issubclass(node_type, known_type):
+                renderer = _renderers[node_type] = known_renderer
+                break
+        else:
+            _renderers[node_type] = None
+    return renderer
+
+
+def serialize_into(node, write, names=None, variables=None, subsets=None):
+    """
+    Writes the WCPS text of a query expression through `write` without recursion.
+
+    The expression is walked with an explicit stack, so trees of any depth are serialized in
+    time linear in their size and are never limited by Python's recursion limit.
+
+    Args:
+        node (any): The root of the expression, e.g. a BinaryArithmeticOperation or a Switch.
+        write (callable): Receives the text piece by piece, e.g. the `write` method of a buffer.
+        names (dict, optional): Maps the id() of sub-expressions to the variable they are bound to;
+            those sub-expressions are written as the variable. The root itself is always expanded.
+        variables (dict, optional): Maps the id() of Coverage objects to the iteration variable
+            of the query; their subset is applied to that variable. The memoized text of frozen
+            subtrees is still used for the subtrees without coverages.
+        subsets (dict, optional): Maps the id() of Coverage objects to the subset written instead
+            of their own, e.g. the subset after validation moved its bounds onto the extent.
+    """
+    global _renderers
+    if _renderers is None:
+        _renderers = _load_renderers()
+    node_type = _Node
+    stack = [node]
+    pop, extend = stack.pop, stack.extend
+    while stack:
+        item = pop()
+        if type(item) is str:
+            write(item)
+            continue
+        if names and item is not node and id(item) in names:
+            write(names[id(item)])
+            continue
+        if type(item) is node_type and not names and (variables is None or not item.has_coverage):
+            text = item._text if variables is None else item.memoized_text()
+            if text is not None:
+                write(text)
+                continue
+        if variables is not None and id(item) in variables:
+            write(variables[id(item)])
+            subset = subsets.get(id(item), item.subset) if subsets else item.subset
+            if subset is not None:
+                write(subset)
+            continue
+        renderer = _renderer_for(type(item))
+        if renderer is None:
+            write(str(item))
+        else:
+            extend(reversed(renderer(item)))
+
+
+def serialize(node, names=None, variables=None):
+    """
+    Returns the WCPS text of a query expression, see `serialize_into`.
+
+    Args:
+        node (any): The root of the expression.
+        names (dict, optional): Sub-expressions to write as variables, see `serialize_into`.
+        variables (dict, optional): The iteration variables of coverages, see `serialize_into`.
+
+    Returns:
+        str: The expression as it appears in a WCPS query.
+    """
+    buffer = io.StringIO()
+    serialize_into(node, buffer.write, names, variables)
+    return buffer.getvalue()
@@ -0,0 +1,162 @@
+import math
+
+from .binary_expressions import BinaryArithmeticOperation
+from .nodes import Node, freeze
+from .numoperations import AggregationMethod, MathOperation
+from .tree import children_of, replace_children
+
+# integer results outside this range are left to the server, which computes in 64 bits
+_INT_LIMIT = 2 ** 63
+
+# functions whose result is a whole number, so applying any of them again changes nothing
+_INTEGER_VALUED = {'round', 'floor', 'ceil'}
+
+# functions whose result is never negative, so abs() of it changes nothing
+_NON_NEGATIVE = {'abs', 'exp', 'sqrt'}
+
+_FOLDABLE_FUNCTIONS = {'abs': abs, 'floor': math.floor, 'ceil': math.ceil}
+
+
+def _is_number(node):
+    """Returns True for int and float literals; bool is not a number in a query."""
+    return type(node) in (int, float)
+
+
+def _is(node, cls):
+    """Returns True if a node is an instance of the class, or a frozen node standing for one."""
+    if type(node) is Node:
+        return node.kind == cls.__name__
+    return isinstance(node, cls)
+
+
+def _operation(node):
+    """Returns the operator or function of a node, frozen or not."""
+    if type(node) is Node:
+        return node.label
+    return node.operator if isinstance(node, BinaryArithmeticOperation) else node.operation
+
+
+def _literal(node):
+    """Returns the number a frozen literal stands for; other nodes are returned as they are."""
+    if type(node) is Node and node.kind in ('int', 'float'):
+        return node.value
+    return node
+
+
+def _fold(left, operator, right):
+    """Computes an arithmetic operation on two literals, or returns None if it should be left to the server."""
+    if operator == '+':
+        value = left + right
+    elif operator == '-':
+        value = left - right
+    elif operator == '*':
+        value = left * right
+    elif operator == '/' and right != 0:
+        value = left / right
+    else:
+        return None
+    if isinstance(value, int) and not -_INT_LIMIT <= value < _INT_LIMIT:
+        return None
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def _simplify_arithmetic(operator, left, right, left_scalar, right_scalar):
+    """Applies folding and the identity and annihilator rules to an arithmetic operation, or returns None."""
+    left_number, right_number = _is_number(left), _is_number(right)
+    if left_number and right_number:
+        return _fold(left, operator, right)
+    if operator == '+':
+        if right_number and right == 0:
+            return left
+        if left_number and left == 0:
+            return right
+    elif operator == '-':
+        if right_number and right == 0:
+            return left
+    elif operator == '*':
+        if right_number and right == 1:
+            return left
+        if left_number and left == 1:
+            return right
+        if right_number and right == 0 and left_scalar:
+            return right
+        if left_number and left == 0 and right_scalar:
+            return left
+    elif operator == '/':
+        if right_number and right == 1:
+            return left
+    return None
+
+
+def _simplify_function(node, expression):
+    """Folds a function of a literal or collapses a redundant nested function, or returns None."""
+    operation = _operation(node)
+    if _is(node, MathOperation):
+        if _is_number(_literal(expression)) and operation in _FOLDABLE_FUNCTIONS:
+            return _FOLDABLE_FUNCTIONS[operation](_literal(expression))
+        if _is(expression, MathOperation):
+            if operation in _INTEGER_VALUED and _operation(expression) in _INTEGER_VALUED:
+                return expression
+            if operation == 'abs' and _operation(expression) in _NON_NEGATIVE:
+                return expression
+    return None
+
+
+def simplify(root):
+    """
+    Returns a simplified copy of a query expression that computes the same values with fewer operations.
+
+    Arithmetic on two numeric literals is folded into one literal (leaving division by zero and
+    overflows to the server), `x + 0`, `x - 0`, `x * 1` and `x / 1` become `x`, and nested
+    functions such as `floor(round(x))` or `abs(sqrt(x))` lose the redundant outer function.
+    `x * 0` becomes 0 only if `x` is a scalar, i.e. uses no coverage outside of an aggregation, so
+    coverage-valued results keep their shape; a NaN or infinite `x` then gives 0 instead of NaN.
+    Dropping an operation may leave the cell type of a coverage narrower than the server would
+    have promoted it to.
+
+    The tree is walked without recursion and the nodes of the original expression are not
+    changed; unchanged subtrees are shared with it. Frozen expressions (see `freeze`) are
+    simplified into frozen nodes.
+
+    Args:
+        root (any): The root of the query expression.
+
+    Returns:
+        any: The simplified expression; `root` itself if nothing could be simplified.
+    """
+    from WDC.core.coverage import Coverage
+
+    results = {}
+    scalar = {}
+    stack = [(root, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if id(node) in results:
+            continue
+        children = children_of(node)
+        if not expanded:
+            stack.append((node, True))
+            stack.extend((child, False) for child in reversed(children))
+            continue
+
+        new_children = [results[id(child)] for child in children]
+        if _is(node, AggregationMethod):
+            scalar[id(node)] = True
+        elif _is(node, Coverage):
+            scalar[id(node)] = False
+        else:
+            scalar[id(node)] = all(scalar[id(child)] for child in children)
+
+        simplified = None
+        if _is(node, BinaryArithmeticOperation):
+            left, right = (_literal(child) for child in new_children)
+            simplified = _simplify_arithmetic(
+                _operation(node), left, right, scalar[id(children[0])], scalar[id(children[1])])
+        elif _is(node, AggregationMethod) or _is(node, MathOperation):
+            simplified = _simplify_function(node, new_children[0])
+        if simplified is not None and type(node) is Node and type(simplified) is not Node:
+            simplified = freeze(simplified)
+        results[id(node)] = simplified if simplified is not None else replace_children(node, new_children)
+    return results[id(root)]
@@ -0,0 +1,115 @@
+from .binary_expressions import BinaryArithmeticOperation, BinaryComparisonOperation
+from .numoperations import AggregationMethod, MathOperation, RangeConstructor
+from .nodes import Node
+from .tree import children_of
+from .planner import VariableAllocator
+
+
+def _label(node):
+    """Returns the part of a node's structural key that doesn't depend on its children."""
+    from WDC.core.coverage import Coverage
+
+    if type(node) is Node:
+        return ('Node', node.kind, node.label)
+    if isinstance(node, (BinaryArithmeticOperation, BinaryComparisonOperation)):
+        return (type(node).__name__, node.operator)
+    if isinstance(node, (AggregationMethod, MathOperation)):
+        return (type(node).__name__, node.operation)
+    if isinstance(node, RangeConstructor):
+        return ('RangeConstructor', node.names)
+    if isinstance(node, Coverage):
+        return ('Coverage', node.get_used_coverage(), node.subset)
+    if children_of(node):
+        return (type(node).__name__,)
+    return (type(node).__name__, str(node))
+
+
+def _is_shareable(node):
+    """Returns True for nodes worth binding to a variable: computations and subsetted coverages."""
+    from WDC.core.coverage import Coverage
+
+    if type(node) is Node:
+        if node.kind == 'Coverage':
+            return bool(node.label[1])
+        return node.kind in ('BinaryArithmeticOperation', 'AggregationMethod', 'MathOperation')
+    if isinstance(node, (BinaryArithmeticOperation, AggregationMethod, MathOperation)):
+        return True
+    return isinstance(node, Coverage) and node.subset is not None
+
+
+def number_subtrees(root):
+    """
+    Gives structurally identical subtrees of a query expression the same number.
+
+    Two subtrees are identical if they have the same operators, functions, literals, coverage names
+    and subsets at the same places, whether or not they are the same objects. The tree is walked
+    without recursion, children are numbered before their parents and the root gets the highest number.
+
+    Args:
+        root (any): The root of the query expression.
+
+    Returns:
+        tuple: A dict mapping the id() of every node to its number, and a list with one
+            (representative node, child numbers) pair per number.
+    """
+    numbers = {}
+    subtrees = []
+    node_numbers = {}
+    stack = [(root, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if not expanded:
+            if id(node) not in node_numbers:
+                children = children_of(node)
+                stack.append((node, True))
+                stack.extend((child, False) for child in reversed(children))
+            continue
+        if id(node) in node_numbers:
+            continue
+        child_numbers = tuple(node_numbers[id(child)] for child in children_of(node))
+        key = (_label(node), child_numbers)
+        number = numbers.get(key)
+        if number is None:
+            number = numbers[key] = len(subtrees)
+            subtrees.append((node, child_numbers))
+        node_numbers[id(node)] = number
+    return node_numbers, subtrees
+
+
+def find_common_subexpressions(root, allocator=None):
+    """
+    Finds the subtrees of a query expression that would be written more than once and binds
+    each of them to a variable, so that it can be computed once in a WCPS `let` clause.
+
+    A subtree only counts as repeated if it still appears more than once after its enclosing
+    repeated subtrees have been bound, so e.g. the parts of a repeated sum are not bound on their own.
+
+    Args:
+        root (any): The root of the query expression.
+        allocator (VariableAllocator, optional): The allocator of the query; the variables are
+            named '$t0', '$t1', ... by a new allocator if omitted.
+
+    Returns:
+        tuple: The list of (variable, node) bindings in an order where every binding only uses
+            variables bound before it, and a dict mapping the id() of every bound node to its
+            variable, as accepted by `serialize_into`.
+    """
+    node_numbers, subtrees = number_subtrees(root)
+    uses = [0] * len(subtrees)
+    uses[-1] = 1
+    shared = set()
+    for number in range(len(subtrees) - 1, -1, -1):
+        node, child_numbers = subtrees[number]
+        if uses[number] > 1 and _is_shareable(node):
+            shared.add(number)
+            uses_per_child = 1
+        else:
+            uses_per_child = uses[number]
+        for child_number in child_numbers:
+            uses[child_number] += uses_per_child
+
+    allocator = allocator or VariableAllocator()
+    variables = {number: allocator.allocate('$t') for number in sorted(shared)}
+    bindings = [(variables[number], subtrees[number][0]) for number in sorted(shared)]
+    names = {node_id: variables[number] for node_id, number in node_numbers.items() if number in variables}
+    return bindings, names
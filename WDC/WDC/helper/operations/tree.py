@@ -0,0 +1,167 @@
+from .binary_expressions import BinaryArithmeticOperation, BinaryComparisonOperation
+from .numoperations import AggregationMethod, MathOperation, ArgumentList, RangeConstructor
+from .nodes import Node
+
+
+def children_of(node):
+    """
+    Returns the sub-expressions of a query node.
+
+    Args:
+        node (any): A node of a query expression, e.g. a BinaryArithmeticOperation, a Switch or a literal.
+
+    Returns:
+        tuple: The direct sub-expressions of the node; empty for leaves such as coverages and literals.
+    """
+    from WDC.core.switch import Case, Switch
+
+    if type(node) is Node:
+        return node.operands
+    if isinstance(node, (BinaryArithmeticOperation, BinaryComparisonOperation)):
+        return (node.left, node.right)
+    if isinstance(node, (AggregationMethod, MathOperation)):
+        return (node.expression,)
+    if isinstance(node, ArgumentList):
+        return node.arguments
+    if isinstance(node, RangeConstructor):
+        return node.components
+    if isinstance(node, Case):
+        return (node.condition, node.return_value)
+    if isinstance(node, Switch):
+        return (*node.cases, node.default)
+    return ()
+
+
+def replace_children(node, children):
+    """
+    Returns a copy of a query node with other sub-expressions, the counterpart of `children_of`.
+
+    Args:
+        node (any): A node with sub-expressions.
+        children (sequence): The new sub-expressions, in the order `children_of` returns them.
+
+    Returns:
+        any: A new node of the same class; `node` itself if the children are the same objects.
+    """
+    from WDC.core.switch import Case, Switch
+
+    if all(new is old for new, old in zip(children, children_of(node))):
+        return node
+    if type(node) is Node:
+        return node if node.kind == 'Coverage' else Node(node.kind, node.label, tuple(children))
+    if isinstance(node, (BinaryArithmeticOperation, BinaryComparisonOperation)):
+        return type(node)(children[0], node.operator, children[1])
+    if isinstance(node, (AggregationMethod, MathOperation)):
+        return type(node)(node.operation, children[0])
+    if isinstance(node, ArgumentList):
+        return type(node)(*children)
+    if isinstance(node, RangeConstructor):
+        return type(node)(node.names, children)
+    if isinstance(node, Case):
+        return type(node)(children[0], children[1])
+    if isinstance(node, Switch):
+        return type(node)(*children[:-1], default=children[-1])
+    return node
+
+
+def iter_nodes(root):
+    """
+    Iterates over all nodes of a query expression in depth-first pre-order without recursion.
+
+    Args:
+        root (any): The root of the query expression.
+
+    Yields:
+        any: Every node of the expression, starting with the root.
+    """
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(reversed(children_of(node)))
+
+
+def find_coverages(root):
+    """
+    Collects the Coverage instances used in a query expression.
+
+    Returns:
+        list: The distinct Coverage instances in order of their first appearance.
+    """
+    from WDC.core.coverage import Coverage
+
+    coverages = {}
+    for node in iter_nodes(root):
+        if isinstance(node, Coverage):
+            coverages.setdefault(id(node), node)
+    return list(coverages.values())
+
+
+def result_ndim(root):
+    """
+    Works out the number of dimensions of the value a query expression computes.
+
+    Aggregations and literals are scalars, a coverage keeps one dimension per axis that is
+    trimmed to a range and loses the axes that are sliced to a single value, and every other
+    node has as many dimensions as its largest operand.
+
+    Args:
+        root (any): The root of the query expression.
+
+    Returns:
+        int: The number of dimensions, or None if it depends on a coverage without a subset.
+    """
+    from WDC.core.coverage import Coverage
+
+    ndims = {}
+    stack = [(root, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if id(node) in ndims:
+            continue
+        if isinstance(node, AggregationMethod) or (type(node) is Node and node.kind == 'AggregationMethod'):
+            ndims[id(node)] = 0
+            continue
+        if isinstance(node, Coverage):
+            ndims[id(node)] = sum(type(axis.axis_range) is tuple for axis in node.axes) if node.axes else None
+            continue
+        children = children_of(node)
+        if not expanded:
+            stack.append((node, True))
+            stack.extend((child, False) for child in children)
+            continue
+        operands = [ndims[id(child)] for child in children]
+        ndims[id(node)] = None if None in operands else max(operands, default=0)
+    return ndims[id(root)]
+
+
+def replace_nodes(root, replacements):
+    """
+    Returns a copy of a query expression with some of its nodes replaced, without recursion.
+
+    Nodes on the path to a replaced node are rebuilt with `replace_children`; all other subtrees
+    are shared with the original expression.
+
+    Args:
+        root (any): The root of the query expression.
+        replacements (dict): The new node by id() of the node it replaces.
+
+    Returns:
+        any: The new expression; `root` itself if no node was replaced.
+    """
+    results = {}
+    stack = [(root, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if id(node) in results:
+            continue
+        if id(node) in replacements:
+            results[id(node)] = replacements[id(node)]
+            continue
+        children = children_of(node)
+        if not expanded:
+            stack.append((node, True))
+            stack.extend((child, False) for child in children)
+            continue
+        results[id(node)] = replace_children(node, [results[id(child)] for child in children])
+    return results[id(root)]
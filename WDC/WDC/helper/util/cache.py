@@ -0,0 +1,109 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResultCache:
+    """
+    A thread-safe in-memory cache for query results, bounded by the total size of the cached
+    results and evicting the least recently used ones first.
+
+    Only successful results (bytes) are cached; error objects always go back to the server.
+
+    Attributes:
+        max_bytes (int): The maximum total size of all cached results in bytes.
+        ttl (float): The number of seconds a result stays valid, or None to keep it until evicted.
+        hits (int): The number of lookups answered from the cache.
+        misses (int): The number of lookups that were not in the cache or had expired.
+        evictions (int): The number of results removed to make room for new ones.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, ttl: float = None):
+        """
+        Initializes a ResultCache instance.
+
+        Args:
+            max_bytes (int): The maximum total size of all cached results in bytes.
+            ttl (float, optional): The number of seconds a result stays valid.
+
+        Raises:
+            ValueError: If max_bytes is not a positive integer or ttl is not positive.
+        """
+        if not isinstance(max_bytes, int) or max_bytes < 1:
+            raise ValueError("max_bytes must be a positive integer.")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be a positive number of seconds.")
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(endpoint: str, query: str, return_format: str = None):
+        """Returns the cache key of a query sent to an endpoint with the given encoding."""
+        return (endpoint, query, return_format)
+
+    def get(self, key):
+        """
+        Looks up a cached result and marks it as the most recently used one.
+
+        Returns:
+            bytes | None: The cached result, or None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] is not None and entry[1] <= time.monotonic():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        """
+        Stores a result, evicting the least recently used results until it fits.
+
+        Results that are not bytes or larger than `max_bytes` are not cached.
+        """
+        if not isinstance(value, bytes) or len(value) > self.max_bytes:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            while self._size + len(value) > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+            self._entries[key] = (value, expires_at)
+            self._size += len(value)
+
+    def _remove(self, key):
+        value, _ = self._entries.pop(key)
+        self._size -= len(value)
+
+    def clear(self):
+        """Removes all cached results; the counters are kept."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self):
+        """Returns the counters and the current size of the cache."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._size
+            }
+
+    def __len__(self):
+        return len(self._entries)
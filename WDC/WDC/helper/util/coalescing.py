@@ -0,0 +1,78 @@
+import threading
+
+
+class _Flight:
+    """A request in flight and the result all its callers receive."""
+    __slots__ = ('done', 'result', 'exception')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.exception = None
+
+
+class QueryCoalescer:
+    """
+    Lets concurrent identical requests share one request in flight ("single flight").
+
+    The first call with a key sends the request; calls with the same key that arrive while it
+    is in flight wait for it and receive the same result, or error object, or the exception it
+    raised. Nothing is kept once the request has finished, so later calls send a new request;
+    combine it with a ResultCache to also reuse finished results.
+
+    Attributes:
+        requests (int): The number of requests that were sent.
+        coalesced (int): The number of calls that shared the request of an earlier call.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.coalesced = 0
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def run(self, key, call):
+        """
+        Calls `call` unless a call with the same key is in flight, in which case its result is awaited.
+
+        Args:
+            key (hashable): Identifies identical requests, e.g. the endpoint, parameters and query.
+            call (callable): Sends the request and returns its result.
+
+        Returns:
+            any: The result of the call that sent the request; every caller gets the same object.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.requests += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.exception is not None:
+                raise flight.exception
+            return flight.result
+
+        try:
+            flight.result = call()
+        except BaseException as e:
+            flight.exception = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result
+
+    def stats(self):
+        """Returns the counters and the number of requests in flight."""
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._flights)
+            }
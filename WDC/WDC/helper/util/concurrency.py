@@ -0,0 +1,37 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable
+
+from .wrappers import request_failed
+
+
+def run_in_parallel(calls: Iterable[Callable], max_workers: int = 8):
+    """
+    Runs blocking calls on a thread pool and collects their results in input order.
+
+    A call that raises does not abort the others; its exception is turned into an error object
+    in the format returned by `network_wrapper`.
+
+    Args:
+        calls (iterable of callables): Calls without arguments, e.g. bound `post_query` partials.
+        max_workers (int): The maximum number of calls running at the same time.
+
+    Returns:
+        list: One result or error object per call, in the order the calls were given.
+
+    Raises:
+        ValueError: If max_workers is not a positive integer.
+    """
+    if not isinstance(max_workers, int) or max_workers < 1:
+        raise ValueError("max_workers must be a positive integer.")
+
+    def guarded(call):
+        try:
+            return call()
+        except Exception as e:
+            return request_failed(None, str(e), e)
+
+    calls = list(calls)
+    if not calls:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(calls))) as executor:
+        return list(executor.map(guarded, calls))
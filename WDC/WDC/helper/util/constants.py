@@ -43,3 +43,9 @@ dictionary_of_data_formats = {
     'xpm': 'image/xpm',
     'x-ogc-zmap': 'application/x-ogc-zmap',
     'html': 'text/html'}
+
+# size of the chunks read from a streamed response
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# streamed results larger than this are spilled from memory to a temporary file
+DEFAULT_SPOOL_THRESHOLD = 8 * 1024 * 1024
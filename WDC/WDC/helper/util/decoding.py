@@ -0,0 +1,131 @@
+import warnings
+
+import numpy as np
+
+# the brackets that nest the dimensions of an array in every decodable format
+_BRACKETS = {'csv': (b'{', b'}'), 'json': (b'[', b']')}
+
+# characters that only occur in the text of floating point values, e.g. 2.5, 1e3, nan and inf
+_FLOAT_CHARACTERS = b'.eEnNiI'
+
+
+def _infer_dtype(data: bytes):
+    """Returns int64 for results that only contain whole numbers and float64 otherwise."""
+    if any(character in data for character in _FLOAT_CHARACTERS):
+        return np.dtype(np.float64)
+    return np.dtype(np.int64)
+
+
+def _parse_values(data: bytes, dtype):
+    """Parses whitespace separated numbers into a flat array in one pass, without Python number objects."""
+    if not data.strip():
+        return np.empty(0, dtype=dtype)
+    with warnings.catch_warnings():
+        # numpy only warns when it stops at text that is not a number
+        warnings.simplefilter('error', DeprecationWarning)
+        try:
+            return np.fromstring(data, dtype=dtype, sep=' ')
+        except (ValueError, DeprecationWarning):
+            raise ValueError(f"The result contains values that are not {dtype} numbers.") from None
+
+
+def _nesting(data: bytes, opening: bytes, closing: bytes):
+    """
+    Measures how the brackets of a result nest.
+
+    Returns:
+        tuple: The number of groups opened at every depth (index 0 is the whole result) and the
+            number of commas inside the groups of the deepest level.
+    """
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    opened = np.flatnonzero(buffer == ord(opening))
+    closed = np.flatnonzero(buffer == ord(closing))
+    commas = np.flatnonzero(buffer == ord(b','))
+    if opened.size != closed.size:
+        raise ValueError("The brackets of the result are not balanced.")
+
+    positions = np.concatenate((opened, closed, commas))
+    steps = np.concatenate((np.ones(opened.size, np.int64), np.full(closed.size, -1, np.int64),
+                            np.zeros(commas.size, np.int64)))
+    order = np.argsort(positions, kind='stable')
+    steps = steps[order]
+    depths = np.cumsum(steps)
+    if depths.size and depths.min() < 0:
+        raise ValueError("The brackets of the result are not balanced.")
+
+    groups = np.bincount(depths[steps == 1], minlength=1)
+    groups[0] = 1
+    comma_depths = depths[steps == 0]
+    inner_commas = int(np.count_nonzero(comma_depths == groups.size - 1))
+    return groups, inner_commas
+
+
+def _shape(data: bytes, opening: bytes, closing: bytes):
+    """
+    Returns the shape of the cells of a result; a band axis is not part of it.
+
+    For bracketed results the last axis is the number of comma separated elements of the
+    innermost groups, which is 1 if those groups hold the bands of a single cell.
+    """
+    groups, inner_commas = _nesting(data, opening, closing)
+    text = data.strip()
+    # results whose outermost dimension is not wrapped in brackets, e.g. '{1,2},{3,4}', start a
+    # new group at depth 1 per row; wrapped results have exactly one group there
+    if groups.size > 1 and groups[1] == 1 and text[:1] == opening and text[-1:] == closing:
+        groups = groups[1:]
+    if np.any(groups[1:] % groups[:-1]):
+        raise ValueError("The result is not a rectangular array.")
+    shape = [int(size) for size in groups[1:] // groups[:-1]]
+    if inner_commas % groups[-1]:
+        raise ValueError("The result is not a rectangular array.")
+    elements = inner_commas // int(groups[-1]) + 1
+    if len(shape) or elements > 1:
+        shape.append(elements)
+    return shape
+
+
+def decode_array(data: bytes, return_format: str, dtype=None, ndim: int = None):
+    """
+    Decodes a CSV or JSON result of rasdaman into a NumPy array of the shape it encodes.
+
+    The dimensions are taken from the nesting of `{...}` (CSV) or `[...]` (JSON) groups, and
+    the values are parsed in one pass from the text, without a list of Python numbers.
+    Multi-band cells, written as space separated values such as `"1 2 3"` or `{1 2 3}`, become
+    a trailing axis. Scalar results become 0-dimensional arrays.
+
+    Args:
+        data (bytes): The response content.
+        return_format (str): The format the result was encoded in, 'csv' or 'json'.
+        dtype (numpy.dtype, optional): The type of the values. By default int64 is used for whole
+            numbers and float64 for anything else.
+        ndim (int, optional): The number of dimensions the query result has, if known, e.g. from
+            the trimmed axes of its coverages. Only used to tell single-cell groups from dimensions.
+
+    Returns:
+        numpy.ndarray: The values of the result.
+
+    Raises:
+        ValueError: If the format can't be decoded, or the result is not a rectangular array of numbers.
+    """
+    if return_format not in _BRACKETS:
+        raise ValueError(f"Results in the '{return_format}' format can't be decoded into an array.")
+    if isinstance(data, str):
+        data = data.encode()
+    opening, closing = _BRACKETS[return_format]
+    shape = _shape(data, opening, closing)
+    # everything but the numbers becomes a separator; this is the only copy of the text
+    separators = bytes.maketrans(opening + closing + b',"', b'    ')
+    values = _parse_values(data.translate(separators), dtype or _infer_dtype(data))
+    if not values.size:
+        raise ValueError("The result is empty.")
+
+    cells = int(np.prod(shape, dtype=np.int64))
+    if values.size % cells:
+        raise ValueError("The result is not a rectangular array.")
+    bands = values.size // cells
+    if shape and shape[-1] == 1 and (len(shape) == ndim + 1 if ndim is not None else bands > 1):
+        # the innermost groups hold the bands of a single cell, e.g. {1 2 3}
+        shape.pop()
+    if bands > 1:
+        shape.append(bands)
+    return values.reshape(shape)
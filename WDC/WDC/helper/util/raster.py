@@ -0,0 +1,242 @@
+import os
+import struct
+
+import numpy as np
+
+# the formats whose raster data is stored uncompressed at known offsets of the file
+MAPPABLE_FORMATS = ('tiff', 'gtiff', 'netcdf')
+
+# TIFF tags needed to locate the pixels of the first image
+_WIDTH, _LENGTH, _BITS_PER_SAMPLE, _COMPRESSION = 256, 257, 258, 259
+_STRIP_OFFSETS, _SAMPLES_PER_PIXEL, _STRIP_BYTE_COUNTS = 273, 277, 279
+_PLANAR_CONFIGURATION, _TILE_WIDTH, _SAMPLE_FORMAT = 284, 322, 339
+
+# TIFF field types: (size in bytes, numpy type code) of the integer types used by the tags above
+_TIFF_TYPES = {1: (1, 'u1'), 3: (2, 'u2'), 4: (4, 'u4'), 6: (1, 'i1'), 8: (2, 'i2'), 9: (4, 'i4'),
+               16: (8, 'u8'), 17: (8, 'i8'), 18: (8, 'u8')}
+_TIFF_SAMPLE_KINDS = {1: 'u', 2: 'i', 3: 'f'}
+
+# netCDF classic format: list tags and value types (big-endian numpy codes)
+_NC_DIMENSION, _NC_VARIABLE, _NC_ATTRIBUTE = 10, 11, 12
+_NC_TYPES = {1: 'i1', 2: 'S1', 3: '>i2', 4: '>i4', 5: '>f4', 6: '>f8',
+             7: 'u1', 8: '>u2', 9: '>u4', 10: '>i8', 11: '>u8'}
+
+
+def _map_file(source):
+    """Maps a whole file read-only; the mapping stays valid after a file object is closed."""
+    if not isinstance(source, (str, os.PathLike)):
+        source.flush()
+    return np.memmap(source, dtype=np.uint8, mode='r')
+
+
+def _view(mapped, dtype, shape, offset, strides=None):
+    """Returns an array over a part of a mapped file without copying it."""
+    dtype = np.dtype(dtype)
+    if 0 in shape:
+        size = 0
+    elif strides is None:
+        size = int(np.prod(shape, dtype=np.int64)) * dtype.itemsize
+    else:
+        size = sum((length - 1) * stride for length, stride in zip(shape, strides)) + dtype.itemsize
+    if offset < 0 or offset + size > mapped.size:
+        raise ValueError("The raster data lies outside of the file.")
+    return np.ndarray(shape, dtype, buffer=mapped, offset=offset, strides=strides)
+
+
+def map_tiff(source):
+    """
+    Maps the pixels of the first image of an uncompressed (Geo)TIFF file as a read-only array.
+
+    Classic and BigTIFF files in either byte order are supported if the image is stored in
+    strips that follow each other in the file, which is how GDAL writes uncompressed results.
+
+    Args:
+        source (str | os.PathLike | file object): The path of the file, or a binary file object with a file descriptor.
+
+    Returns:
+        numpy.ndarray: The pixels, backed by the mapped file, with shape (rows, columns),
+            (rows, columns, bands) for interleaved bands or (bands, rows, columns) for
+            band-sequential files.
+
+    Raises:
+        ValueError: If the file is not a TIFF file or its pixels are compressed, tiled or not contiguous.
+    """
+    mapped = _map_file(source)
+    header = mapped[:16].tobytes()
+    if header[:2] not in (b'II', b'MM'):
+        raise ValueError("The result is not a TIFF file.")
+    order = '<' if header[:2] == b'II' else '>'
+    version, = struct.unpack(order + 'H', header[2:4])
+    if version == 42:
+        count_format, entry_size, inline_size = 'H', 12, 4
+        ifd_offset, = struct.unpack(order + 'I', header[4:8])
+    elif version == 43:
+        count_format, entry_size, inline_size = 'Q', 20, 8
+        ifd_offset, = struct.unpack(order + 'Q', header[8:16])
+    else:
+        raise ValueError("The result is not a TIFF file.")
+
+    count_size = struct.calcsize(count_format)
+    entries, = struct.unpack(order + count_format, mapped[ifd_offset:ifd_offset + count_size].tobytes())
+    tags = {}
+    for index in range(entries):
+        start = ifd_offset + count_size + index * entry_size
+        entry = mapped[start:start + entry_size].tobytes()
+        tag, field_type = struct.unpack(order + 'HH', entry[:4])
+        if field_type not in _TIFF_TYPES:
+            continue
+        count, = struct.unpack(order + ('I' if inline_size == 4 else 'Q'), entry[4:4 + inline_size])
+        item_size, code = _TIFF_TYPES[field_type]
+        if count * item_size <= inline_size:
+            values = np.frombuffer(entry[4 + inline_size:], order + code, count)
+        else:
+            offset, = struct.unpack(order + ('I' if inline_size == 4 else 'Q'), entry[4 + inline_size:])
+            values = _view(mapped, order + code, (count,), offset)
+        tags[tag] = [int(value) for value in values]
+
+    if tags.get(_COMPRESSION, [1])[0] != 1:
+        raise ValueError("Compressed TIFF images can't be memory-mapped.")
+    if _TILE_WIDTH in tags:
+        raise ValueError("Tiled TIFF images can't be memory-mapped.")
+    width, rows = tags[_WIDTH][0], tags[_LENGTH][0]
+    bands = tags.get(_SAMPLES_PER_PIXEL, [1])[0]
+    bits = tags.get(_BITS_PER_SAMPLE, [1])
+    kind = _TIFF_SAMPLE_KINDS.get(tags.get(_SAMPLE_FORMAT, [1])[0])
+    if len(set(bits)) != 1 or bits[0] not in (8, 16, 32, 64) or kind is None:
+        raise ValueError("The sample type of the TIFF image can't be memory-mapped.")
+    dtype = np.dtype(f'{order}{kind}{bits[0] // 8}')
+
+    offsets, counts = tags[_STRIP_OFFSETS], tags.get(_STRIP_BYTE_COUNTS)
+    if counts is None or any(offset + count != following
+                             for offset, count, following in zip(offsets, counts, offsets[1:])):
+        raise ValueError("The strips of the TIFF image are not contiguous and can't be memory-mapped.")
+
+    if tags.get(_PLANAR_CONFIGURATION, [1])[0] == 2:
+        shape = (bands, rows, width)
+    else:
+        shape = (rows, width, bands) if bands > 1 else (rows, width)
+    return _view(mapped, dtype, shape, offsets[0])
+
+
+class _NetcdfHeader:
+    """Reads the header of a netCDF classic file from its mapping."""
+
+    def __init__(self, mapped, version):
+        self.mapped = mapped
+        self.position = 4
+        self.size_format = '>Q' if version == 5 else '>I'
+        self.offset_format = '>I' if version == 1 else '>Q'
+
+    def read(self, fmt):
+        size = struct.calcsize(fmt)
+        value, = struct.unpack(fmt, self.mapped[self.position:self.position + size].tobytes())
+        self.position += size
+        return value
+
+    def read_size(self):
+        return self.read(self.size_format)
+
+    def read_name(self):
+        length = self.read_size()
+        name = self.mapped[self.position:self.position + length].tobytes().decode()
+        self.position += -(-length // 4) * 4
+        return name
+
+    def read_list(self, expected_tag, read_item):
+        tag, count = self.read('>I'), self.read_size()
+        if tag not in (0, expected_tag):
+            raise ValueError("The netCDF header is malformed.")
+        return [read_item() for _ in range(count)]
+
+    def read_attribute(self):
+        name = self.read_name()
+        dtype = np.dtype(_NC_TYPES[self.read('>I')])
+        size = self.read_size() * dtype.itemsize
+        self.position += -(-size // 4) * 4
+        return name
+
+    def read_variable(self):
+        name = self.read_name()
+        dimensions = [self.read_size() for _ in range(self.read_size())]
+        self.read_list(_NC_ATTRIBUTE, self.read_attribute)
+        dtype = np.dtype(_NC_TYPES[self.read('>I')])
+        vsize = self.read_size()
+        begin = self.read(self.offset_format)
+        return name, dimensions, dtype, vsize, begin
+
+
+def map_netcdf(source):
+    """
+    Maps the variables of a netCDF classic file (CDF-1, CDF-2 or CDF-5) as read-only arrays.
+
+    All arrays are views of a single mapping of the file. Record variables, which are
+    interleaved along the unlimited dimension, are strided views. netCDF-4 files are HDF5
+    containers whose variables may be chunked and compressed, so they are not supported.
+
+    Args:
+        source (str | os.PathLike | file object): The path of the file, or a binary file object with a file descriptor.
+
+    Returns:
+        dict: The arrays of the variables by name, in the order of the file, backed by the mapped file.
+
+    Raises:
+        ValueError: If the file is not a netCDF classic file.
+    """
+    mapped = _map_file(source)
+    magic = mapped[:4].tobytes()
+    if magic[:3] != b'CDF' or magic[3] not in (1, 2, 5):
+        raise ValueError("The result is not a netCDF classic file; netCDF-4 can't be memory-mapped.")
+    header = _NetcdfHeader(mapped, magic[3])
+    records = header.read_size()
+    dimensions = header.read_list(_NC_DIMENSION, lambda: (header.read_name(), header.read_size()))
+    header.read_list(_NC_ATTRIBUTE, header.read_attribute)
+    variables = header.read_list(_NC_VARIABLE, header.read_variable)
+
+    lengths = [length for _, length in dimensions]
+    record_variables = [variable for variable in variables if variable[1] and lengths[variable[1][0]] == 0]
+    if len(record_variables) == 1:
+        _, dimension_ids, dtype, _, _ = record_variables[0]
+        record_size = int(np.prod([lengths[i] for i in dimension_ids[1:]], dtype=np.int64)) * dtype.itemsize
+    else:
+        record_size = sum(variable[3] for variable in record_variables)
+
+    record_names = {variable[0] for variable in record_variables}
+    arrays = {}
+    for name, dimension_ids, dtype, _, begin in variables:
+        shape = tuple(lengths[i] for i in dimension_ids)
+        if name not in record_names:
+            arrays[name] = _view(mapped, dtype, shape, begin)
+            continue
+        # one record holds a contiguous slice of every record variable
+        shape = (records,) + shape[1:]
+        inner = [dtype.itemsize]
+        for length in reversed(shape[2:]):
+            inner.insert(0, inner[0] * length)
+        strides = (record_size,) + tuple(inner[:len(shape) - 1])
+        arrays[name] = _view(mapped, dtype, shape, begin, strides)
+    return arrays
+
+
+def map_raster(source, return_format: str):
+    """
+    Maps an encoded raster result as read-only arrays without reading it into memory.
+
+    The pages of the file are loaded by the operating system when they are first accessed and
+    are shared by all arrays and processes that map the same file.
+
+    Args:
+        source (str | os.PathLike | file object): The path of the result, or a binary file
+            object with a file descriptor, e.g. the result of `Dco.execute(stream=True)`.
+        return_format (str): The format the result was encoded in: 'tiff', 'gtiff' or 'netcdf'.
+
+    Returns:
+        numpy.ndarray | dict: The pixels of a TIFF image, or the variables of a netCDF file by name.
+
+    Raises:
+        ValueError: If the format can't be memory-mapped or the file doesn't match it.
+    """
+    if return_format in ('tiff', 'gtiff'):
+        return map_tiff(source)
+    if return_format == 'netcdf':
+        return map_netcdf(source)
+    raise ValueError(f"Results in the '{return_format}' format can't be memory-mapped.")
@@ -0,0 +1,212 @@
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from email.utils import parsedate_to_datetime
+
+
+class RetryPolicy:
+    """
+    Describes when and how often a failed request is sent again.
+
+    Attributes:
+        max_retries (int): The maximum number of additional attempts after the first one.
+        backoff_factor (float): The base delay in seconds, doubled after every attempt.
+        max_backoff (float): The upper limit in seconds for a single delay.
+        jitter (bool): If True, every delay is drawn uniformly between 0 and its exponential value.
+        retry_statuses (set of int): HTTP status codes that are considered transient.
+        respect_retry_after (bool): If True, the server's Retry-After header replaces the computed delay.
+        retry_on_timeout (bool): If True, timeouts and connection errors are retried as well.
+    """
+
+    def __init__(self, max_retries=3, backoff_factor=0.5, max_backoff=30.0, jitter=True,
+                 retry_statuses=(429, 500, 502, 503, 504), respect_retry_after=True, retry_on_timeout=True):
+        """
+        Initializes a RetryPolicy instance.
+
+        Raises:
+            ValueError: If max_retries is negative or a delay setting is negative.
+        """
+        if not isinstance(max_retries, int) or max_retries < 0:
+            raise ValueError("max_retries must be a non-negative integer.")
+        if backoff_factor < 0 or max_backoff < 0:
+            raise ValueError("Backoff delays must not be negative.")
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.retry_statuses = set(retry_statuses)
+        self.respect_retry_after = respect_retry_after
+        self.retry_on_timeout = retry_on_timeout
+
+    def backoff(self, attempt, retry_after=None):
+        """
+        Returns the number of seconds to wait before the next attempt.
+
+        Args:
+            attempt (int): The number of the attempt that just failed, starting at 0.
+            retry_after (str, optional): The Retry-After header of the failed response.
+        """
+        if self.respect_retry_after and retry_after is not None:
+            delay = parse_retry_after(retry_after)
+            if delay is not None:
+                return min(delay, self.max_backoff)
+        delay = min(self.max_backoff, self.backoff_factor * (2 ** attempt))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        return delay
+
+
+def parse_retry_after(value):
+    """
+    Converts a Retry-After header, given either in seconds or as an HTTP date, to seconds.
+
+    Returns:
+        float | None: The delay in seconds, or None if the header can't be parsed.
+    """
+    if not isinstance(value, str):
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class HedgePolicy:
+    """
+    Describes when a duplicate of a slow request is sent.
+
+    If a request has not been answered after the hedge delay, the same request is sent again
+    and whichever response arrives first is used. The delay is either fixed or derived from the
+    given percentile of the latencies observed so far.
+
+    Attributes:
+        delay (float): A fixed hedge delay in seconds; used until enough latencies are observed
+            when `percentile` is set as well.
+        percentile (float): The latency percentile (0-100) after which a duplicate is sent.
+        min_samples (int): The number of observed latencies needed before the percentile is used.
+        max_hedges (int): The maximum number of duplicates sent per request.
+        losing_statuses (set of int): HTTP status codes of responses that only count if no
+            other attempt succeeds, e.g. a fast 503 doesn't win over a slower 200.
+    """
+
+    def __init__(self, delay=None, percentile=95, min_samples=20, window=200, max_hedges=1, max_workers=32,
+                 losing_statuses=(429, 500, 502, 503, 504)):
+        """
+        Initializes a HedgePolicy instance.
+
+        Args:
+            window (int): How many of the most recent latencies are kept.
+            max_workers (int): The number of threads available for sending requests and their duplicates.
+                They are started on first use and stopped by `close()`.
+
+        Raises:
+            ValueError: If neither a delay nor a percentile is given, or a value is out of range.
+        """
+        if delay is None and percentile is None:
+            raise ValueError("Either a delay or a percentile must be given.")
+        if percentile is not None and not 0 < percentile < 100:
+            raise ValueError("percentile must be between 0 and 100.")
+        if not isinstance(max_hedges, int) or max_hedges < 1:
+            raise ValueError("max_hedges must be a positive integer.")
+        self.delay = delay
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.max_hedges = max_hedges
+        self.losing_statuses = set(losing_statuses)
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._max_workers = max_workers
+        self._executor = None
+
+    def _submit(self, call, *args):
+        """Runs a call on the threads of the policy, starting them if needed."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers, thread_name_prefix="HedgePolicy")
+            return self._executor.submit(call, *args)
+
+    def close(self):
+        """Stops the threads of the policy once their requests are done; they are started again when needed."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def _succeeded(self, future):
+        """Returns True for an attempt that returned a response whose status doesn't lose."""
+        return (future.exception() is None
+                and getattr(future.result(), "status_code", None) not in self.losing_statuses)
+
+    def record(self, latency):
+        """Adds the latency in seconds of an answered request."""
+        with self._lock:
+            self._latencies.append(latency)
+
+    def hedge_delay(self):
+        """
+        Returns the number of seconds after which a duplicate is sent, or None if no duplicate
+        should be sent yet.
+        """
+        if self.percentile is not None:
+            with self._lock:
+                latencies = sorted(self._latencies)
+            if len(latencies) >= self.min_samples:
+                index = min(len(latencies) - 1, int(len(latencies) * self.percentile / 100))
+                return latencies[index]
+        return self.delay
+
+    def run(self, request):
+        """
+        Calls `request` and sends duplicates of it while it is slower than the hedge delay.
+
+        Args:
+            request (callable): Sends the request and returns the response.
+
+        Returns:
+            The response of the first attempt that succeeds. Responses with a losing status are
+            only returned if no attempt succeeds, the first of them then. If all attempts raise,
+            the exception of the first attempt is raised.
+        """
+        delay = self.hedge_delay()
+
+        def timed(start):
+            # every attempt is timed from its own start, so duplicates don't count the hedge delay
+            response = request()
+            self.record(time.perf_counter() - start)
+            return response
+
+        attempts = [self._submit(timed, time.perf_counter())]
+        pending = set(attempts)
+        while True:
+            timeout = delay if len(attempts) <= self.max_hedges and delay is not None else None
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            winner = next((future for future in done if self._succeeded(future)), None)
+            if winner is not None:
+                for future in attempts:
+                    if future is not winner:
+                        future.add_done_callback(_close_response)
+                return winner.result()
+            if not done and len(attempts) <= self.max_hedges:
+                duplicate = self._submit(timed, time.perf_counter())
+                attempts.append(duplicate)
+                pending.add(duplicate)
+            elif not pending:
+                answered = [future for future in attempts if future.exception() is None]
+                if answered:
+                    for future in answered[1:]:
+                        future.add_done_callback(_close_response)
+                    return answered[0].result()
+                raise attempts[0].exception()
+
+
+def _close_response(future):
+    """Releases the connection of a hedged attempt whose response is no longer needed."""
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
@@ -0,0 +1,65 @@
+import os
+import tempfile
+
+from .constants import DEFAULT_CHUNK_SIZE, DEFAULT_SPOOL_THRESHOLD
+
+
+def iter_response(response, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """
+    Yields the body of a streamed response chunk by chunk and releases its connection afterwards.
+
+    Args:
+        response (requests.Response): A response requested with `stream=True`.
+        chunk_size (int): The maximum number of bytes per chunk.
+
+    Yields:
+        bytes: The next chunk of the response body.
+    """
+    try:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            if chunk:
+                yield chunk
+    finally:
+        response.close()
+
+
+def write_response(response, target, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """
+    Writes the body of a streamed response to a file without buffering it as a whole.
+
+    Args:
+        response (requests.Response): A response requested with `stream=True`.
+        target (str | os.PathLike | file object): A path to write to, or a binary file object.
+        chunk_size (int): The maximum number of bytes held in memory at once.
+
+    Returns:
+        int: The number of bytes written.
+    """
+    if isinstance(target, (str, os.PathLike)):
+        with open(target, 'wb') as file:
+            return write_response(response, file, chunk_size)
+
+    written = 0
+    for chunk in iter_response(response, chunk_size):
+        target.write(chunk)
+        written += len(chunk)
+    return written
+
+
+def spool_response(response, chunk_size: int = DEFAULT_CHUNK_SIZE, spool_threshold: int = DEFAULT_SPOOL_THRESHOLD):
+    """
+    Reads the body of a streamed response into a file object that stays in memory while it is
+    small and is moved to a temporary file on disk once it grows beyond `spool_threshold` bytes.
+
+    Args:
+        response (requests.Response): A response requested with `stream=True`.
+        chunk_size (int): The maximum number of bytes read at once.
+        spool_threshold (int): The size in bytes above which the body is kept on disk.
+
+    Returns:
+        tempfile.SpooledTemporaryFile: The body, positioned at its start.
+    """
+    spooled = tempfile.SpooledTemporaryFile(max_size=spool_threshold)
+    write_response(response, spooled, chunk_size)
+    spooled.seek(0)
+    return spooled
@@ -3,6 +3,7 @@ from typing_extensions import NotRequired, TypedDict, Union
 
 class RequestType(TypedDict):
     """Type representing the request type to the server"""
+    request: NotRequired[str]
     coverageId: NotRequired[str]
     Lat: NotRequired[Union[float, tuple[int | float, int | float]]]
     Lon: NotRequired[Union[float, tuple[int | float, int | float]]]
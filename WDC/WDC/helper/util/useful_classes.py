@@ -1,3 +1,6 @@
+from WDC.helper.error_handling.type_checks import register_operand_type
+
+
 class Date:
     """
     A class representing a date with optional year, month, and day components.
@@ -15,6 +18,7 @@ class Date:
         set_month(month): Sets the month component.
         set_day(day): Sets the day component.
     """
+    __slots__ = ('year', 'month', 'day')
 
     def __init__(self, year, month=None, day=None):
         """
@@ -122,6 +126,7 @@ class RGB:
         set_green(green): Sets the green component.
         set_blue(blue): Sets the blue component.
     """
+    __slots__ = ('red', 'green', 'blue')
 
     def __init__(self, red, green, blue):
         """
@@ -194,3 +199,46 @@ class RGB:
         Similar to __repr__.
         """
         return '{' + f'red: {self.red}; green: {self.green}; blue: {self.blue}' + '}'
+
+
+@register_operand_type
+class Param:
+    """
+    A named placeholder for a subset bound or a scalar literal in a query compiled with
+    `Dco.prepare()`. Its value is filled in by `PreparedQuery.bind()`.
+
+    Attributes:
+        name (str): The name the value is passed under, e.g. 'lat' for `bind(lat=53.08)`.
+
+    Example:
+        coverage.set_subset(AxisSubset('Lat', Param('lat')), AxisSubset('ansi', Param('month')))
+        query = dco.return_expression(coverage > Param('threshold')).prepare()
+        query.bind(lat=53.08, month=Date(2014, 7), threshold=30)
+    """
+    __slots__ = ('name',)
+    MARKER = '\x00'
+
+    def __init__(self, name):
+        """
+        Initializes a placeholder.
+
+        Args:
+            name (str): The name of the parameter; it must be a valid Python identifier.
+
+        Raises:
+            TypeError: If the name is not a string.
+            ValueError: If the name is not a valid identifier.
+        """
+        if not isinstance(name, str):
+            raise TypeError("The value passed must be a string")
+        if not name.isidentifier():
+            raise ValueError("Parameter names must be valid identifiers.")
+        self.name = name
+
+    def __repr__(self):
+        """Returns the marker the placeholder is written as in a compiled query."""
+        return f'{self.MARKER}{self.name}{self.MARKER}'
+
+    def __str__(self):
+        """Returns the marker the placeholder is written as in a compiled query."""
+        return self.__repr__()
@@ -1,41 +1,128 @@
+import functools
+import time
 import xml.etree.ElementTree as ET
 import requests
 from typing import Callable
-import xml.etree.ElementTree as ET
 
 
-def network_wrapper(postRequest: Callable[[str, dict, dict], requests.models.Response]):
-    def wrapper(*args, **kwargs):
+def request_failed(code, exception_detail, extra=None):
+    """
+    Builds the error object returned for a failed request.
+
+    Args:
+        code (int): The HTTP status code of the failed request.
+        exception_detail (str | dict): Description of what went wrong.
+        extra (Exception, optional): The exception that caused the failure.
+
+    Returns:
+        dict: The error object in the format returned by `network_wrapper`.
+    """
+    error = {
+        "code": code,
+        "message": "Request Failed",
+        "exceptionDetail": exception_detail
+    }
+    if extra is not None:
+        error["extra"] = extra
+    return {
+        "success": False,
+        "error": error
+    }
+
+
+def parse_exception_report(text):
+    """
+    Extracts the exception code and text from an OGC ExceptionReport.
+
+    Args:
+        text (str): The XML body of the failed response.
+
+    Returns:
+        dict: The `exceptionText` and `exceptionCode` found in the report. If the body is not
+            XML, e.g. an error page of a proxy, the whole body is used as `exceptionText`.
+    """
+    try:
+        root = ET.fromstring(text)
+    except ET.ParseError:
+        return {"exceptionText": text}
+    exceptionDetail = {}
+    for child in root:
+        for subChild in child:
+            exceptionDetail["exceptionText"] = subChild.text
+        if child.attrib.get("exceptionCode"):
+            exceptionDetail["exceptionCode"] = child.attrib.get(
+                "exceptionCode")
+    return exceptionDetail
+
+
+def send_request(postRequest, *args, **kwargs):
+    """
+    Calls the request function and checks the status of its response.
+
+    When the request function is a method of an object with a `retry_policy` or `hedge_policy`
+    attribute (see `Dbc`), transient failures are retried with backoff and slow attempts are
+    hedged according to those policies.
+
+    Returns:
+        tuple: (response, None) on success or (None, error object) on failure.
+    """
+    owner = args[0] if args else None
+    retry_policy = getattr(owner, "retry_policy", None)
+    hedge_policy = getattr(owner, "hedge_policy", None)
+
+    def attempt():
+        if hedge_policy is None:
+            return postRequest(*args, **kwargs)
+        return hedge_policy.run(functools.partial(postRequest, *args, **kwargs))
+
+    retries = 0
+    while True:
+        response = None
+        retry_after = None
         try:
-            response = postRequest(*args, **kwargs)
+            response = attempt()
             response.raise_for_status()
+            return response, None
         except requests.exceptions.Timeout:
-            return {
-                "success": False,
-                "error": {
-                    "code": response.status_code,
-                    "message": "Request Failed",
-                    "exceptionDetail": "Request Timeout Error"
-                }
-            }
+            code = 408 if response is None else response.status_code
+            result = (None, request_failed(code, "Request Timeout Error"))
+            retryable = retry_policy is not None and retry_policy.retry_on_timeout
+        except requests.exceptions.ConnectionError:
+            if retry_policy is None or not retry_policy.retry_on_timeout or retries >= retry_policy.max_retries:
+                raise
+            result = None
+            retryable = True
         except requests.exceptions.HTTPError as e:
-            root = ET.fromstring(response.text)
-            exceptionDetail = {}
-            for child in root:
-                for subChild in child:
-                    exceptionDetail["exceptionText"] = subChild.text
-                if child.attrib.get("exceptionCode"):
-                    exceptionDetail["exceptionCode"] = child.attrib.get(
-                        "exceptionCode")
-            return {
-                "success": False,
-                "error": {
-                    "code": response.status_code,
-                    "message": "Request Failed",
-                    "exceptionDetail": exceptionDetail,
-                    "extra": e
-                }
-            }
-        else:
-            return response.content
+            result = (None, request_failed(
+                response.status_code, parse_exception_report(response.text), e))
+            retryable = retry_policy is not None and response.status_code in retry_policy.retry_statuses
+            retry_after = response.headers.get("Retry-After") if retryable else None
+
+        if not retryable or retries >= retry_policy.max_retries:
+            return result
+        time.sleep(retry_policy.backoff(retries, retry_after))
+        retries += 1
+
+
+def network_wrapper(postRequest: Callable[[str, dict, dict], requests.models.Response]):
+    @functools.wraps(postRequest)
+    def wrapper(*args, **kwargs):
+        response, error = send_request(postRequest, *args, **kwargs)
+        if error is not None:
+            return error
+        return response.content
+    return wrapper
+
+
+def stream_network_wrapper(postRequest: Callable[[str, dict, dict], requests.models.Response]):
+    """
+    Same as `network_wrapper`, but returns the response itself on success so that its body
+    can be consumed in chunks instead of being buffered as a whole.
+    """
+    @functools.wraps(postRequest)
+    def wrapper(*args, **kwargs):
+        response, error = send_request(postRequest, *args, **kwargs)
+        if error is not None:
+            return error
+        return response
     return wrapper
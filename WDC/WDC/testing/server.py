@@ -0,0 +1,196 @@
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+EXCEPTION_REPORT = '''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<ows:ExceptionReport version="2.0.1" xmlns:ows="http://www.opengis.net/ows/2.0">
+    <ows:Exception exceptionCode="{code}" >
+        <ows:ExceptionText>{text}</ows:ExceptionText>
+    </ows:Exception>
+</ows:ExceptionReport>
+'''
+
+DESCRIBE_COVERAGE = '''<?xml version="1.0" encoding="UTF-8"?>
+<wcs:CoverageDescriptions xmlns:wcs="http://www.opengis.net/wcs/2.0" xmlns:gml="http://www.opengis.net/gml/3.2"
+    xmlns:gmlcov="http://www.opengis.net/gmlcov/1.0" xmlns:swe="http://www.opengis.net/swe/2.0">
+  <wcs:CoverageDescription gml:id="{coverage_id}">
+    <gml:boundedBy>
+      <gml:Envelope srsName="http://localhost/def/crs-compound?1=http://localhost/def/crs/OGC/0/AnsiDate&amp;2=http://localhost/def/crs/EPSG/0/4326"
+          axisLabels="ansi Lat Long" uomLabels="d deg deg" srsDimension="3">
+        <gml:lowerCorner>"2000-02-01T00:00:00.000Z" -90 -180</gml:lowerCorner>
+        <gml:upperCorner>"2015-06-01T00:00:00.000Z" 90 180</gml:upperCorner>
+      </gml:Envelope>
+    </gml:boundedBy>
+    <wcs:CoverageId>{coverage_id}</wcs:CoverageId>
+    <gml:domainSet>
+      <gml:RectifiedGrid dimension="3">
+        <gml:limits>
+          <gml:GridEnvelope><gml:low>0 0 0</gml:low><gml:high>184 1799 3599</gml:high></gml:GridEnvelope>
+        </gml:limits>
+        <gml:axisLabels>ansi Lat Long</gml:axisLabels>
+        <gml:offsetVector>1 0 0</gml:offsetVector>
+        <gml:offsetVector>0 -0.1 0</gml:offsetVector>
+        <gml:offsetVector>0 0 0.1</gml:offsetVector>
+      </gml:RectifiedGrid>
+    </gml:domainSet>
+    <gmlcov:rangeType>
+      <swe:DataRecord>
+        <swe:field name="Gray"><swe:Quantity definition="http://www.opengis.net/def/dataType/OGC/0/float32"/></swe:field>
+      </swe:DataRecord>
+    </gmlcov:rangeType>
+  </wcs:CoverageDescription>
+</wcs:CoverageDescriptions>
+'''
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    """Answers WCS/WCPS requests according to the settings of the StandInServer it belongs to."""
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.server.stand_in._count("connections")
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._answer(parse_qs(urlsplit(self.path).query), {})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length).decode("utf-8") if length else ""
+        self._answer(parse_qs(urlsplit(self.path).query), parse_qs(body))
+
+    def _answer(self, params, form):
+        stand_in = self.server.stand_in
+        stand_in._count("requests")
+        request = params.get("request", [None])[0]
+        query = form.get("query", [None])[0]
+
+        if stand_in.latency:
+            time.sleep(stand_in.latency + random.uniform(0, stand_in.latency_jitter))
+
+        if stand_in.error_rate and random.random() < stand_in.error_rate:
+            stand_in._count("errors")
+            body = EXCEPTION_REPORT.format(code=stand_in.exception_code, text=stand_in.exception_text)
+            self._send(stand_in.error_status, body.encode("utf-8"), "application/xml",
+                       {"Retry-After": stand_in.retry_after} if stand_in.retry_after is not None else None)
+            return
+
+        if request == "DescribeCoverage":
+            coverage_id = params.get("coverageId", ["AvgLandTemp"])[0]
+            self._send(200, stand_in.describe_coverage.format(coverage_id=coverage_id).encode("utf-8"),
+                       "application/xml")
+            return
+
+        payload = stand_in.responder(query) if stand_in.responder is not None else stand_in.payload
+        self._send(200, payload, "application/octet-stream")
+
+    def _send(self, status, body, content_type, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, str(value))
+        self.end_headers()
+        view = memoryview(body)
+        for start in range(0, len(body), 64 * 1024):
+            self.wfile.write(view[start:start + 64 * 1024])
+        self.server.stand_in._count("bytes_sent", len(body))
+
+
+class StandInServer:
+    """
+    A local HTTP server that stands in for a rasdaman endpoint in tests and benchmarks.
+
+    It accepts the traffic of `Dbc.post_query` and `Dbc.post_request` on any path and answers
+    after a configurable latency with a payload of configurable size, an OGC ExceptionReport at a
+    configurable error rate, or a DescribeCoverage document. All settings can be changed while
+    the server is running.
+
+    Attributes:
+        latency (float): Seconds to wait before answering a request.
+        latency_jitter (float): Up to this many extra seconds are added to the latency at random.
+        payload (bytes): The body returned for queries.
+        responder (callable): If set, called with the query string to produce the body instead of `payload`.
+        error_rate (float): The probability (0-1) of answering with an ExceptionReport.
+        error_status (int): The HTTP status of ExceptionReport answers.
+        exception_code (str): The exceptionCode of the ExceptionReport.
+        exception_text (str): The ExceptionText of the ExceptionReport.
+        retry_after (float): If set, sent as Retry-After header with ExceptionReport answers.
+        describe_coverage (str): The DescribeCoverage template; `{coverage_id}` is replaced.
+        stats (dict): Counters of accepted connections, requests, errors and bytes sent.
+
+    Example:
+        with StandInServer(latency=0.01, payload_size=1024) as server:
+            dbc = Dbc(server_url=server.url)
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, latency_jitter=0.0, payload=b"25.984251",
+                 payload_size=None, responder=None, error_rate=0.0, error_status=500,
+                 exception_code="InternalError", exception_text="Stand-in server error.",
+                 retry_after=None, describe_coverage=DESCRIBE_COVERAGE):
+        """
+        Initializes the server without starting it.
+
+        Args:
+            host (str): The address to listen on.
+            port (int): The port to listen on; 0 picks a free port.
+            payload_size (int, optional): If given, `payload` is replaced by this many bytes.
+            The other arguments set the attributes of the same name.
+        """
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.payload = bytes(payload_size) if payload_size is not None else payload
+        self.responder = responder
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.exception_code = exception_code
+        self.exception_text = exception_text
+        self.retry_after = retry_after
+        self.describe_coverage = describe_coverage
+        self.stats = {"connections": 0, "requests": 0, "errors": 0, "bytes_sent": 0}
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), _StandInHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.stand_in = self
+        self._thread = None
+
+    def _count(self, counter, amount=1):
+        with self._lock:
+            self.stats[counter] += amount
+
+    def reset_stats(self):
+        """Sets all counters back to 0."""
+        with self._lock:
+            for counter in self.stats:
+                self.stats[counter] = 0
+
+    @property
+    def url(self):
+        """The endpoint URL to pass to `Dbc(server_url=...)`."""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/rasdaman/ows"
+
+    def start(self):
+        """Starts serving requests on a background thread."""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, args=(0.05,), daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stops the server and releases its port."""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
@@ -0,0 +1,135 @@
+"""
+End-to-end throughput and latency benchmark of the Dbc/Dco execution paths.
+
+Every path runs against a local StandInServer, so the numbers only reflect the client and the
+configured server latency. Run from the project root:
+
+    python -m benchmarks.benchmark_execution --queries 200 --latency 0.005 --workers 8
+"""
+import argparse
+import io
+import statistics
+import time
+
+from WDC.core.coverage import Coverage
+from WDC.core.dbc import Dbc
+from WDC.core.dco import Dco
+from WDC.testing.server import StandInServer
+
+
+def percentile(values, percent):
+    """Returns the given percentile (0-100) of a list of numbers."""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(name, latencies, elapsed, received):
+    """Builds one result row from per-query latencies, the total wall-clock time and the bytes received."""
+    return {
+        "path": name,
+        "queries": len(latencies),
+        "queries/s": len(latencies) / elapsed,
+        "p50 ms": percentile(latencies, 50) * 1000,
+        "p95 ms": percentile(latencies, 95) * 1000,
+        "p99 ms": percentile(latencies, 99) * 1000,
+        "mean ms": statistics.fmean(latencies) * 1000,
+        "MB/s": received / elapsed / 1e6,
+    }
+
+
+def timed(call):
+    """Runs a call and returns its result together with its duration in seconds."""
+    start = time.perf_counter()
+    result = call()
+    return result, time.perf_counter() - start
+
+
+def bench_sequential(url, queries):
+    """One query after another, opening a new connection for every query."""
+    latencies, received = [], 0
+    with Dbc(server_url=url, keep_alive=False) as dbc:
+        dco = Dco(Coverage("AvgLandTemp"), dbc=dbc).return_expression(1)
+        start = time.perf_counter()
+        for _ in range(queries):
+            result, latency = timed(dco.execute)
+            latencies.append(latency)
+            received += len(result)
+        return summarize("sequential", latencies, time.perf_counter() - start, received)
+
+
+def bench_pooled(url, queries):
+    """One query after another over the keep-alive connection pool of a single Dbc."""
+    latencies, received = [], 0
+    with Dbc(server_url=url) as dbc:
+        dco = Dco(Coverage("AvgLandTemp"), dbc=dbc).return_expression(1)
+        start = time.perf_counter()
+        for _ in range(queries):
+            result, latency = timed(dco.execute)
+            latencies.append(latency)
+            received += len(result)
+        return summarize("pooled", latencies, time.perf_counter() - start, received)
+
+
+def bench_batched(url, queries, workers):
+    """All queries at once through Dco.execute_many with a bounded number of workers."""
+    with Dbc(server_url=url, pool_maxsize=workers) as dbc:
+        latencies = []
+
+        def post_query(query, post=dbc.post_query):
+            result, latency = timed(lambda: post(query))
+            latencies.append(latency)
+            return result
+
+        dbc.post_query = post_query
+        dcos = [Dco(Coverage("AvgLandTemp"), dbc=dbc).return_expression(i) for i in range(queries)]
+        results, elapsed = timed(lambda: Dco.execute_many(dcos, max_workers=workers))
+        return summarize(f"batched x{workers}", latencies, elapsed, sum(len(result) for result in results))
+
+
+def bench_streaming(url, queries):
+    """Large results written chunk by chunk with Dco.execute_to instead of being buffered."""
+    latencies, received = [], 0
+    with Dbc(server_url=url) as dbc:
+        dco = Dco(Coverage("AvgLandTemp"), dbc=dbc).return_expression(1)
+        start = time.perf_counter()
+        for _ in range(queries):
+            written, latency = timed(lambda: dco.execute_to(io.BytesIO(), return_format="tiff"))
+            latencies.append(latency)
+            received += written
+        return summarize("streaming", latencies, time.perf_counter() - start, received)
+
+
+def print_table(rows):
+    """Prints the result rows as an aligned table."""
+    columns = list(rows[0])
+    widths = [max(len(column), *(len(f"{row[column]:.2f}" if isinstance(row[column], float) else str(row[column]))
+                                  for row in rows)) for column in columns]
+    print("  ".join(column.rjust(width) for column, width in zip(columns, widths)))
+    for row in rows:
+        cells = [f"{row[column]:.2f}" if isinstance(row[column], float) else str(row[column]) for column in columns]
+        print("  ".join(cell.rjust(width) for cell, width in zip(cells, widths)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--queries", type=int, default=200, help="queries per execution path")
+    parser.add_argument("--latency", type=float, default=0.005, help="server latency in seconds")
+    parser.add_argument("--payload-size", type=int, default=64, help="bytes per scalar result")
+    parser.add_argument("--stream-size", type=int, default=8 * 1024 * 1024,
+                        help="bytes per result on the streaming path")
+    parser.add_argument("--workers", type=int, default=8, help="concurrency of the batched path")
+    args = parser.parse_args()
+
+    rows = []
+    with StandInServer(latency=args.latency, payload_size=args.payload_size) as server:
+        rows.append(bench_sequential(server.url, args.queries))
+        rows.append(bench_pooled(server.url, args.queries))
+        rows.append(bench_batched(server.url, args.queries, args.workers))
+        server.payload = bytes(args.stream_size)
+        rows.append(bench_streaming(server.url, max(1, args.queries // 20)))
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
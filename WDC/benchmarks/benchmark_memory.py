@@ -0,0 +1,72 @@
+"""
+Memory benchmark of the query-model classes.
+
+Every class is instantiated many times while tracemalloc records the allocations, once as it is
+and once as a subclass without __slots__, which has the per-instance __dict__ the classes used
+to have. Run from the project root:
+
+    python -m benchmarks.benchmark_memory --count 100000
+"""
+import argparse
+import gc
+import tracemalloc
+
+from WDC.core.coverage import Coverage, AxisSubset
+from WDC.core.switch import Case
+from WDC.helper.operations.binary_expressions import BinaryArithmeticOperation, BinaryComparisonOperation
+from WDC.helper.operations.numoperations import AggregationMethod, MathOperation
+from WDC.helper.util.useful_classes import Date, RGB
+
+COVERAGE = Coverage("AvgLandTemp")
+COMPARISON = BinaryComparisonOperation(COVERAGE, '>', 0)
+
+# the class and a function building one instance of it from a counter
+CASES = [
+    (Date, lambda cls, i: cls(2000 + i % 20, i % 12 + 1, i % 28 + 1)),
+    (RGB, lambda cls, i: cls(i % 256, 0, 255)),
+    (AxisSubset, lambda cls, i: cls('Lat', (i, i + 1))),
+    (Case, lambda cls, i: cls(COMPARISON, i)),
+    (BinaryArithmeticOperation, lambda cls, i: cls(COVERAGE, '+', i)),
+    (BinaryComparisonOperation, lambda cls, i: cls(COVERAGE, '<', i)),
+    (AggregationMethod, lambda cls, i: cls('max', COVERAGE)),
+    (MathOperation, lambda cls, i: cls('abs', COVERAGE)),
+]
+
+
+def with_dict(cls):
+    """Returns a subclass of cls whose instances have a __dict__, like the classes without __slots__."""
+    return type(f'{cls.__name__}WithDict', (cls,), {})
+
+
+def bytes_per_instance(cls, build, count):
+    """Returns the average number of bytes allocated per instance of cls, excluding shared arguments."""
+    arguments = list(range(count))
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    instances = [build(cls, i) for i in arguments]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    # the list holding the instances is not part of their size
+    allocated -= instances.__sizeof__()
+    del instances
+    return allocated / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=100000, help="instances per class")
+    args = parser.parse_args()
+
+    header = f"{'class':<28}{'__dict__ B/node':>18}{'__slots__ B/node':>18}{'saved':>8}"
+    print(header)
+    print('-' * len(header))
+    for cls, build in CASES:
+        before = bytes_per_instance(with_dict(cls), build, args.count)
+        after = bytes_per_instance(cls, build, args.count)
+        print(f"{cls.__name__:<28}{before:>18.1f}{after:>18.1f}{1 - after / before:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()